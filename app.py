@@ -5,8 +5,7 @@ from flask_socketio import SocketIO
 import random
 import secrets
 import string
-from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.utils import secure_filename
 import sqlite3
 import os
@@ -14,10 +13,21 @@ from config import config
 import time
 import base64
 from extensions import mail
-from db_utils import get_db_connection
-from datetime import datetime, timedelta
+from db_utils import get_db_connection, transaction, init_app as init_db_pool
+from database.query_stats import init_app as init_query_stats
+from database import ephemeral, janitor, slow_queries, write_queue
+from database.ephemeral import ephemeral_store
+from database.migrations import migrate as migrate_schema, check_schema
+from datetime import datetime
 from dotenv import load_dotenv
 from models.recommendation import get_recommended_users, get_recommended_jobs
+from models import embeddings
+from models import skills as skill_index
+from models import collaborative, identity_cache, job_matching, passwords, recommendation_store, result_cache
+from models.ann_index import ann_index
+from models.connection_graph import connection_graph, note_connections_deleted
+from models.identity_cache import user_cache
+from models.user import User, USER_COLUMNS
 
 
 # Load environment variables
@@ -41,9 +51,27 @@ socketio = SocketIO(app, cors_allowed_origins="*", ping_timeout=60, ping_interva
 # Initialize Mail
 mail.init_app(app)
 
+# Initialize pooled database connections (returned to the pool on teardown)
+init_db_pool(app)
+init_query_stats(app)
+slow_queries.init_app(app)
+write_queue.init_app(app)
+ephemeral.init_app(app)
+recommendation_store.init_app(app)
+result_cache.init_app(app)
+collaborative.init_app(app)
+identity_cache.init_app(app)
+passwords.init_app(app)
+janitor.init_app(app)
+
 DB_NAME = app.config['DB_NAME']
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+
+# Pending registrations and OTPs live in the ephemeral store, not the database
+REGISTRATION_TTL = 30 * 60      # how long an unverified registration can be resent/verified
+OTP_TTL = 2 * 60
+RESET_OTP_TTL = 10 * 60
 UPLOAD_FOLDER = 'static/uploads'
 COMPANY_LOGOS_FOLDER = 'static/uploads/company_logos'
 
@@ -165,296 +193,92 @@ def log_registration(conn, user_id, name, email, phone, role, enrollment_no=None
     except Exception as e:
         print(f"Error logging registration: {e}")
 
+def create_verified_user(temp_user, profile_data, is_approved):
+    """
+    Write job (database/write_queue.py): turn a verified pending registration
+    (ephemeral store) into a users row plus its role profile. Returns user id.
+    """
+    with transaction() as conn:
+        c = conn.cursor()
+
+        # Double check if user already exists (to prevent race conditions)
+        existing_user = conn.execute('SELECT id FROM users WHERE email = ?', (temp_user['email'],)).fetchone()
+
+        if existing_user:
+            user_id = existing_user['id']
+            # User exists, maybe from a previous interrupted registration.
+            # Just update password and verified status if needed.
+            c.execute('''UPDATE users SET password = ?, is_verified = 1, is_approved = ?,
+                         version = version + 1 WHERE id = ?''',
+                      (temp_user['password'], is_approved, user_id))
+        else:
+            # Insert user into main users table
+            c.execute('''INSERT INTO users (name, email, password, phone, role, is_verified, is_approved, otp_code)
+                         VALUES (?, ?, ?, ?, ?, 1, ?, NULL)''',
+                     (temp_user['name'], temp_user['email'], temp_user['password'],
+                      temp_user['phone'], temp_user['role'], is_approved))
+            user_id = c.lastrowid
+
+        # Insert role-specific profile data
+        if temp_user['role'] == 'student':
+            # Use INSERT OR REPLACE to handle cases where profile might already exist
+            c.execute('''INSERT OR REPLACE INTO student_profile
+                        (user_id, enrollment_no, department, degree, semester)
+                        VALUES (?, ?, ?, ?, ?)''',
+                    (user_id, profile_data.get('enrollment_no'), profile_data.get('department'),
+                     profile_data.get('degree'), profile_data.get('semester')))
+
+        elif temp_user['role'] == 'alumni':
+            c.execute('''INSERT OR REPLACE INTO alumni_profile
+                        (user_id, enrollment_no, department, degree, pass_year, company_name, designation)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                    (user_id, profile_data.get('enrollment_no'), profile_data.get('department'),
+                     profile_data.get('degree'), profile_data.get('pass_year'),
+                     profile_data.get('company_name'), profile_data.get('designation')))
+
+        elif temp_user['role'] == 'faculty':
+            c.execute('''INSERT OR REPLACE INTO faculty_profile
+                        (user_id, employee_id, department, designation, qualification)
+                        VALUES (?, ?, ?, ?, ?)''',
+                    (user_id, profile_data.get('employee_id'), profile_data.get('department'),
+                     profile_data.get('designation'), profile_data.get('qualification')))
+        recommendation_store.log_change(conn, user_id, 'profile')
+        return user_id
+
 # --- LOGIN SETUP ---
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-class User(UserMixin):
-    def __init__(self, id, name, email, role, profile_pic, phone=None, is_verified=1, is_suspended=0, 
-                 branch=None, passing_year=None, current_domain=None, skills=None, 
-                 interests=None, city=None, company=None, bio=None):
-        self.id = id
-        self.name = name
-        self.email = email
-        self.role = role
-        self.profile_pic = profile_pic
-        self.phone = phone
-        self.is_verified = is_verified
-        self.is_suspended = is_suspended
-        self.branch = branch
-        self.passing_year = passing_year
-        self.current_domain = current_domain
-        self.skills = skills
-        self.interests = interests
-        self.city = city
-        self.company = company
-        self.bio = bio
-
-    @property
-    def is_active(self):
-        return not self.is_suspended
-
 @login_manager.user_loader
 def load_user(user_id):
+    # Served from the identity cache; rebuilt from the row only when users.version moved
+    return user_cache.get(user_id, _fetch_user)
+
+def _fetch_user(user_id):
+    """(version, User) for user_id, or None"""
     conn = get_db_connection()
-    user = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = User.from_row(conn.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (user_id,)).fetchone())
     conn.close()
-    if user:
-        # Avatar generation logic
-        avatar = user['profile_pic'] if user['profile_pic'] else f"https://ui-avatars.com/api/?name={user['name']}&background=0D6EFD&color=fff"
-        # Handle verification status (default to True for old users if column missing/null)
-        is_verified = user['is_verified'] if 'is_verified' in user.keys() else 1
-        
-        # Get new recommendation fields
-        def get_field(key):
-            try:
-                return user[key]
-            except (IndexError, KeyError):
-                return None
-
-        return User(
-            user['id'], user['name'], user['email'], user['role'], avatar, user['phone'], is_verified,
-            get_field('is_suspended') or 0,
-            get_field('branch'), get_field('passing_year'), get_field('current_domain'),
-            get_field('skills'), get_field('interests'), get_field('city'), get_field('company'),
-            get_field('bio')
-        )
+    return (user.version, user) if user else None
 
 # --- DATABASE SETUP ---
+# Schema lives in database/migrations (versioned, applied once per database).
 def init_db():
-    """Initialize the database with all required tables"""
-    conn = None
+    """Bring the database schema up to date by applying pending migrations"""
     try:
-        conn = get_db_connection()
-        c = conn.cursor()
-
-        # Users table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password TEXT NOT NULL,
-                phone TEXT,
-                role TEXT NOT NULL,
-                profile_pic TEXT,
-                is_verified BOOLEAN DEFAULT 0,
-                otp_code TEXT,
-                is_approved BOOLEAN DEFAULT 1,
-                is_suspended BOOLEAN DEFAULT 0,
-                branch TEXT,
-                passing_year INTEGER,
-                current_domain TEXT,
-                skills TEXT,
-                interests TEXT,
-                city TEXT,
-                company TEXT,
-                bio TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # Migration: Add columns if they don't exist (for existing databases)
-        columns_to_add = [
-            ("is_verified", "BOOLEAN DEFAULT 0", "UPDATE users SET is_verified = 1"),
-            ("is_approved", "BOOLEAN DEFAULT 1", "UPDATE users SET is_approved = 1"),
-            ("is_suspended", "BOOLEAN DEFAULT 0", None),
-            ("otp_code", "TEXT", None),
-            ("branch", "TEXT", None),
-            ("passing_year", "INTEGER", None),
-            ("current_domain", "TEXT", None),
-            ("skills", "TEXT", None),
-            ("interests", "TEXT", None),
-            ("city", "TEXT", None),
-            ("company", "TEXT", None),
-            ("bio", "TEXT", None)
-        ]
-
-        for col_name, col_def, update_sql in columns_to_add:
-            try:
-                c.execute(f"ALTER TABLE users ADD COLUMN {col_name} {col_def}")
-                if update_sql:
-                    c.execute(update_sql)
-                print(f"✓ Added {col_name} column to users")
-            except sqlite3.OperationalError as e:
-                if "duplicate column name" in str(e).lower():
-                    pass # Column already exists
-                else:
-                    print(f"⚠ Warning adding {col_name}: {e}")
-
-        # Student Profile Table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS student_profile (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL UNIQUE,
-                enrollment_no TEXT UNIQUE NOT NULL,
-                department TEXT NOT NULL,
-                degree TEXT NOT NULL,
-                semester INTEGER,
-                cgpa REAL,
-                skills TEXT,
-                achievements TEXT,
-                resume_link TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Alumni Profile Table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS alumni_profile (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL UNIQUE,
-                enrollment_no TEXT UNIQUE NOT NULL,
-                department TEXT NOT NULL,
-                degree TEXT NOT NULL,
-                pass_year INTEGER NOT NULL,
-                company_name TEXT,
-                designation TEXT,
-                work_location TEXT,
-                experience_years INTEGER,
-                linkedin_url TEXT,
-                achievements TEXT,
-                bio TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Faculty Profile Table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS faculty_profile (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL UNIQUE,
-                employee_id TEXT UNIQUE NOT NULL,
-                department TEXT NOT NULL,
-                designation TEXT NOT NULL,
-                specialization TEXT,
-                qualification TEXT,
-                experience_years INTEGER,
-                office_location TEXT,
-                office_hours TEXT,
-                bio TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Alumni Meet Registration Table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS alumni_meet_registration (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                full_name TEXT NOT NULL,
-                gender TEXT,
-                dob TEXT,
-                contact_no TEXT NOT NULL,
-                email TEXT NOT NULL,
-                current_address TEXT,
-                enrollment_no TEXT NOT NULL,
-                course TEXT NOT NULL,
-                passing_year INTEGER,
-                current_status TEXT,
-                company_name TEXT,
-                designation TEXT,
-                work_location TEXT,
-                experience_years INTEGER,
-                university_name TEXT,
-                higher_study_course TEXT,
-                higher_study_country TEXT,
-                higher_study_state TEXT,
-                enrollment_year INTEGER,
-                contribute_to_college TEXT,
-                contribution_areas TEXT,
-                attending_meet TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Unified Connection Requests Table (Role-Agnostic)
-        # Works for Student->Alumni, Student->Faculty, Alumni->Faculty, etc.
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS connection_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                sender_id INTEGER NOT NULL,
-                receiver_id INTEGER NOT NULL,
-                status TEXT DEFAULT 'pending',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (sender_id) REFERENCES users(id),
-                FOREIGN KEY (receiver_id) REFERENCES users(id),
-                UNIQUE(sender_id, receiver_id)
-            )
-        ''')
-
-        # Unified Connections/Friends Table
-        # Stores accepted friendships between any two users
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS connections (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id_1 INTEGER NOT NULL,
-                user_id_2 INTEGER NOT NULL,
-                connected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id_1) REFERENCES users(id),
-                FOREIGN KEY (user_id_2) REFERENCES users(id),
-                UNIQUE(user_id_1, user_id_2)
-            )
-        ''')
-
-        # Registration Tracking Table - Logs all user registrations
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS registration_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL UNIQUE,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                role TEXT NOT NULL,
-                enrollment_no TEXT,
-                employee_id TEXT,
-                department TEXT,
-                degree TEXT,
-                pass_year INTEGER,
-                company_name TEXT,
-                designation TEXT,
-                experience_years INTEGER,
-                registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Password Resets Table
-        c.execute('''
-            CREATE TABLE IF NOT EXISTS password_resets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT NOT NULL,
-                otp TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Check if admin exists
-        admin_exists = c.execute("SELECT COUNT(*) FROM users WHERE role='admin'").fetchone()[0]
-
-        # Create Admin if not exists
-        if admin_exists == 0:
-            pw = generate_password_hash("admindbit195@")
-            c.execute("INSERT INTO users (name, email, password, role, phone, is_verified) VALUES (?, ?, ?, ?, ?, ?)",
-                      ("Super Admin", "admindbit195@college.edu", pw, "admin", "0000000000", 1))
-
-        conn.commit()
+        migrate_schema()
         print("Database initialized successfully!")
-
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-        if conn:
-            conn.rollback()
     except Exception as e:
         print(f"Initialization error: {e}")
-        if conn:
-            conn.rollback()
-    finally:
-        if conn:
-            conn.close()
+
+@app.cli.command('migrate')
+def migrate_command():
+    """Apply pending schema migrations (flask migrate)"""
+    migrate_schema()
+
+# Boot only compares schema_version with the latest migration (no DDL)
+check_schema(app)
 
 # --- RECOMMENDATION SYSTEM ---
 
@@ -620,35 +444,38 @@ def login():
     if request.method == 'POST':
         email = request.form['email']
         password = request.form['password']
-        conn = None
         try:
             conn = get_db_connection()
-            user = conn.execute('SELECT * FROM users WHERE email = ?', (email,)).fetchone()
-
-            if user and check_password_hash(user['password'], password):
-                # Helper to safely get user data even if columns are missing (though init_db should fix this)
-                def get_user_field(key, default=None):
-                    try:
-                        return user[key]
-                    except (IndexError, KeyError):
-                        return default
+            try:
+                user = conn.execute(f'SELECT {USER_COLUMNS}, password, is_approved FROM users WHERE email = ?',
+                                    (email,)).fetchone()
+            finally:
+                # Hand the connection back before the (slow) hash check
+                conn.close()
 
-                u_verified = get_user_field('is_verified', 1)
-                u_approved = get_user_field('is_approved', 1)
-                u_suspended = get_user_field('is_suspended', 0)
-                u_role = get_user_field('role', 'student')
+            if user and passwords.verify_password(user['password'], password):
+                user_obj = User.from_row(user)
+                u_role = user_obj.role
 
                 # Check for Admin Approval (Alumni and Faculty require approval)
-                if u_approved == 0 and u_role != 'admin':
+                if user['is_approved'] == 0 and u_role != 'admin':
                     flash('Your account is pending admin approval. Please wait for verification.', 'info')
                     return redirect(url_for('login'))
 
                 # Check for Account Suspension
-                if u_suspended == 1:
+                if user_obj.is_suspended == 1:
                     flash('Your account has been suspended by an admin for violation of community guidelines.', 'danger')
                     return redirect(url_for('login'))
 
-                user_obj = User(user['id'], user['name'], user['email'], u_role, None, u_verified, u_suspended)
+                # Stored with an older cost: replace it while we have the plain password
+                try:
+                    if passwords.needs_rehash(user['password']):
+                        write_queue.execute('UPDATE users SET password = ? WHERE id = ?',
+                                            (passwords.hash_password(password), user_obj.id))
+                        passwords.hashing_pool.rehashed()
+                except passwords.PasswordServiceBusy:
+                    pass
+
                 login_user(user_obj)
                 if u_role == 'admin':
                     return redirect(url_for('dashboard_admin'))
@@ -657,9 +484,8 @@ def login():
                 return redirect(url_for('dashboard_student'))
             else:
                 flash('Invalid Email or Password', 'danger')
-        finally:
-            if conn:
-                conn.close()
+        except passwords.PasswordServiceBusy as e:
+            flash(str(e), 'warning')
     return render_template('auth/login.html')
 
 
@@ -694,11 +520,13 @@ def register():
             # Check if email already exists
             conn = get_db_connection()
             existing_user = conn.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()
+            conn.close()
+            conn = None
             if existing_user:
                 flash('Email already registered! Please login.', 'warning')
                 return redirect(url_for('login'))
 
-            password_hash = generate_password_hash(password)
+            password_hash = passwords.hash_password(password)
             
             # Collect Role-Specific Data
             profile_data = {}
@@ -755,37 +583,12 @@ def register():
             # Generate Secure 6-digit OTP
             otp = ''.join(secrets.choice(string.digits) for _ in range(6))
 
-            # Store in temporary database table (temp_users)
-            # First, create temp_users table if it doesn't exist
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS temp_users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password TEXT NOT NULL,
-                    phone TEXT NOT NULL,
-                    role TEXT NOT NULL,
-                    otp TEXT NOT NULL,
-                    profile_data TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    otp_expires_at TIMESTAMP
-                )
-            ''')
-            conn.commit()
-
-            # Delete old temp entry if exists
-            conn.execute('DELETE FROM temp_users WHERE email = ?', (email,))
-            conn.commit()
-
-            # Insert temporary user
-            otp_expires = datetime.utcnow() + timedelta(minutes=2)
-            import json
-            conn.execute(
-                '''INSERT INTO temp_users (name, email, password, phone, role, otp, profile_data, otp_expires_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                (name, email, password_hash, phone, role, otp, json.dumps(profile_data), otp_expires)
-            )
-            conn.commit()
+            # Keep the pending registration in the ephemeral store (replacing any
+            # old one) until the OTP is confirmed; nothing is written to the database
+            ephemeral_store.put('registration', email, {
+                'name': name, 'email': email, 'password': password_hash, 'phone': phone, 'role': role,
+                'otp': otp, 'otp_expires_at': time.time() + OTP_TTL, 'profile_data': profile_data,
+            }, REGISTRATION_TTL)
             
             # Send OTP Email
             html_content = f'''
@@ -862,93 +665,41 @@ def verify_otp():
     
     if request.method == 'POST':
         otp = request.form.get('otp', '').strip()
-        conn = None
         
         try:
-            conn = get_db_connection()
-            
-            # Check temp_users table for registration OTP
-            temp_user = conn.execute('SELECT * FROM temp_users WHERE email = ?', (email,)).fetchone()
+            # Pending registration from the ephemeral store
+            temp_user = ephemeral_store.get('registration', email)
             
             if temp_user:
                 # Check OTP expiry
-                otp_expiry = datetime.fromisoformat(temp_user['otp_expires_at'])
-                if datetime.utcnow() > otp_expiry:
-                    # Delete expired OTP
-                    conn.execute('DELETE FROM temp_users WHERE email = ?', (email,))
-                    conn.commit()
-                    flash('OTP has expired! Please register again.', 'danger')
+                if time.time() > temp_user['otp_expires_at']:
+                    flash('OTP has expired! Please request a new one.', 'danger')
                     return render_template('auth/verify_otp.html', email=email)
                 
-                # Verify OTP
+                # Verify OTP (a few guesses per code, then a new one must be sent)
                 if temp_user['otp'] != otp:
-                    flash('Invalid OTP! Please try again.', 'danger')
+                    if ephemeral_store.attempt('registration', email) >= ephemeral.MAX_ATTEMPTS:
+                        ephemeral_store.update('registration', email, {'otp_expires_at': 0})
+                        flash('Too many wrong attempts! Please request a new OTP.', 'danger')
+                    else:
+                        flash('Invalid OTP! Please try again.', 'danger')
                     return render_template('auth/verify_otp.html', email=email)
                 
                 # OTP is correct - create actual user account
-                import json
-                profile_data = json.loads(temp_user['profile_data']) if temp_user['profile_data'] else {}
+                profile_data = temp_user.get('profile_data') or {}
                 
                 # Determine approval status (Alumni & Faculty need approval)
                 is_approved = 1 if temp_user['role'] not in ['alumni', 'faculty'] else 0
                 
                 try:
-                    c = conn.cursor()
-                    
-                    # Double check if user already exists (to prevent race conditions)
-                    existing_user = conn.execute('SELECT id FROM users WHERE email = ?', (temp_user['email'],)).fetchone()
-                    
-                    if existing_user:
-                        user_id = existing_user['id']
-                        # User exists, maybe from a previous interrupted registration. 
-                        # Just update password and verified status if needed.
-                        c.execute('''UPDATE users SET password = ?, is_verified = 1, is_approved = ? 
-                                     WHERE id = ?''', 
-                                  (temp_user['password'], is_approved, user_id))
-                    else:
-                        # Insert user into main users table
-                        c.execute('''INSERT INTO users (name, email, password, phone, role, is_verified, is_approved, otp_code)
-                                     VALUES (?, ?, ?, ?, ?, 1, ?, NULL)''',
-                                 (temp_user['name'], temp_user['email'], temp_user['password'], 
-                                  temp_user['phone'], temp_user['role'], is_approved))
-                        user_id = c.lastrowid
-                    
-                    conn.commit()
-                    
-                    # Insert role-specific profile data
-                    if temp_user['role'] == 'student':
-                        # Use INSERT OR REPLACE to handle cases where profile might already exist
-                        c.execute('''INSERT OR REPLACE INTO student_profile 
-                                    (user_id, enrollment_no, department, degree, semester)
-                                    VALUES (?, ?, ?, ?, ?)''',
-                                (user_id, profile_data.get('enrollment_no'), profile_data.get('department'),
-                                 profile_data.get('degree'), profile_data.get('semester')))
-                        
-                    elif temp_user['role'] == 'alumni':
-                        c.execute('''INSERT OR REPLACE INTO alumni_profile
-                                    (user_id, enrollment_no, department, degree, pass_year, company_name, designation)
-                                    VALUES (?, ?, ?, ?, ?, ?, ?)''',
-                                (user_id, profile_data.get('enrollment_no'), profile_data.get('department'),
-                                 profile_data.get('degree'), profile_data.get('pass_year'),
-                                 profile_data.get('company_name'), profile_data.get('designation')))
-                        
-                    elif temp_user['role'] == 'faculty':
-                        c.execute('''INSERT OR REPLACE INTO faculty_profile
-                                    (user_id, employee_id, department, designation, qualification)
-                                    VALUES (?, ?, ?, ?, ?)''',
-                                (user_id, profile_data.get('employee_id'), profile_data.get('department'),
-                                 profile_data.get('designation'), profile_data.get('qualification')))
-                    
-                    conn.commit()
-                    
-                    # Delete from temp_users
-                    conn.execute('DELETE FROM temp_users WHERE email = ?', (email,))
-                    conn.commit()
+                    # One atomic write: user row and role profile
+                    user_id = write_queue.run(create_verified_user, temp_user, profile_data, is_approved)
+                    ephemeral_store.pop('registration', email)
+                    embeddings.refresh_async(user_id)
                     
                     # Auto-login if approved, else redirect to login
                     if is_approved:
-                        user_obj = User(user_id, temp_user['name'], temp_user['email'], temp_user['role'], None, 1)
-                        login_user(user_obj)
+                        login_user(load_user(user_id))
                         flash('✓ Email verified! Account created successfully. Welcome!', 'success')
                         
                         if temp_user['role'] == 'student':
@@ -962,7 +713,6 @@ def verify_otp():
                         return redirect(url_for('login'))
                         
                 except Exception as e:
-                    conn.rollback()
                     print(f"Error creating user account: {e}")
                     import traceback
                     traceback.print_exc()
@@ -978,29 +728,17 @@ def verify_otp():
             traceback.print_exc()
             flash(f'An error occurred: {str(e)}', 'danger')
             return render_template('auth/verify_otp.html', email=email)
-        finally:
-            if conn:
-                conn.close()
 
 @app.route('/resend-otp', methods=['POST'])
 def resend_otp():
     email = request.form.get('email')
-    conn = None
     
     try:
-        conn = get_db_connection()
+        # Generate a new OTP for the pending registration (resets its attempt counter)
+        new_otp = ''.join(secrets.choice(string.digits) for _ in range(6))
         
-        # Check temp_users table first (new registration flow)
-        temp_user = conn.execute('SELECT * FROM temp_users WHERE email = ?', (email,)).fetchone()
-        
-        if temp_user:
-            # Generate new OTP for temporary registration
-            new_otp = ''.join(secrets.choice(string.digits) for _ in range(6))
-            otp_expires = datetime.utcnow() + timedelta(minutes=2)
-            
-            conn.execute('UPDATE temp_users SET otp = ?, otp_expires_at = ? WHERE email = ?',
-                        (new_otp, otp_expires, email))
-            conn.commit()
+        if ephemeral_store.update('registration', email, {'otp': new_otp, 'otp_expires_at': time.time() + OTP_TTL},
+                                  reset_attempts=True):
             
             html_content = f'''
             <html>
@@ -1033,9 +771,6 @@ def resend_otp():
         print(f"Error resending OTP: {e}")
         flash('Failed to resend OTP. Please try again.', 'danger')
         return render_template('auth/verify_otp.html', email=email)
-    finally:
-        if conn:
-            conn.close()
 
 # --- PROFILE ROUTES ---
 
@@ -1250,7 +985,7 @@ def dashboard_student():
         """, (current_user.id,)).fetchall()
 
         # Fetch recommendations
-        recommendations = get_recommended_users(current_user)
+        recommendations = recommendation_store.get_recommendations(current_user)
 
         return render_template('student/dashboard.html',
                              alumni=alumni,
@@ -1285,7 +1020,7 @@ def dashboard_alumni():
         alumni_profile = conn.execute('SELECT * FROM alumni_profile WHERE user_id = ?', (current_user.id,)).fetchone()
 
         # Fetch recommendations
-        recommendations = get_recommended_users(current_user)
+        recommendations = recommendation_store.get_recommendations(current_user)
 
         return render_template('alumni/dashboard.html',
                              pending_requests=pending_requests,
@@ -1412,41 +1147,31 @@ def dashboard_admin():
         current_year = datetime.now().year
         years = [str(y) for y in range(current_year - 4, current_year + 1)]
         
-        students_data = []
-        alumni_data = []
-        students_data = []
-        alumni_data = []
-        faculty_data = []
-        events_data = []
-        
-        for year in years:
-            # Student registrations
-            s_count_year = conn.execute("""
-                SELECT COUNT(*) FROM users 
-                WHERE role = 'student' AND strftime('%Y', created_at) = ?
-            """, (year,)).fetchone()[0]
-            students_data.append(s_count_year)
-
-            # Alumni registrations
-            a_count_year = conn.execute("""
-                SELECT COUNT(*) FROM users 
-                WHERE role = 'alumni' AND strftime('%Y', created_at) = ?
-            """, (year,)).fetchone()[0]
-            alumni_data.append(a_count_year)
-
-            # Faculty registrations
-            f_count_year = conn.execute("""
-                SELECT COUNT(*) FROM users 
-                WHERE role = 'faculty' AND strftime('%Y', created_at) = ?
-            """, (year,)).fetchone()[0]
-            faculty_data.append(f_count_year)
-
-            # Event registrations (for stat card)
-            e_count = conn.execute("""
-                SELECT COUNT(*) FROM alumni_meet_registration 
-                WHERE strftime('%Y', created_at) = ?
-            """, (year,)).fetchone()[0]
-            events_data.append(e_count)
+        # Registrations per year, bucketed by created_at range (portable across
+        # backends, and one query per table instead of one per year)
+        bounds = [f"{year}-01-01 00:00:00" for year in years] + [f"{current_year + 1}-01-01 00:00:00"]
+        bucket_sql = 'CASE ' + ' '.join(f'WHEN created_at < ? THEN {i - 1}' for i in range(1, len(bounds))) + ' END'
+        window = (bounds[0], bounds[-1])
+
+        by_role = {role: [0] * len(years) for role in ('student', 'alumni', 'faculty')}
+        for row in conn.execute(f"""
+            SELECT role, {bucket_sql} AS bucket, COUNT(*) AS n FROM users
+            WHERE created_at >= ? AND created_at < ? AND role IN ('student', 'alumni', 'faculty')
+            GROUP BY role, bucket
+        """, bounds[1:] + list(window)).fetchall():
+            by_role[row['role']][row['bucket']] = row['n']
+        students_data = by_role['student']
+        alumni_data = by_role['alumni']
+        faculty_data = by_role['faculty']
+
+        # Event registrations (for stat card)
+        events_data = [0] * len(years)
+        for row in conn.execute(f"""
+            SELECT {bucket_sql} AS bucket, COUNT(*) AS n FROM alumni_meet_registration
+            WHERE created_at >= ? AND created_at < ?
+            GROUP BY bucket
+        """, bounds[1:] + list(window)).fetchall():
+            events_data[row['bucket']] = row['n']
 
         chart_data = {
             'years': years,
@@ -1642,7 +1367,7 @@ def alumni_jobs():
         ORDER BY j.created_at DESC
     ''').fetchall()
     # Use modular recommendation logic for recommended jobs
-    recommended = get_recommended_jobs(current_user)
+    recommended = result_cache.recommended_jobs(current_user)
     conn.close()
     return render_template('alumni/jobs.html', jobs=jobs, recommended=recommended)
 
@@ -1712,10 +1437,10 @@ def edit_student_profile(user_id):
 
             # Update users table
             if profile_pic:
-                conn.execute('UPDATE users SET name = ?, phone = ?, profile_pic = ? WHERE id = ?',
+                conn.execute('UPDATE users SET name = ?, phone = ?, profile_pic = ?, version = version + 1 WHERE id = ?',
                             (name, phone, profile_pic, user_id))
             else:
-                conn.execute('UPDATE users SET name = ?, phone = ? WHERE id = ?',
+                conn.execute('UPDATE users SET name = ?, phone = ?, version = version + 1 WHERE id = ?',
                             (name, phone, user_id))
 
             # Update student_profile table
@@ -1723,8 +1448,14 @@ def edit_student_profile(user_id):
                 SET cgpa = ?, skills = ?, achievements = ?, resume_link = ?, semester = ?
                 WHERE user_id = ?''',
                 (cgpa, skills, achievements, resume_link, semester, user_id))
+            # users.skills is what recommendations read; keep it and the skill postings in step
+            conn.execute('UPDATE users SET skills = ?, version = version + 1 WHERE id = ?', (skills, user_id))
+            skill_index.set_user_skills(conn, user_id, skills)
+            recommendation_store.log_change(conn, user_id, 'profile')
 
             conn.commit()
+            user_cache.invalidate(user_id)
+            result_cache.profile_changed(user_id)
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('student_profile', user_id=user_id))
 
@@ -1787,12 +1518,13 @@ def edit_alumni_profile(user_id):
                     file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
                     profile_pic = f"/static/uploads/{filename}"
 
+            # users.bio is the text profile embeddings are built from; keep it in step with the profile
             if profile_pic:
-                conn.execute('UPDATE users SET name = ?, phone = ?, profile_pic = ? WHERE id = ?',
-                            (name, phone, profile_pic, user_id))
+                conn.execute('UPDATE users SET name = ?, phone = ?, bio = ?, profile_pic = ?, version = version + 1 WHERE id = ?',
+                            (name, phone, bio, profile_pic, user_id))
             else:
-                conn.execute('UPDATE users SET name = ?, phone = ? WHERE id = ?',
-                            (name, phone, user_id))
+                conn.execute('UPDATE users SET name = ?, phone = ?, bio = ?, version = version + 1 WHERE id = ?',
+                            (name, phone, bio, user_id))
 
             conn.execute('''UPDATE alumni_profile
                 SET company_name = ?, designation = ?, work_location = ?,
@@ -1800,8 +1532,12 @@ def edit_alumni_profile(user_id):
                 WHERE user_id = ?''',
                 (company_name, designation, work_location, experience_years,
                  linkedin_url, achievements, bio, user_id))
+            recommendation_store.log_change(conn, user_id, 'profile')
 
             conn.commit()
+            user_cache.invalidate(user_id)
+            embeddings.refresh_async(user_id)
+            result_cache.profile_changed(user_id)
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('alumni_profile', user_id=user_id))
 
@@ -1877,12 +1613,13 @@ def edit_faculty_profile(user_id):
                     file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
                     profile_pic = f"/static/uploads/{filename}"
 
+            # users.bio is the text profile embeddings are built from; keep it in step with the profile
             if profile_pic:
-                conn.execute('UPDATE users SET name = ?, phone = ?, profile_pic = ? WHERE id = ?',
-                            (name, phone, profile_pic, user_id))
+                conn.execute('UPDATE users SET name = ?, phone = ?, bio = ?, profile_pic = ?, version = version + 1 WHERE id = ?',
+                            (name, phone, bio, profile_pic, user_id))
             else:
-                conn.execute('UPDATE users SET name = ?, phone = ? WHERE id = ?',
-                            (name, phone, user_id))
+                conn.execute('UPDATE users SET name = ?, phone = ?, bio = ?, version = version + 1 WHERE id = ?',
+                            (name, phone, bio, user_id))
 
             conn.execute('''UPDATE faculty_profile
                 SET specialization = ?, experience_years = ?, office_location = ?,
@@ -1891,6 +1628,8 @@ def edit_faculty_profile(user_id):
                 (specialization, experience_years, office_location, office_hours, bio, user_id))
 
             conn.commit()
+            user_cache.invalidate(user_id)
+            embeddings.refresh_async(user_id)
             flash('Profile updated successfully!', 'success')
             return redirect(url_for('faculty_profile', user_id=user_id))
 
@@ -1950,13 +1689,14 @@ def edit_admin_profile(user_id):
 
             # Update users table
             if profile_pic:
-                conn.execute('UPDATE users SET name = ?, email = ?, phone = ?, profile_pic = ? WHERE id = ?',
+                conn.execute('UPDATE users SET name = ?, email = ?, phone = ?, profile_pic = ?, version = version + 1 WHERE id = ?',
                             (name, email, phone, profile_pic, user_id))
             else:
-                conn.execute('UPDATE users SET name = ?, email = ?, phone = ? WHERE id = ?',
+                conn.execute('UPDATE users SET name = ?, email = ?, phone = ?, version = version + 1 WHERE id = ?',
                             (name, email, phone, user_id))
 
             conn.commit()
+            user_cache.invalidate(user_id)
             flash('Admin profile updated successfully!', 'success')
             return redirect(url_for('admin_profile', user_id=user_id))
 
@@ -1993,9 +1733,8 @@ def forgot_password():
                 # Generate Secure OTP
                 otp = ''.join(secrets.choice(string.digits) for _ in range(6))
                 
-                # Store OTP
-                conn.execute('INSERT INTO password_resets (email, otp) VALUES (?, ?)', (email, otp))
-                conn.commit()
+                # Store OTP (replaces an earlier one for this email)
+                ephemeral_store.put('password_reset', email, {'otp': otp}, RESET_OTP_TTL)
                 
                 # Email HTML
                 html_content = f'''
@@ -2056,7 +1795,7 @@ def forgot_password():
             if conn:
                 conn.close()
                 
-    return render_template('forgot_password.html')
+    return render_template('auth/forgot_password.html')
 
 
 @app.route('/verify-reset-otp', methods=['GET', 'POST'])
@@ -2066,33 +1805,28 @@ def verify_reset_otp():
         email = request.form.get('email', '')
         otp = request.form.get('otp', '')
         
-        conn = None
-        try:
-            conn = get_db_connection()
-            # Check latest OTP for this email
-            record = conn.execute('SELECT * FROM password_resets WHERE email = ? ORDER BY created_at DESC LIMIT 1', (email,)).fetchone()
-            
-            if record and record['otp'] == otp:
-                # Check expiry (10 mins)
-                otp_time = datetime.strptime(record['created_at'], '%Y-%m-%d %H:%M:%S')
-                if (datetime.utcnow() - otp_time).total_seconds() > 600:
-                    flash('OTP has expired! Please request a new one.', 'danger')
-                    return redirect(url_for('forgot_password'))
+        # Latest OTP for this email; the store drops it after 10 minutes
+        record = ephemeral_store.get('password_reset', email)
 
-                # Valid OTP - Single use enforcement: delete the record
-                conn.execute('DELETE FROM password_resets WHERE id = ?', (record['id'],))
-                conn.commit()
-                
-                session['reset_email'] = email
-                flash('OTP Verified! Set your new password.', 'success')
-                return redirect(url_for('reset_password_final'))
-            else:
-                flash('Invalid OTP!', 'danger')
-        finally:
-            if conn:
-                conn.close()
+        if record is None:
+            flash('OTP has expired! Please request a new one.', 'danger')
+            return redirect(url_for('forgot_password'))
+
+        if record['otp'] == otp:
+            # Valid OTP - Single use enforcement: remove it
+            ephemeral_store.pop('password_reset', email)
+
+            session['reset_email'] = email
+            flash('OTP Verified! Set your new password.', 'success')
+            return redirect(url_for('reset_password_final'))
+        elif ephemeral_store.attempt('password_reset', email) >= ephemeral.MAX_ATTEMPTS:
+            ephemeral_store.pop('password_reset', email)
+            flash('Too many wrong attempts! Please request a new OTP.', 'danger')
+            return redirect(url_for('forgot_password'))
+        else:
+            flash('Invalid OTP!', 'danger')
                 
-    return render_template('verify_otp.html', email=email, action_url='/verify-reset-otp')
+    return render_template('auth/verify_otp.html', email=email, action_url='/verify-reset-otp')
 
 @app.route('/reset-password-final', methods=['GET', 'POST'])
 def reset_password_final():
@@ -2105,13 +1839,13 @@ def reset_password_final():
         
         if password != confirm_password:
             flash('Passwords do not match!', 'warning')
-            return render_template('reset_password_final.html')
+            return render_template('auth/reset_password_final.html')
             
         conn = None
         try:
             conn = get_db_connection()
             email = session['reset_email']
-            password_hash = generate_password_hash(password)
+            password_hash = passwords.hash_password(password)
             
             conn.execute('UPDATE users SET password = ? WHERE email = ?', (password_hash, email))
             conn.commit()
@@ -2119,11 +1853,13 @@ def reset_password_final():
             session.pop('reset_email', None)
             flash('Password reset successful! Please login.', 'success')
             return redirect(url_for('login'))
+        except passwords.PasswordServiceBusy as e:
+            flash(str(e), 'warning')
         finally:
             if conn:
                 conn.close()
                 
-    return render_template('reset_password_final.html')
+    return render_template('auth/reset_password_final.html')
 
 # --- PASSWORD CHANGE ROUTES ---
 
@@ -2153,11 +1889,11 @@ def change_password():
             conn = get_db_connection()
             user = conn.execute('SELECT password FROM users WHERE id = ?', (current_user.id,)).fetchone()
 
-            if not check_password_hash(user['password'], old_password):
+            if not passwords.verify_password(user['password'], old_password):
                 flash('Old password is incorrect!', 'danger')
                 return render_template('auth/change_password.html')
 
-            new_password_hash = generate_password_hash(new_password)
+            new_password_hash = passwords.hash_password(new_password)
             conn.execute('UPDATE users SET password = ? WHERE id = ?',
                         (new_password_hash, current_user.id))
             conn.commit()
@@ -2201,16 +1937,17 @@ def complete_profile(user_id):
                     filename = secure_filename(f"{current_user.role}_{user_id}_{datetime.now().timestamp()}.{file.filename.rsplit('.', 1)[1].lower()}")
                     file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
                     profile_pic = f"/static/uploads/{filename}"
-                    conn.execute('UPDATE users SET profile_pic = ? WHERE id = ?', (profile_pic, user_id))
+                    conn.execute('UPDATE users SET profile_pic = ?, version = version + 1 WHERE id = ?', (profile_pic, user_id))
 
             # Update common fields
             name = request.form.get('name', '').strip()
             phone = request.form.get('phone', '').strip()
 
             if name and phone:
-                conn.execute('UPDATE users SET name = ?, phone = ? WHERE id = ?', (name, phone, user_id))
+                conn.execute('UPDATE users SET name = ?, phone = ?, version = version + 1 WHERE id = ?', (name, phone, user_id))
 
             conn.commit()
+            user_cache.invalidate(user_id)
             flash('Profile completed successfully!', 'success')
 
             if current_user.role == 'student':
@@ -2250,10 +1987,11 @@ def verify_user(user_id, action):
             conn.execute('UPDATE users SET is_approved = 1 WHERE id = ?', (user_id,))
             flash('User verified successfully!', 'success')
         elif action == 'block':
-            conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
+            remove_user_account(user_id)
             flash('User blocked/removed!', 'warning')
 
         conn.commit()
+        user_cache.invalidate(user_id)
         return redirect(url_for('admin_view_users', role='student'))
 
     except Exception as e:
@@ -2604,45 +2342,23 @@ def download_database(db_type):
 
 # --- USER DELETION ROUTES ---
 
-@app.route('/api/delete-user/<int:user_id>', methods=['POST'])
-@login_required
-def delete_user(user_id):
-    """Delete a user and all their data from the database"""
-    if current_user.role != 'admin':
-        return jsonify({'error': 'Unauthorized: Only admins can delete users'}), 403
-
-    try:
-        conn = get_db_connection()
+def remove_user_account(user_id):
+    """
+    Delete a user and every row keyed on them in one transaction, then drop
+    them from the in-memory indexes and caches (ANN lists, connection graph,
+    result and identity caches). Every admin delete/block/reject goes
+    through here.
+    """
+    with transaction() as conn:
         c = conn.cursor()
-
-        # Get user details first for logging
-        user = c.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
-
-        if not user:
-            conn.close()
-            return jsonify({'error': 'User not found'}), 404
-
-        # PROTECTION: Prevent deletion of super admin account
-        if user['email'] == 'admindbit195@college.edu':
-            conn.close()
-            return jsonify({'error': 'Cannot delete the Super Admin account. This account is protected.'}), 403
-
-        user_role = user['role']
-        user_name = user['name']
-        user_email = user['email']
-
-        print(f"[DELETE DEBUG] Starting deletion for User ID: {user_id}, Role: {user_role}")
-
-        # Delete from profile tables first (cascading)
-        if user_role == 'student':
-            result = c.execute('DELETE FROM student_profile WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] student_profile rows deleted: {result.rowcount}")
-        elif user_role == 'alumni':
-            result = c.execute('DELETE FROM alumni_profile WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] alumni_profile rows deleted: {result.rowcount}")
-        elif user_role == 'faculty':
-            result = c.execute('DELETE FROM faculty_profile WHERE user_id = ?', (user_id,))
-            print(f"[DELETE DEBUG] faculty_profile rows deleted: {result.rowcount}")
+        # Profile tables first (cascading)
+        for table in ('student_profile', 'alumni_profile', 'faculty_profile'):
+            result = c.execute(f'DELETE FROM {table} WHERE user_id = ?', (user_id,))
+            if result.rowcount:
+                print(f"[DELETE DEBUG] {table} rows deleted: {result.rowcount}")
+        c.execute('DELETE FROM profile_embeddings WHERE user_id = ?', (user_id,))
+        skill_index.delete_user(conn, user_id)
+        recommendation_store.delete_user(conn, user_id)
 
         # Delete from alumni_meet_registration (can be deleted for any user)
         result_amr = c.execute('DELETE FROM alumni_meet_registration WHERE user_id = ?', (user_id,))
@@ -2650,7 +2366,8 @@ def delete_user(user_id):
 
         # Delete from registration_log (can be deleted for any user)
         try:
-            result_reglog = c.execute('DELETE FROM registration_log WHERE user_id = ?', (user_id,))
+            with conn.savepoint():
+                result_reglog = c.execute('DELETE FROM registration_log WHERE user_id = ?', (user_id,))
             print(f"[DELETE DEBUG] registration_log rows deleted: {result_reglog.rowcount}")
         except Exception as e:
             print(f"[DELETE DEBUG] registration_log table error: {e}")
@@ -2660,7 +2377,10 @@ def delete_user(user_id):
         print(f"[DELETE DEBUG] connection_requests rows deleted: {result1.rowcount}")
 
         try:
-            result2 = c.execute('DELETE FROM connections WHERE user_id_1 = ? OR user_id_2 = ?', (user_id, user_id))
+            with conn.savepoint():
+                result2 = c.execute('DELETE FROM connections WHERE user_id_1 = ? OR user_id_2 = ?', (user_id, user_id))
+                if result2.rowcount:
+                    note_connections_deleted(conn)
             print(f"[DELETE DEBUG] connections rows deleted: {result2.rowcount}")
         except Exception as e:
             print(f"[DELETE DEBUG] connections table error (may not exist or different schema): {e}")
@@ -2668,19 +2388,22 @@ def delete_user(user_id):
 
         # Delete from other related tables (if they exist)
         try:
-            result3 = c.execute('DELETE FROM posts WHERE user_id = ?', (user_id,))
+            with conn.savepoint():
+                result3 = c.execute('DELETE FROM posts WHERE user_id = ?', (user_id,))
             print(f"[DELETE DEBUG] posts rows deleted: {result3.rowcount}")
         except Exception as e:
             print(f"[DELETE DEBUG] posts table error (may not exist): {e}")
 
         try:
-            result4 = c.execute('DELETE FROM comments WHERE user_id = ?', (user_id,))
+            with conn.savepoint():
+                result4 = c.execute('DELETE FROM comments WHERE user_id = ?', (user_id,))
             print(f"[DELETE DEBUG] comments rows deleted: {result4.rowcount}")
         except Exception as e:
             print(f"[DELETE DEBUG] comments table error (may not exist): {e}")
 
         try:
-            result5 = c.execute('DELETE FROM likes WHERE user_id = ?', (user_id,))
+            with conn.savepoint():
+                result5 = c.execute('DELETE FROM likes WHERE user_id = ?', (user_id,))
             print(f"[DELETE DEBUG] likes rows deleted: {result5.rowcount}")
         except Exception as e:
             print(f"[DELETE DEBUG] likes table error (may not exist): {e}")
@@ -2689,8 +2412,43 @@ def delete_user(user_id):
         result6 = c.execute('DELETE FROM users WHERE id = ?', (user_id,))
         print(f"[DELETE DEBUG] users rows deleted: {result6.rowcount}")
 
-        conn.commit()
+    ann_index.remove(user_id)
+    connection_graph.remove_user(user_id)
+    result_cache.user_removed(user_id)
+    user_cache.invalidate(user_id)
+
+
+@app.route('/api/delete-user/<int:user_id>', methods=['POST'])
+@login_required
+def delete_user(user_id):
+    """Delete a user and all their data from the database"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized: Only admins can delete users'}), 403
+
+    try:
+        conn = get_db_connection()
+        c = conn.cursor()
+
+        # Get user details first for logging
+        user = c.execute('SELECT * FROM users WHERE id = ?', (user_id,)).fetchone()
+
+        if not user:
+            conn.close()
+            return jsonify({'error': 'User not found'}), 404
+
+        # PROTECTION: Prevent deletion of super admin account
+        if user['email'] == 'admindbit195@college.edu':
+            conn.close()
+            return jsonify({'error': 'Cannot delete the Super Admin account. This account is protected.'}), 403
+
+        user_role = user['role']
+        user_name = user['name']
+        user_email = user['email']
+
+        print(f"[DELETE DEBUG] Starting deletion for User ID: {user_id}, Role: {user_role}")
+
         conn.close()
+        remove_user_account(user_id)
 
         # Log the deletion
         print(f"[ADMIN DELETE] ✅ Successfully deleted User ID: {user_id}, Name: {user_name}, Email: {user_email}, Role: {user_role}")
@@ -2732,7 +2490,7 @@ def admin_jobs():
     active_jobs = c.execute('SELECT COUNT(*) FROM jobs WHERE is_active = 1').fetchone()[0]
     
     today = datetime.now().strftime('%Y-%m-%d')
-    expired_jobs = c.execute('SELECT COUNT(*) FROM jobs WHERE deadline < ? AND deadline != "" AND deadline IS NOT NULL', (today,)).fetchone()[0]
+    expired_jobs = c.execute("SELECT COUNT(*) FROM jobs WHERE deadline < ? AND deadline != '' AND deadline IS NOT NULL", (today,)).fetchone()[0]
     
     stats = {
         'total': total_jobs,
@@ -2762,6 +2520,7 @@ def admin_toggle_job(job_id):
     c.execute('UPDATE jobs SET is_active = ? WHERE id = ?', (new_status, job_id))
     conn.commit()
     conn.close()
+    result_cache.jobs_changed()
     
     return jsonify({'success': True, 'new_status': new_status})
 
@@ -2852,8 +2611,12 @@ def admin_add_job():
             apply_method, apply_link, openings, selection_process, category,
             target_role, skill_level, current_user.id, logo_path, 'Open'
         ))
+        job_id = c.lastrowid
+        skill_index.set_job_skills(conn, job_id, skills_required)
         conn.commit()
         conn.close()
+        result_cache.jobs_changed()
+        job_matching.refresh_async(job_id)
         
         flash('Job added successfully!', 'success')
         return redirect(url_for('admin_jobs'))
@@ -2942,8 +2705,11 @@ def admin_edit_job(job_id):
             apply_method, apply_link, openings, selection_process, category,
             target_role, skill_level, logo_path, job_status, job_id
         ))
+        skill_index.set_job_skills(conn, job_id, job['required_skills'], skills_required)
         conn.commit()
         conn.close()
+        result_cache.jobs_changed()
+        job_matching.refresh_async(job_id)
         flash('Job updated successfully!', 'success')
         return redirect(url_for('admin_jobs'))
         
@@ -2958,9 +2724,12 @@ def admin_delete_job(job_id):
         
     conn = get_db_connection()
     c = conn.cursor()
+    skill_index.delete_job(conn, job_id)
+    job_matching.delete_job(conn, job_id)
     c.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
     conn.commit()
     conn.close()
+    result_cache.jobs_changed()
     
     flash('Job deleted successfully!', 'success')
     return redirect(url_for('admin_jobs'))
@@ -3063,7 +2832,7 @@ def upgrade_to_alumni():
                 return render_template('upgrade_to_alumni.html', profile=student_profile)
 
             # Update user role
-            conn.execute('UPDATE users SET role = ? WHERE id = ?', ('alumni', current_user.id))
+            conn.execute('UPDATE users SET role = ?, version = version + 1 WHERE id = ?', ('alumni', current_user.id))
 
             # Create alumni profile
             conn.execute('''INSERT INTO alumni_profile
@@ -3072,8 +2841,16 @@ def upgrade_to_alumni():
                 (current_user.id, student_profile['enrollment_no'],
                  student_profile['department'], student_profile['degree'],
                  pass_year, company_name, designation))
+            recommendation_store.log_change(conn, current_user.id, 'profile')
 
             conn.commit()
+            user_cache.invalidate(current_user.id)
+            result_cache.profile_changed(current_user.id)
+            # Same profile vector, now searched in the alumni partition
+            if ann_index.enabled:
+                stored = embeddings.load_vectors([current_user.id]).get(current_user.id)
+                if stored is not None:
+                    ann_index.upsert(current_user.id, 'alumni', stored[1])
 
             flash('Successfully upgraded to Alumni! Your role has been changed.', 'success')
             return redirect(url_for('alumni_profile', user_id=current_user.id))
@@ -3243,7 +3020,7 @@ def send_connection_request():
         c = conn.cursor()
 
         # Check if receiver exists
-        receiver = c.execute('SELECT * FROM users WHERE id = ?', (receiver_id,)).fetchone()
+        receiver = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (receiver_id,)).fetchone()
         if not receiver:
             conn.close()
             return jsonify({'error': 'Recipient not found'}), 404
@@ -3280,7 +3057,11 @@ def send_connection_request():
                      ('accepted', receiver_id, current_user.id))
             c.execute('INSERT INTO connections (user_id_1, user_id_2) VALUES (?, ?)',
                      (min(current_user.id, receiver_id), max(current_user.id, receiver_id)))
+            recommendation_store.log_change(conn, current_user.id, 'connection')
+            recommendation_store.log_change(conn, receiver_id, 'connection')
             conn.commit()
+            connection_graph.add_connection(current_user.id, receiver_id)
+            result_cache.connections_changed(current_user.id, receiver_id)
 
             # Send email to receiver about mutual connection
             try:
@@ -3304,6 +3085,7 @@ def send_connection_request():
         ''', (current_user.id, receiver_id))
 
         conn.commit()
+        result_cache.connections_changed(current_user.id, receiver_id)
 
         # Send email notification to receiver
         try:
@@ -3334,7 +3116,7 @@ def accept_connection_request(sender_id):
         c = conn.cursor()
 
         # Get sender details for email
-        sender = c.execute('SELECT * FROM users WHERE id = ?', (sender_id,)).fetchone()
+        sender = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (sender_id,)).fetchone()
 
         # Update request status
         c.execute('''
@@ -3348,8 +3130,12 @@ def accept_connection_request(sender_id):
             INSERT INTO connections (user_id_1, user_id_2)
             VALUES (?, ?)
         ''', (min(sender_id, current_user.id), max(sender_id, current_user.id)))
+        recommendation_store.log_change(conn, sender_id, 'connection')
+        recommendation_store.log_change(conn, current_user.id, 'connection')
 
         conn.commit()
+        connection_graph.add_connection(sender_id, current_user.id)
+        result_cache.connections_changed(sender_id, current_user.id)
 
         # Send email to sender about acceptance
         try:
@@ -3381,7 +3167,7 @@ def reject_connection_request(sender_id):
         c = conn.cursor()
 
         # Get sender details for email
-        sender = c.execute('SELECT * FROM users WHERE id = ?', (sender_id,)).fetchone()
+        sender = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (sender_id,)).fetchone()
 
         # Update request status
         c.execute('''
@@ -3391,6 +3177,7 @@ def reject_connection_request(sender_id):
         ''', (sender_id, current_user.id))
 
         conn.commit()
+        result_cache.connections_changed(sender_id, current_user.id)
 
         # Send email to sender about rejection
         try:
@@ -3997,9 +3784,13 @@ def post_job():
             logo_path, category, deadline,
             work_mode, eligible_branch, experience_required, employment_type
         ))
+        job_id = c.lastrowid
+        skill_index.set_job_skills(conn, job_id, skills)
         conn.commit()
         conn.close()
-        
+        result_cache.jobs_changed()
+        job_matching.refresh_async(job_id)
+
         flash('Job posted successfully! It will now be recommended to relevant students.', 'success')
         return redirect(url_for('dashboard_alumni'))
         
@@ -4023,7 +3814,7 @@ def list_jobs():
     ''').fetchall()
     
     # Use modular recommendation logic
-    recommended = get_recommended_jobs(current_user)
+    recommended = result_cache.recommended_jobs(current_user)
     conn.close()
     
     if current_user.role == 'alumni':
@@ -4088,13 +3879,7 @@ def reject_user(user_id):
         
     conn = get_db_connection()
     try:
-        # Delete user and their profile (profile tables have CASCADE or we manually delete if needed)
-        # Based on schema, we might need manual delete for profiles if not CASCADE
-        conn.execute('DELETE FROM student_profile WHERE user_id = ?', (user_id,))
-        conn.execute('DELETE FROM alumni_profile WHERE user_id = ?', (user_id,))
-        conn.execute('DELETE FROM faculty_profile WHERE user_id = ?', (user_id,))
-        conn.execute('DELETE FROM users WHERE id = ?', (user_id,))
-        conn.commit()
+        remove_user_account(user_id)
         return jsonify({'success': True})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -4117,10 +3902,45 @@ def admin_stats():
         return redirect(url_for('home'))
     return render_template('admin/admin_stats.html')
 
-if __name__ == '__main__':
-    with app.app_context():
-        init_db()
+@app.route('/admin/slow-queries')
+@login_required
+def admin_slow_queries():
+    if current_user.role != 'admin':
+        flash('Access denied!', 'danger')
+        return redirect(url_for('home'))
+    groups = slow_queries.aggregate(slow_queries.load_entries())
+    return render_template('admin/slow_queries.html',
+                           groups=groups,
+                           threshold=app.config.get('SLOW_QUERY_MS'),
+                           log_path=app.config.get('SLOW_QUERY_LOG'))
+
+@app.route('/admin/cache-stats')
+@login_required
+def admin_cache_stats():
+    """Result cache, materialised recommendation and user cache counters, for sizing"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify({'result_cache': result_cache.stats(),
+                    'materialized_recommendations': recommendation_store.stats(),
+                    'user_cache': user_cache.stats()})
+
+@app.route('/admin/password-hashing')
+@login_required
+def admin_password_hashing():
+    """Hashing pool counters and latency percentiles"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify(passwords.stats())
 
+@app.route('/admin/janitor')
+@login_required
+def admin_janitor():
+    """Janitor runs and the last pass's rows reclaimed / seconds per table"""
+    if current_user.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify(janitor.stats())
+
+if __name__ == '__main__':
     # Import and register messaging blueprint
     from routes.messaging_routes import messaging_bp
     from routes.websocket_routes import setup_websocket_handlers
@@ -4143,4 +3963,13 @@ if __name__ == '__main__':
     except Exception as e:
         print(f"Warning: routes blueprint error: {e}")
 
+    # Serving process: warm the recommendation model, ANN index and connection
+    # graph in the background. Skip the debug reloader's watcher process, which
+    # never serves requests.
+    if not app.config['DEBUG'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        from models.recommendation import ai_engine
+        ai_engine.start_loading()
+        ann_index.is_ready()
+        connection_graph.is_ready()
+
     socketio.run(app, debug=app.config['DEBUG'], host='0.0.0.0', port=5000, allow_unsafe_werkzeug=True)
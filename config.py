@@ -8,6 +8,73 @@ class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
     DEBUG = False
     DB_NAME = os.getenv('DB_NAME', 'data/college_pro.db')
+    # postgres:// URL switches the app to the pooled PostgreSQL backend
+    DATABASE_URL = os.getenv('DATABASE_URL')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 16))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 20.0))
+    DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 256))
+    # Apply pending schema migrations at boot (otherwise boot only checks the version)
+    AUTO_MIGRATE = os.getenv('AUTO_MIGRATE', 'False') == 'True'
+    # Per-request SQL counts/timings (database/query_stats.py)
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'False') == 'True'
+    SQL_DEBUG_HEADERS = os.getenv('SQL_DEBUG_HEADERS', 'False') == 'True'
+    SQL_QUERY_BUDGET = int(os.getenv('SQL_QUERY_BUDGET', 25))
+    SQL_REPEAT_THRESHOLD = int(os.getenv('SQL_REPEAT_THRESHOLD', 5))
+    # Statements slower than this (ms) go to the rotating slow-query log; 0 disables
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 100))
+    SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+    SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024))
+    SLOW_QUERY_LOG_BACKUPS = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', 5))
+    # Route hot SQLite writes through one group-committing writer thread
+    WRITE_QUEUE = os.getenv('WRITE_QUEUE', 'True') == 'True'
+    WRITE_QUEUE_MAX_BATCH = int(os.getenv('WRITE_QUEUE_MAX_BATCH', 64))
+    WRITE_QUEUE_TIMEOUT = float(os.getenv('WRITE_QUEUE_TIMEOUT', 30.0))
+    # Serve stored recommendations (models/recommendation_store.py); rows older
+    # than MAX_AGE seconds are scored live instead
+    RECOMMENDATIONS_MATERIALIZED = os.getenv('RECOMMENDATIONS_MATERIALIZED', 'True') == 'True'
+    RECOMMENDATIONS_MAX_AGE = float(os.getenv('RECOMMENDATIONS_MAX_AGE', 3600))
+    RECOMMENDATIONS_REFRESH_INTERVAL = float(os.getenv('RECOMMENDATIONS_REFRESH_INTERVAL', 30))
+    # Per-user recommendation/job-match cache (models/result_cache.py); set
+    # RESULT_CACHE_SHARED_PATH to share entries between workers on one host
+    RESULT_CACHE = os.getenv('RESULT_CACHE', 'True') == 'True'
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', 10000))
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', 300))
+    RESULT_CACHE_SHARED_PATH = os.getenv('RESULT_CACHE_SHARED_PATH')
+    RESULT_CACHE_LOCAL_TTL = float(os.getenv('RESULT_CACHE_LOCAL_TTL', 5))
+    # Collaborative-filtering points from factors trained offline
+    # (scripts/train_collaborative.py -> models/collaborative.py)
+    COLLABORATIVE_FILTERING = os.getenv('COLLABORATIVE_FILTERING', 'True') == 'True'
+    COLLABORATIVE_FACTORS_PATH = os.getenv('COLLABORATIVE_FACTORS_PATH', 'data/collaborative_factors.npz')
+    COLLABORATIVE_POINTS = int(os.getenv('COLLABORATIVE_POINTS', 5))
+    # load_user identity cache (models/identity_cache.py): entries are trusted for
+    # USER_CACHE_TTL seconds, then revalidated against users.version
+    USER_CACHE = os.getenv('USER_CACHE', 'True') == 'True'
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 5000))
+    USER_CACHE_TTL = float(os.getenv('USER_CACHE_TTL', 15))
+    # Password hashing in a bounded process pool (models/passwords.py). The
+    # method is the cost; logins rehash hashes made with an older one
+    PASSWORD_HASH_POOL = os.getenv('PASSWORD_HASH_POOL', 'True') == 'True'
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE = int(os.getenv('PASSWORD_HASH_QUEUE', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    # Pending registrations / OTPs (database/ephemeral.py): 'database' (shared by
+    # every worker and instance) or 'memory' (single process only); a path puts
+    # them in a separate SQLite file shared by the workers on one host
+    EPHEMERAL_STORE = os.getenv('EPHEMERAL_STORE', 'database')
+    EPHEMERAL_STORE_PATH = os.getenv('EPHEMERAL_STORE_PATH')
+    # Background janitor (database/janitor.py): batched purges of expired rows,
+    # then PRAGMA optimize / incremental vacuum, and ANALYZE once a day
+    JANITOR = os.getenv('JANITOR', 'True') == 'True'
+    JANITOR_INTERVAL = float(os.getenv('JANITOR_INTERVAL', 3600))
+    JANITOR_BATCH_SIZE = int(os.getenv('JANITOR_BATCH_SIZE', 500))
+    JANITOR_BATCH_PAUSE = float(os.getenv('JANITOR_BATCH_PAUSE', 0.05))
+    JANITOR_ANALYZE_INTERVAL = float(os.getenv('JANITOR_ANALYZE_INTERVAL', 86400))
+    JANITOR_VACUUM_PAGES = int(os.getenv('JANITOR_VACUUM_PAGES', 1000))
+    JANITOR_OTP_DAYS = float(os.getenv('JANITOR_OTP_DAYS', 1))
+    JANITOR_DELETED_MESSAGE_DAYS = float(os.getenv('JANITOR_DELETED_MESSAGE_DAYS', 30))
+    # Rejected requests also feed collaborative filtering; keep a few months
+    JANITOR_REJECTED_REQUEST_DAYS = float(os.getenv('JANITOR_REJECTED_REQUEST_DAYS', 180))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
@@ -23,6 +90,8 @@ class DevelopmentConfig(Config):
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
     SQLALCHEMY_DATABASE_URI = 'sqlite:///data/alumni.db'
     SESSION_COOKIE_SECURE = False
+    SQL_INSTRUMENTATION = os.getenv('SQL_INSTRUMENTATION', 'True') == 'True'
+    SQL_DEBUG_HEADERS = os.getenv('SQL_DEBUG_HEADERS', 'True') == 'True'
 
 class ProductionConfig(Config):
     """Production configuration"""
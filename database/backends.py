@@ -0,0 +1,270 @@
+"""
+Database backends for the shared db_utils engine.
+
+The app is written against SQLite (`?` placeholders, sqlite3.Row access,
+INSERT OR IGNORE, sqlite3.* exceptions). SQLiteBackend passes all of that
+straight through. PostgresBackend runs the same call sites on PostgreSQL:
+statements are rewritten by a small dialect shim, rows come back as Row
+objects that behave like sqlite3.Row, and driver errors are re-raised as
+the sqlite3 exception classes the handlers already catch.
+
+The backend is picked from the database target: a postgres:// or
+postgresql:// URL selects Postgres, anything else is a SQLite file path.
+"""
+
+import re
+import sqlite3
+from datetime import date, datetime
+from functools import lru_cache
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    PSYCOPG_AVAILABLE = True
+except ImportError:
+    PSYCOPG_AVAILABLE = False
+
+
+# ==================== ROWS ====================
+
+class Row:
+    """sqlite3.Row look-alike: index, key and dict(row) access"""
+
+    __slots__ = ('_keys', '_values')
+
+    def __init__(self, keys, values):
+        self._keys = keys
+        self._values = values
+
+    def keys(self):
+        return list(self._keys)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return self._values[key]
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise IndexError(f"No item with that key: {key}")
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return self._keys == other._keys and self._values == other._values
+        return NotImplemented
+
+    def __repr__(self):
+        return f"<Row {dict(zip(self._keys, self._values))}>"
+
+
+def _to_sqlite_value(value):
+    # SQLite hands timestamps back as text; keep that contract for callers
+    # that do datetime.fromisoformat()/strptime() on column values.
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return value
+
+
+# ==================== SQLITE ====================
+
+class SQLiteBackend:
+    name = 'sqlite'
+    Error = sqlite3.Error
+
+    def connect(self, target, statement_cache_size):
+        # cached_statements keeps prepared statements warm on the long-lived connection
+        raw = sqlite3.connect(target, timeout=20.0, check_same_thread=False,
+                              cached_statements=statement_cache_size)
+        raw.row_factory = sqlite3.Row
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute("PRAGMA synchronous=NORMAL")
+        return raw
+
+    def ping(self, raw):
+        raw.execute("SELECT 1").fetchone()
+
+    def in_transaction(self, raw):
+        return raw.in_transaction
+
+    def translate(self, sql, has_params):
+        return sql, False
+
+    def execute(self, raw_cursor, sql, params):
+        if params is None:
+            return raw_cursor.execute(sql)
+        return raw_cursor.execute(sql, params)
+
+    def executemany(self, raw_cursor, sql, seq_of_params):
+        return raw_cursor.executemany(sql, seq_of_params)
+
+    def wrap_row(self, raw_cursor, row):
+        return row
+
+
+# ==================== POSTGRES ====================
+
+# Conflict targets for INSERT OR REPLACE, which Postgres needs spelled out
+UPSERT_KEYS = {
+    'student_profile': 'user_id',
+    'alumni_profile': 'user_id',
+    'faculty_profile': 'user_id',
+    'profile_embeddings': 'user_id',
+    'recommendation_status': 'user_id',
+    'job_embeddings': 'job_id',
+}
+
+# Tables without an `id` column (no RETURNING id for lastrowid)
+NO_ID_TABLES = {'schema_version', 'profile_embeddings', 'user_skills', 'job_skills',
+                'user_recommendations', 'recommendation_status', 'job_embeddings', 'ephemeral_entries',
+                'change_counters'}
+
+_STRING_RE = re.compile(r"('(?:[^']|'')*')")
+_INSERT_OR_RE = re.compile(r'^\s*INSERT\s+OR\s+(IGNORE|REPLACE)\s+INTO\s+', re.IGNORECASE)
+_INSERT_TABLE_RE = re.compile(r'^\s*INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)', re.IGNORECASE)
+
+_DDL_REWRITES = [
+    (re.compile(r'INTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT', re.IGNORECASE), 'SERIAL PRIMARY KEY'),
+    (re.compile(r'\bBOOLEAN\s+DEFAULT\b', re.IGNORECASE), 'INTEGER DEFAULT'),
+    (re.compile(r'\bBLOB\b', re.IGNORECASE), 'BYTEA'),
+    (re.compile(r'\bADD\s+COLUMN\s+(?!IF\s)', re.IGNORECASE), 'ADD COLUMN IF NOT EXISTS '),
+]
+_LIKE_RE = re.compile(r'\bLIKE\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def translate_for_postgres(sql, has_params):
+    """
+    Rewrite a SQLite statement for Postgres.
+    Returns (sql, returns_id) where returns_id means RETURNING id was added
+    so the cursor can serve lastrowid.
+    """
+    stripped = sql.lstrip()
+    head = stripped[:16].upper()
+    if head.startswith('PRAGMA'):
+        return None, False
+
+    conflict = ''
+    match = _INSERT_OR_RE.match(sql)
+    if match:
+        sql = _INSERT_OR_RE.sub('INSERT INTO ', sql, count=1)
+        table_match = _INSERT_TABLE_RE.match(sql)
+        key = UPSERT_KEYS.get(table_match.group(1).lower()) if table_match else None
+        if match.group(1).upper() == 'REPLACE' and key:
+            cols = [c.strip() for c in table_match.group(2).split(',') if c.strip() and c.strip() != key]
+            updates = ', '.join(f"{c} = EXCLUDED.{c}" for c in cols)
+            conflict = f" ON CONFLICT ({key}) DO UPDATE SET {updates}" if updates else f" ON CONFLICT ({key}) DO NOTHING"
+        else:
+            conflict = ' ON CONFLICT DO NOTHING'
+
+    # Rewrite everything outside string literals
+    parts = _STRING_RE.split(sql)
+    for i in range(0, len(parts), 2):
+        chunk = parts[i]
+        if has_params:
+            chunk = chunk.replace('%', '%%').replace('?', '%s')
+        chunk = _LIKE_RE.sub('ILIKE', chunk)
+        for pattern, repl in _DDL_REWRITES:
+            chunk = pattern.sub(repl, chunk)
+        parts[i] = chunk
+    if has_params:
+        for i in range(1, len(parts), 2):
+            parts[i] = parts[i].replace('%', '%%')
+    sql = ''.join(parts).rstrip().rstrip(';')
+
+    returns_id = False
+    table_match = _INSERT_TABLE_RE.match(sql)
+    if table_match and 'RETURNING' not in sql.upper() and table_match.group(1).lower() not in NO_ID_TABLES:
+        sql += conflict + ' RETURNING id'
+        returns_id = True
+    else:
+        sql += conflict
+    return sql, returns_id
+
+
+def _translate_error(e):
+    if isinstance(e, psycopg2.IntegrityError):
+        return sqlite3.IntegrityError(str(e))
+    if isinstance(e, (psycopg2.OperationalError, psycopg2.ProgrammingError)):
+        return sqlite3.OperationalError(str(e))
+    return sqlite3.DatabaseError(str(e))
+
+
+class PostgresBackend:
+    name = 'postgres'
+    Error = sqlite3.Error
+
+    def connect(self, target, statement_cache_size):
+        if not PSYCOPG_AVAILABLE:
+            raise RuntimeError("DATABASE_URL points at Postgres but psycopg2 is not installed")
+        if target.startswith('postgres://'):
+            target = target.replace('postgres://', 'postgresql://', 1)
+        try:
+            return psycopg2.connect(target)
+        except psycopg2.Error as e:
+            raise _translate_error(e) from e
+
+    def ping(self, raw):
+        if raw.closed:
+            raise sqlite3.OperationalError("connection closed")
+        cur = raw.cursor()
+        try:
+            cur.execute("SELECT 1")
+            cur.fetchone()
+        except psycopg2.Error as e:
+            raise _translate_error(e) from e
+        finally:
+            cur.close()
+        # The probe opened a transaction; don't leave it dangling
+        raw.rollback()
+
+    def in_transaction(self, raw):
+        return raw.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    def translate(self, sql, has_params):
+        return translate_for_postgres(sql, has_params)
+
+    def execute(self, raw_cursor, sql, params):
+        return self._guarded(raw_cursor, sql, lambda: raw_cursor.execute(sql, params if params else None))
+
+    def executemany(self, raw_cursor, sql, seq_of_params):
+        return self._guarded(raw_cursor, sql, lambda: raw_cursor.executemany(sql, seq_of_params))
+
+    def _guarded(self, raw_cursor, sql, run):
+        """
+        Postgres aborts the whole transaction on a failed statement. When the
+        statement opened the transaction there is nothing to keep, so it is
+        reset; otherwise the transaction stays aborted until the caller rolls
+        back. Callers that catch an error and carry on in the same transaction
+        wrap the statement in conn.savepoint() (db_utils).
+        """
+        raw = raw_cursor.connection
+        was_idle = not self.in_transaction(raw)
+        try:
+            run()
+        except psycopg2.Error as e:
+            if was_idle:
+                raw.rollback()
+            raise _translate_error(e) from e
+        return raw_cursor
+
+    def wrap_row(self, raw_cursor, row):
+        if row is None:
+            return None
+        keys = tuple(col[0] for col in raw_cursor.description)
+        return Row(keys, tuple(_to_sqlite_value(v) for v in row))
+
+
+def backend_for(target):
+    """Pick the backend for a DB target (file path or database URL)"""
+    if target.startswith(('postgres://', 'postgresql://')):
+        return PostgresBackend()
+    return SQLiteBackend()
@@ -0,0 +1,322 @@
+"""
+Short-lived state for the OTP flows.
+
+Pending registrations (until the e-mail OTP is confirmed) and password
+reset OTPs used to live in temp_users / password_resets, where every
+register, resend and reset replaced rows and password_resets was never
+pruned. They now live here, keyed by (namespace, key), each entry with its
+own expiry and attempt counter:
+
+    ephemeral_store.put('registration', email, {...}, ttl=REGISTRATION_TTL)
+    entry = ephemeral_store.get('registration', email)      # None once expired
+    if ephemeral_store.attempt('registration', email) > MAX_ATTEMPTS: ...
+    ephemeral_store.pop('registration', email)
+
+Values are JSON-able dicts. Tiers (EPHEMERAL_STORE):
+
+    'database'  one row per entry in ephemeral_entries in the main database
+                (default). Every worker and serverless instance sees the
+                same OTPs; expired rows are dropped on each write.
+    'memory'    an in-process dict with an expiry heap. Only for a single
+                server process: an OTP stored by one worker is invisible to
+                the next.
+
+With EPHEMERAL_STORE_PATH set, entries go to a small SQLite file of their
+own instead, shared by every worker on the host.
+"""
+
+import heapq
+import json
+import sqlite3
+import threading
+import time
+
+from db_utils import get_db_connection, transaction
+from database import write_queue
+
+MAX_ATTEMPTS = 5
+
+_settings = {'tier': 'database', 'path': None}
+
+
+class MemoryStore:
+    """(namespace, key) -> [expires_at, attempts, value], plus an expiry heap"""
+
+    def __init__(self):
+        self._entries = {}
+        self._expiry = []       # (expires_at, namespace, key); stale items are skipped
+        self._lock = threading.Lock()
+
+    def _purge(self, now):
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, namespace, key = heapq.heappop(self._expiry)
+            entry = self._entries.get((namespace, key))
+            if entry is not None and entry[0] == expires_at:
+                del self._entries[(namespace, key)]
+
+    def _live(self, namespace, key, now):
+        entry = self._entries.get((namespace, key))
+        if entry is not None and entry[0] <= now:
+            del self._entries[(namespace, key)]
+            return None
+        return entry
+
+    def put(self, namespace, key, value, ttl):
+        now = time.time()
+        with self._lock:
+            self._purge(now)
+            self._entries[(namespace, key)] = [now + ttl, 0, dict(value)]
+            heapq.heappush(self._expiry, (now + ttl, namespace, key))
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._live(namespace, key, time.time())
+            return dict(entry[2]) if entry else None
+
+    def update(self, namespace, key, fields, reset_attempts=False):
+        """Merge fields into a live entry; False when there is none"""
+        with self._lock:
+            entry = self._live(namespace, key, time.time())
+            if entry is None:
+                return False
+            entry[2].update(fields)
+            if reset_attempts:
+                entry[1] = 0
+            return True
+
+    def attempt(self, namespace, key):
+        """Count one attempt against a live entry; returns the count (0 without an entry)"""
+        with self._lock:
+            entry = self._live(namespace, key, time.time())
+            if entry is None:
+                return 0
+            entry[1] += 1
+            return entry[1]
+
+    def pop(self, namespace, key):
+        with self._lock:
+            entry = self._live(namespace, key, time.time())
+            self._entries.pop((namespace, key), None)
+            return dict(entry[2]) if entry else None
+
+    def stats(self):
+        with self._lock:
+            self._purge(time.time())
+            counts = {}
+            for namespace, _ in self._entries:
+                counts[namespace] = counts.get(namespace, 0) + 1
+        return {'tier': 'memory', 'entries': counts}
+
+
+class SQLiteStore:
+    """The same operations on one table in a separate SQLite file"""
+
+    PURGE_EVERY = 100
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS ephemeral (
+            namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,
+            expires_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (namespace, key))''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_ephemeral_expires ON ephemeral (expires_at)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn):
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = fn(conn)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            conn.execute('DELETE FROM ephemeral WHERE expires_at <= ?', (time.time(),))
+        return result
+
+    def put(self, namespace, key, value, ttl):
+        self._write(lambda conn: conn.execute(
+            'INSERT OR REPLACE INTO ephemeral (namespace, key, value, expires_at, attempts) VALUES (?, ?, ?, ?, 0)',
+            (namespace, key, json.dumps(value), time.time() + ttl)))
+
+    def get(self, namespace, key):
+        row = self._conn().execute(
+            'SELECT value FROM ephemeral WHERE namespace = ? AND key = ? AND expires_at > ?',
+            (namespace, key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, namespace, key, fields, reset_attempts=False):
+        def apply(conn):
+            row = conn.execute('SELECT value FROM ephemeral WHERE namespace = ? AND key = ? AND expires_at > ?',
+                               (namespace, key, time.time())).fetchone()
+            if row is None:
+                return False
+            value = json.loads(row[0])
+            value.update(fields)
+            conn.execute(
+                'UPDATE ephemeral SET value = ?, attempts = CASE WHEN ? THEN 0 ELSE attempts END '
+                'WHERE namespace = ? AND key = ?',
+                (json.dumps(value), 1 if reset_attempts else 0, namespace, key))
+            return True
+        return self._write(apply)
+
+    def attempt(self, namespace, key):
+        def apply(conn):
+            row = conn.execute(
+                'UPDATE ephemeral SET attempts = attempts + 1 WHERE namespace = ? AND key = ? AND expires_at > ? '
+                'RETURNING attempts', (namespace, key, time.time())).fetchone()
+            return row[0] if row else 0
+        return self._write(apply)
+
+    def pop(self, namespace, key):
+        def apply(conn):
+            row = conn.execute(
+                'DELETE FROM ephemeral WHERE namespace = ? AND key = ? RETURNING value, expires_at',
+                (namespace, key)).fetchone()
+            return json.loads(row[0]) if row and row[1] > time.time() else None
+        return self._write(apply)
+
+    def stats(self):
+        rows = self._conn().execute(
+            'SELECT namespace, COUNT(*) FROM ephemeral WHERE expires_at > ? GROUP BY namespace',
+            (time.time(),)).fetchall()
+        return {'tier': 'sqlite', 'path': self.path, 'entries': dict(rows)}
+
+
+def _put_entry(namespace, key, value, expires_at, now):
+    """Write job: upsert one entry and drop the expired ones"""
+    with transaction() as conn:
+        conn.execute('DELETE FROM ephemeral_entries WHERE expires_at <= ?', (now,))
+        conn.execute(
+            'INSERT INTO ephemeral_entries (namespace, key, value, expires_at, attempts) VALUES (?, ?, ?, ?, 0) '
+            'ON CONFLICT (namespace, key) DO UPDATE SET '
+            'value = excluded.value, expires_at = excluded.expires_at, attempts = 0',
+            (namespace, key, value, expires_at))
+
+
+def _update_entry(namespace, key, fields, reset_attempts, now):
+    with transaction() as conn:
+        row = conn.execute('SELECT value FROM ephemeral_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+                           (namespace, key, now)).fetchone()
+        if row is None:
+            return False
+        value = json.loads(row['value'])
+        value.update(fields)
+        conn.execute(
+            'UPDATE ephemeral_entries SET value = ?, attempts = CASE WHEN ? = 1 THEN 0 ELSE attempts END '
+            'WHERE namespace = ? AND key = ?',
+            (json.dumps(value), 1 if reset_attempts else 0, namespace, key))
+        return True
+
+
+def _attempt_entry(namespace, key, now):
+    with transaction() as conn:
+        row = conn.execute(
+            'UPDATE ephemeral_entries SET attempts = attempts + 1 '
+            'WHERE namespace = ? AND key = ? AND expires_at > ? RETURNING attempts',
+            (namespace, key, now)).fetchone()
+        return row['attempts'] if row else 0
+
+
+def _pop_entry(namespace, key, now):
+    with transaction() as conn:
+        row = conn.execute(
+            'DELETE FROM ephemeral_entries WHERE namespace = ? AND key = ? RETURNING value, expires_at',
+            (namespace, key)).fetchone()
+        return json.loads(row['value']) if row and row['expires_at'] > now else None
+
+
+class DatabaseStore:
+    """The same operations on ephemeral_entries in the main database; writes go through the single writer"""
+
+    def put(self, namespace, key, value, ttl):
+        now = time.time()
+        write_queue.run(_put_entry, namespace, key, json.dumps(value), now + ttl, now)
+
+    def get(self, namespace, key):
+        conn = get_db_connection()
+        try:
+            row = conn.execute(
+                'SELECT value FROM ephemeral_entries WHERE namespace = ? AND key = ? AND expires_at > ?',
+                (namespace, key, time.time())).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row['value']) if row else None
+
+    def update(self, namespace, key, fields, reset_attempts=False):
+        return write_queue.run(_update_entry, namespace, key, fields, reset_attempts, time.time())
+
+    def attempt(self, namespace, key):
+        return write_queue.run(_attempt_entry, namespace, key, time.time())
+
+    def pop(self, namespace, key):
+        return write_queue.run(_pop_entry, namespace, key, time.time())
+
+    def stats(self):
+        conn = get_db_connection()
+        try:
+            rows = conn.execute(
+                'SELECT namespace, COUNT(*) AS entries FROM ephemeral_entries WHERE expires_at > ? GROUP BY namespace',
+                (time.time(),)).fetchall()
+        finally:
+            conn.close()
+        return {'tier': 'database', 'entries': {row['namespace']: row['entries'] for row in rows}}
+
+
+class EphemeralStore:
+    """Facade over the configured tier (memory until init_app says otherwise)"""
+
+    def __init__(self):
+        self.tier = MemoryStore()
+
+    def configure(self, tier, path=None):
+        if path:
+            try:
+                self.tier = SQLiteStore(path)
+                return
+            except sqlite3.Error as e:
+                print(f"⚠ Ephemeral store file unavailable ({e}); keeping OTP state in the database")
+                tier = 'database'
+        self.tier = MemoryStore() if tier == 'memory' else DatabaseStore()
+
+    def put(self, namespace, key, value, ttl):
+        self.tier.put(namespace, key, value, ttl)
+
+    def get(self, namespace, key):
+        return self.tier.get(namespace, key)
+
+    def update(self, namespace, key, fields, reset_attempts=False):
+        return self.tier.update(namespace, key, fields, reset_attempts)
+
+    def attempt(self, namespace, key):
+        return self.tier.attempt(namespace, key)
+
+    def pop(self, namespace, key):
+        return self.tier.pop(namespace, key)
+
+    def stats(self):
+        return self.tier.stats()
+
+
+def init_app(app):
+    """Pick the tier from app config (EPHEMERAL_STORE, EPHEMERAL_STORE_PATH)"""
+    _settings['tier'] = app.config.get('EPHEMERAL_STORE', 'database')
+    _settings['path'] = app.config.get('EPHEMERAL_STORE_PATH') or None
+    ephemeral_store.configure(_settings['tier'], _settings['path'])
+
+
+# Shared by the registration and password-reset routes
+ephemeral_store = EphemeralStore()
@@ -0,0 +1,122 @@
+"""
+Declarative index registry.
+
+Indexes are declared per table below and applied by migrations (see
+v005_hot_path_indexes), never by hand. To add or change one: edit the
+registry, then add a new migration that calls apply_indexes(conn).
+scripts/check_query_plans.py asserts the hot queries actually use them.
+
+Lookups already served by a UNIQUE constraint (users.email,
+*_profile.user_id, connections(user_id_1, user_id_2),
+conversations(user_id_1, user_id_2)) rely on SQLite's automatic index
+and are not repeated here.
+"""
+
+
+class Index:
+    def __init__(self, name, table, columns, unique=False):
+        self.name = name
+        self.table = table
+        self.columns = tuple(columns)
+        self.unique = unique
+
+    @property
+    def ddl(self):
+        unique = 'UNIQUE ' if self.unique else ''
+        return f"CREATE {unique}INDEX IF NOT EXISTS {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+    def __repr__(self):
+        return f"<Index {self.name} on {self.table}({', '.join(self.columns)})>"
+
+
+INDEXES = {
+    'users': [
+        Index('idx_users_role', 'users', ['role']),
+        Index('idx_users_name', 'users', ['name']),
+    ],
+    'registration_log': [
+        Index('idx_reglog_role', 'registration_log', ['role']),
+        Index('idx_reglog_date', 'registration_log', ['registered_at']),
+    ],
+    'connections': [
+        # user_id_1 lookups use the UNIQUE(user_id_1, user_id_2) index
+        Index('idx_connections_u2', 'connections', ['user_id_2']),
+    ],
+    'connection_requests': [
+        # Dashboards: incoming pending requests, newest first
+        Index('idx_connreq_receiver_status', 'connection_requests', ['receiver_id', 'status', 'created_at']),
+        Index('idx_connreq_sender_status', 'connection_requests', ['sender_id', 'status']),
+    ],
+    'private_messages': [
+        # Conversation thread, ordered by time
+        Index('idx_pm_pair_created', 'private_messages', ['sender_id', 'receiver_id', 'created_at']),
+        # Unread badges and mark-as-read
+        Index('idx_pm_receiver_read', 'private_messages', ['receiver_id', 'is_read']),
+    ],
+    'public_messages': [
+        Index('idx_pubmsg_hidden_created', 'public_messages', ['is_hidden', 'created_at']),
+    ],
+    'conversations': [
+        Index('idx_conv_u1_last', 'conversations', ['user_id_1', 'last_message_at']),
+        Index('idx_conv_u2_last', 'conversations', ['user_id_2', 'last_message_at']),
+    ],
+    'jobs': [
+        Index('idx_jobs_active_created', 'jobs', ['is_active', 'created_at']),
+        Index('idx_jobs_posted_by', 'jobs', ['posted_by']),
+    ],
+    'job_applications': [
+        Index('idx_jobapp_job', 'job_applications', ['job_id']),
+        Index('idx_jobapp_student', 'job_applications', ['student_id']),
+    ],
+    'user_skills': [
+        # Candidates by skill overlap; (user_id, skill_id) is the primary key
+        Index('idx_user_skills_skill', 'user_skills', ['skill_id', 'user_id']),
+    ],
+    'job_skills': [
+        Index('idx_job_skills_skill', 'job_skills', ['skill_id', 'job_id']),
+    ],
+    'user_recommendations': [
+        # Whose stored list includes a changed/deleted user
+        Index('idx_userrec_candidate', 'user_recommendations', ['candidate_id']),
+    ],
+    'password_resets': [
+        Index('idx_pwreset_email_created', 'password_resets', ['email', 'created_at']),
+    ],
+    'ephemeral_entries': [
+        # Expired-entry sweep on every write
+        Index('idx_ephemeral_expires', 'ephemeral_entries', ['expires_at']),
+    ],
+}
+
+
+# Indexes older databases got from scripts/optimize_db.py that are now
+# redundant (covered by a UNIQUE constraint or a composite index above).
+# They only cost write time, so migrations drop them.
+DROPPED_INDEXES = [
+    'idx_users_email',
+    'idx_connections_u1',
+    'idx_connreq_sender',
+    'idx_connreq_receiver',
+    'idx_connreq_status',
+]
+
+
+def all_indexes():
+    return [index for indexes in INDEXES.values() for index in indexes]
+
+
+def apply_indexes(conn, tables=None):
+    """
+    Create every registered index (optionally only for `tables`) and drop
+    the retired ones. Idempotent.
+    """
+    for name in DROPPED_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    created = []
+    for table, indexes in INDEXES.items():
+        if tables is not None and table not in tables:
+            continue
+        for index in indexes:
+            conn.execute(index.ddl)
+            created.append(index.name)
+    return created
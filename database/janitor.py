@@ -0,0 +1,240 @@
+"""
+Background janitor: expired rows and table hygiene.
+
+Some tables only ever grow: legacy OTP rows (password_resets, temp_users;
+new ones live in database/ephemeral.py), rejected connection requests,
+soft-deleted public messages and private messages both sides deleted.
+Every JANITOR_INTERVAL seconds a background thread purges rows past
+their retention and then tidies the file:
+
+    PRAGMA optimize                  every run (cheap, lets SQLite re-plan)
+    PRAGMA incremental_vacuum(N)     every run, at most JANITOR_VACUUM_PAGES pages
+    ANALYZE                          every JANITOR_ANALYZE_INTERVAL seconds
+
+Deletes run in batches of JANITOR_BATCH_SIZE rows, each batch its own
+short job on the single writer (database/write_queue.py) with a pause in
+between, so regular writes never wait behind one long lock. Retention is
+measured from updated_at (the delete/reject paths stamp it; v014 adds it
+to connection_requests tables that predate it), or created_at for the OTP
+tables.
+
+run_once() returns (and the thread keeps, see /admin/janitor) a report of
+rows reclaimed and seconds spent per table and per step. Incremental
+vacuum needs auto_vacuum=INCREMENTAL, which an existing database only
+gets from a full VACUUM: `python scripts/janitor.py --enable-incremental-vacuum`.
+Each server process runs its own janitor; purges are idempotent. On
+Postgres only the purges and ANALYZE run (autovacuum does the rest).
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from db_utils import get_db_connection, transaction
+from database import write_queue
+
+INTERVAL = 3600.0
+BATCH_SIZE = 500
+BATCH_PAUSE = 0.05
+ANALYZE_INTERVAL = 86400.0
+VACUUM_PAGES = 1000
+
+_settings = {
+    'enabled': False, 'interval': INTERVAL, 'batch_size': BATCH_SIZE, 'batch_pause': BATCH_PAUSE,
+    'analyze_interval': ANALYZE_INTERVAL, 'vacuum_pages': VACUUM_PAGES,
+    'retention_days': {},
+}
+
+
+class Purge:
+    """Rows of `table` matching `where` (with ? = the retention cutoff) are deleted"""
+
+    def __init__(self, table, where, days, config_key):
+        self.table = table
+        self.where = where
+        self.days = days
+        self.config_key = config_key
+
+
+PURGES = [
+    Purge('password_resets', 'created_at < ?', 1, 'JANITOR_OTP_DAYS'),
+    Purge('temp_users', 'created_at < ?', 1, 'JANITOR_OTP_DAYS'),
+    Purge('connection_requests', "status = 'rejected' AND updated_at < ?", 180, 'JANITOR_REJECTED_REQUEST_DAYS'),
+    Purge('public_messages', 'deleted_by IS NOT NULL AND updated_at < ?', 30, 'JANITOR_DELETED_MESSAGE_DAYS'),
+    # A conversation's last_message_id may still point at a message both sides deleted
+    Purge('private_messages',
+          'deleted_by_sender = 1 AND deleted_by_receiver = 1 AND updated_at < ? '
+          'AND id NOT IN (SELECT last_message_id FROM conversations WHERE last_message_id IS NOT NULL)',
+          30, 'JANITOR_DELETED_MESSAGE_DAYS'),
+]
+
+_state = {'last_analyze': 0.0, 'vacuum_warned': False}
+_stats = {'runs': 0, 'last_run': None, 'last_report': None, 'reclaimed': {}}
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def _cutoff(days):
+    # Same text form as CURRENT_TIMESTAMP, so it compares correctly with SQLite's stored strings
+    return (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _delete_batch(table, where, cutoff, limit):
+    """Write job: delete up to `limit` matching rows; returns how many went"""
+    with transaction() as conn:
+        return conn.execute(
+            f'DELETE FROM {table} WHERE id IN (SELECT id FROM {table} WHERE {where} LIMIT ?)',
+            (cutoff, limit)).rowcount
+
+
+def purge(item):
+    """Delete item's expired rows batch by batch. Returns {'rows', 'batches', 'seconds'}."""
+    started = time.perf_counter()
+    days = _settings['retention_days'].get(item.config_key, item.days)
+    cutoff = _cutoff(days)
+    limit = _settings['batch_size']
+    rows = batches = 0
+    while True:
+        deleted = write_queue.run(_delete_batch, item.table, item.where, cutoff, limit)
+        batches += 1
+        rows += max(deleted, 0)
+        if deleted < limit:
+            break
+        time.sleep(_settings['batch_pause'])
+    return {'rows': rows, 'batches': batches, 'retention_days': days,
+            'seconds': round(time.perf_counter() - started, 3)}
+
+
+def _statement_job(sql):
+    # No fetch: ANALYZE returns no result set on Postgres
+    with transaction() as conn:
+        conn.execute(sql)
+
+
+def _vacuum_job(pages):
+    """Write job: free up to `pages` pages; returns (freelist before, after)"""
+    with transaction() as conn:
+        before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+        after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+    return before, after
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, round(time.perf_counter() - started, 3)
+
+
+def hygiene(force_analyze=False):
+    """PRAGMA optimize, incremental vacuum and (when due) ANALYZE. Returns a per-step report."""
+    conn = get_db_connection()
+    try:
+        backend = conn.backend
+        auto_vacuum = conn.execute('PRAGMA auto_vacuum').fetchone()[0] if backend == 'sqlite' else None
+    finally:
+        conn.close()
+
+    report = {}
+    if backend == 'sqlite':
+        _, report['optimize_s'] = _timed(write_queue.run, _statement_job, 'PRAGMA optimize')
+        if auto_vacuum == 2:
+            (before, after), seconds = _timed(write_queue.run, _vacuum_job, _settings['vacuum_pages'])
+            report['vacuum'] = {'pages_freed': before - after, 'free_pages_left': after, 'seconds': seconds}
+        elif not _state['vacuum_warned']:
+            _state['vacuum_warned'] = True
+            print("Janitor: incremental vacuum is off for this database "
+                  "(run python scripts/janitor.py --enable-incremental-vacuum once)")
+
+    now = time.time()
+    if force_analyze or now - _state['last_analyze'] >= _settings['analyze_interval']:
+        _, report['analyze_s'] = _timed(write_queue.run, _statement_job, 'ANALYZE')
+        _state['last_analyze'] = now
+    return report
+
+
+def run_once(force_analyze=False):
+    """One janitor pass. Returns {'tables': {...}, 'hygiene': {...}, 'seconds': ...}."""
+    started = time.perf_counter()
+    tables = {}
+    for item in PURGES:
+        try:
+            tables[item.table] = purge(item)
+        except Exception as e:
+            # A table missing from an old database should not stop the others
+            print(f"Janitor: purge of {item.table} failed: {e}")
+            tables[item.table] = {'error': str(e)}
+    try:
+        hygiene_report = hygiene(force_analyze)
+    except Exception as e:
+        print(f"Janitor: hygiene failed: {e}")
+        hygiene_report = {'error': str(e)}
+
+    report = {'tables': tables, 'hygiene': hygiene_report,
+              'seconds': round(time.perf_counter() - started, 3)}
+    _stats['runs'] += 1
+    _stats['last_run'] = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    _stats['last_report'] = report
+    for table, result in tables.items():
+        _stats['reclaimed'][table] = _stats['reclaimed'].get(table, 0) + result.get('rows', 0)
+    reclaimed = sum(result.get('rows', 0) for result in tables.values())
+    if reclaimed:
+        print(f"✓ Janitor reclaimed {reclaimed} rows in {report['seconds']}s")
+    return report
+
+
+def enable_incremental_vacuum():
+    """Switch an existing SQLite file to auto_vacuum=INCREMENTAL (full VACUUM; run offline)"""
+    conn = get_db_connection()
+    try:
+        if conn.backend != 'sqlite':
+            return False
+        conn.commit()
+        conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.execute('VACUUM')
+        return conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    finally:
+        conn.close()
+
+
+def _run(app):
+    while True:
+        time.sleep(_settings['interval'])
+        try:
+            with app.app_context():
+                run_once()
+        except Exception as e:
+            print(f"Janitor error: {e}")
+
+
+def start(app=None):
+    """Start the background janitor (once per process)"""
+    global _thread
+    if _thread is not None or not _settings['enabled']:
+        return
+    with _thread_lock:
+        if _thread is None:
+            app = app or current_app._get_current_object()
+            _thread = threading.Thread(target=_run, args=(app,), name='janitor', daemon=True)
+            _thread.start()
+
+
+def stats():
+    return dict(_stats, enabled=_settings['enabled'], interval=_settings['interval'])
+
+
+def init_app(app):
+    """Configure from app config (JANITOR_*); the thread starts with the first request"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('JANITOR', True)
+    _settings['interval'] = cfg.get('JANITOR_INTERVAL', INTERVAL)
+    _settings['batch_size'] = cfg.get('JANITOR_BATCH_SIZE', BATCH_SIZE)
+    _settings['batch_pause'] = cfg.get('JANITOR_BATCH_PAUSE', BATCH_PAUSE)
+    _settings['analyze_interval'] = cfg.get('JANITOR_ANALYZE_INTERVAL', ANALYZE_INTERVAL)
+    _settings['vacuum_pages'] = cfg.get('JANITOR_VACUUM_PAGES', VACUUM_PAGES)
+    _settings['retention_days'] = {item.config_key: cfg[item.config_key]
+                                   for item in PURGES if item.config_key in cfg}
+    if _settings['enabled']:
+        app.before_request(lambda: start(app))
@@ -3,28 +3,16 @@ Database helper functions for Alumni Hub Messaging System
 Handles all CRUD operations for messages, conversations, and system controls
 """
 
-import sqlite3
 from datetime import datetime
-from contextlib import contextmanager
 
-DB_NAME = 'college_pro.db'
+from db_utils import transaction
+from database import write_queue
+from models.identity_cache import user_cache
 
-
-@contextmanager
-def get_db_connection():
-    """Get database connection with proper configuration"""
-    conn = sqlite3.connect(DB_NAME, timeout=20.0)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    try:
-        yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+# Messaging shares the app's engine (DB_NAME from config) and transaction scope.
+# Each helper's block commits on success and rolls back on error unless it is
+# nested inside a caller's transaction, in which case the caller decides.
+get_db_connection = transaction
 
 
 # ==================== MESSAGING LOCK FUNCTIONS ====================
@@ -97,11 +85,14 @@ def suspend_user(user_id, admin_id, reason=''):
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE users
-            SET is_suspended = 1
+            SET is_suspended = 1, version = version + 1
             WHERE id = ?
         ''', (user_id,))
         # We could also log this in a separate moderation_log table if it existed
-        return cursor.rowcount > 0
+        changed = cursor.rowcount > 0
+    # Cached logins must see the suspension on their next request
+    user_cache.invalidate(user_id)
+    return changed
 
 
 def unsuspend_user(user_id):
@@ -110,10 +101,12 @@ def unsuspend_user(user_id):
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE users
-            SET is_suspended = 0
+            SET is_suspended = 0, version = version + 1
             WHERE id = ?
         ''', (user_id,))
-        return cursor.rowcount > 0
+        changed = cursor.rowcount > 0
+    user_cache.invalidate(user_id)
+    return changed
 
 
 def get_suspended_users():
@@ -135,6 +128,10 @@ def send_public_message(sender_id, content):
     if is_messaging_locked() or is_user_suspended(sender_id):
         return None
 
+    return write_queue.run(_insert_public_message, sender_id, content)
+
+
+def _insert_public_message(sender_id, content):
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -174,7 +171,7 @@ def delete_public_message(message_id, admin_id):
         cursor = conn.cursor()
         cursor.execute('''
             UPDATE public_messages
-            SET deleted_by = ?
+            SET deleted_by = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
         ''', (admin_id, message_id))
         return cursor.rowcount > 0
@@ -220,6 +217,10 @@ def send_private_message(sender_id, receiver_id, content):
     if is_user_suspended(sender_id):
         return None
 
+    return write_queue.run(_insert_private_message, sender_id, receiver_id, content)
+
+
+def _insert_private_message(sender_id, receiver_id, content):
     with get_db_connection() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -357,13 +358,13 @@ def delete_private_message(message_id, user_id):
         if result['sender_id'] == user_id:
             cursor.execute('''
                 UPDATE private_messages
-                SET deleted_by_sender = 1
+                SET deleted_by_sender = 1, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (message_id,))
         elif result['receiver_id'] == user_id:
             cursor.execute('''
                 UPDATE private_messages
-                SET deleted_by_receiver = 1
+                SET deleted_by_receiver = 1, updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (message_id,))
         else:
@@ -0,0 +1,170 @@
+"""
+Versioned schema migrations.
+
+Each migration is a module in this package named vNNN_<description>.py with
+an upgrade(conn) function. Applied versions are recorded in schema_version,
+so every migration runs exactly once per database, in order, inside its own
+transaction. App boot only compares versions (check_schema); DDL runs from
+`python scripts/migrate.py` / `flask migrate`, or at boot when AUTO_MIGRATE
+is switched on.
+"""
+
+import importlib
+import os
+import pkgutil
+import re
+import time
+
+from db_utils import get_db_connection
+
+_MODULE_RE = re.compile(r'^v(\d{3,})_(\w+)$')
+
+SCHEMA_VERSION_DDL = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        duration_ms REAL
+    )
+'''
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.module = module
+
+    @property
+    def description(self):
+        return (self.module.__doc__ or self.name).strip().splitlines()[0]
+
+    def __repr__(self):
+        return f"<Migration v{self.version:03d} {self.name}>"
+
+
+_migrations = None
+
+
+def discover():
+    """All migrations in this package, ordered by version"""
+    global _migrations
+    if _migrations is None:
+        found = []
+        for info in pkgutil.iter_modules([os.path.dirname(__file__)]):
+            match = _MODULE_RE.match(info.name)
+            if not match:
+                continue
+            module = importlib.import_module(f"{__name__}.{info.name}")
+            found.append(Migration(int(match.group(1)), match.group(2), module))
+        found.sort(key=lambda m: m.version)
+        versions = [m.version for m in found]
+        if len(versions) != len(set(versions)):
+            raise RuntimeError(f"Duplicate migration versions: {versions}")
+        _migrations = found
+    return _migrations
+
+
+def latest_version():
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(conn):
+    """Highest applied version (0 for a database that predates migrations)"""
+    try:
+        row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    except Exception:
+        conn.rollback()
+        return 0
+    return row[0] or 0
+
+
+# ==================== HELPERS FOR MIGRATION MODULES ====================
+
+def table_columns(conn, table):
+    """Column names of a table (works on SQLite and Postgres)"""
+    cursor = conn.execute(f'SELECT * FROM {table} LIMIT 0')
+    return {col[0] for col in cursor.description}
+
+
+def add_columns(conn, table, columns):
+    """
+    Add missing columns. `columns` is a list of (name, definition, backfill_sql);
+    backfill_sql runs only when the column was actually added.
+    """
+    existing = table_columns(conn, table)
+    for col_name, col_def, backfill_sql in columns:
+        if col_name in existing:
+            continue
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {col_name} {col_def}')
+        if backfill_sql:
+            conn.execute(backfill_sql)
+        print(f"  + {table}.{col_name}")
+
+
+# ==================== ENGINE ====================
+
+def pending(conn):
+    version = current_version(conn)
+    return [m for m in discover() if m.version > version]
+
+
+def migrate(target=None, verbose=True):
+    """Apply pending migrations up to `target` (default: latest). Returns applied list."""
+    conn = get_db_connection()
+    applied = []
+    try:
+        conn.execute(SCHEMA_VERSION_DDL)
+        conn.commit()
+        for migration in pending(conn):
+            if target is not None and migration.version > target:
+                break
+            if verbose:
+                print(f"Applying v{migration.version:03d} {migration.name}: {migration.description}")
+            started = time.perf_counter()
+            try:
+                if conn.backend == 'sqlite':
+                    # sqlite3 runs DDL outside a transaction unless one is open
+                    conn.execute('BEGIN')
+                migration.module.upgrade(conn)
+                conn.execute('INSERT INTO schema_version (version, name, duration_ms) VALUES (?, ?, ?)',
+                             (migration.version, migration.name, (time.perf_counter() - started) * 1000))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                print(f"❌ Migration v{migration.version:03d} {migration.name} failed; rolled back")
+                raise
+            applied.append(migration)
+        if verbose:
+            print(f"✓ Schema at version {current_version(conn)} (latest {latest_version()})")
+    finally:
+        conn.close()
+    return applied
+
+
+def status():
+    """(current, latest, pending migrations) without touching the schema"""
+    conn = get_db_connection()
+    try:
+        return current_version(conn), latest_version(), pending(conn)
+    finally:
+        conn.close()
+
+
+def check_schema(app):
+    """
+    Boot-time check: a single read of schema_version, no DDL.
+    With AUTO_MIGRATE on, a behind schema is brought up to date;
+    otherwise a warning points at the migrate CLI.
+    """
+    with app.app_context():
+        current, latest, todo = status()
+        if current >= latest:
+            return True
+        if app.config.get('AUTO_MIGRATE'):
+            migrate()
+            return True
+        print(f"⚠ Database schema is at v{current}, code expects v{latest} "
+              f"({len(todo)} pending). Run: python scripts/migrate.py")
+        return False
@@ -0,0 +1,226 @@
+"""Core schema: users, role profiles, connections, registration log, OTP tables
+
+Baseline of what init_db() used to create on every boot. Written to be safe
+against databases that already have these tables: CREATE ... IF NOT EXISTS
+plus add_columns() for the columns older databases are missing.
+"""
+
+from werkzeug.security import generate_password_hash
+
+from database.migrations import add_columns
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            phone TEXT,
+            role TEXT NOT NULL,
+            profile_pic TEXT,
+            is_verified BOOLEAN DEFAULT 0,
+            otp_code TEXT,
+            is_approved BOOLEAN DEFAULT 1,
+            is_suspended BOOLEAN DEFAULT 0,
+            branch TEXT,
+            passing_year INTEGER,
+            current_domain TEXT,
+            skills TEXT,
+            interests TEXT,
+            city TEXT,
+            company TEXT,
+            bio TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    add_columns(conn, 'users', [
+        ("is_verified", "BOOLEAN DEFAULT 0", "UPDATE users SET is_verified = 1"),
+        ("is_approved", "BOOLEAN DEFAULT 1", "UPDATE users SET is_approved = 1"),
+        ("is_suspended", "BOOLEAN DEFAULT 0", None),
+        ("otp_code", "TEXT", None),
+        ("branch", "TEXT", None),
+        ("passing_year", "INTEGER", None),
+        ("current_domain", "TEXT", None),
+        ("skills", "TEXT", None),
+        ("interests", "TEXT", None),
+        ("city", "TEXT", None),
+        ("company", "TEXT", None),
+        ("bio", "TEXT", None),
+    ])
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS student_profile (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL UNIQUE,
+            enrollment_no TEXT UNIQUE NOT NULL,
+            department TEXT NOT NULL,
+            degree TEXT NOT NULL,
+            semester INTEGER,
+            cgpa REAL,
+            skills TEXT,
+            interests TEXT,
+            bio TEXT,
+            achievements TEXT,
+            resume_link TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    add_columns(conn, 'student_profile', [
+        ("interests", "TEXT", None),
+        ("bio", "TEXT", None),
+        ("achievements", "TEXT", None),
+        ("resume_link", "TEXT", None),
+    ])
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS alumni_profile (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL UNIQUE,
+            enrollment_no TEXT UNIQUE NOT NULL,
+            department TEXT NOT NULL,
+            degree TEXT NOT NULL,
+            pass_year INTEGER NOT NULL,
+            company_name TEXT,
+            designation TEXT,
+            work_location TEXT,
+            experience_years INTEGER,
+            linkedin_url TEXT,
+            skills TEXT,
+            achievements TEXT,
+            bio TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    add_columns(conn, 'alumni_profile', [
+        ("skills", "TEXT", None),
+        ("achievements", "TEXT", None),
+        ("bio", "TEXT", None),
+    ])
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS faculty_profile (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL UNIQUE,
+            employee_id TEXT UNIQUE NOT NULL,
+            department TEXT NOT NULL,
+            designation TEXT NOT NULL,
+            specialization TEXT,
+            qualification TEXT,
+            experience_years INTEGER,
+            office_location TEXT,
+            office_hours TEXT,
+            bio TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS alumni_meet_registration (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            full_name TEXT NOT NULL,
+            gender TEXT,
+            dob TEXT,
+            contact_no TEXT NOT NULL,
+            email TEXT NOT NULL,
+            current_address TEXT,
+            enrollment_no TEXT NOT NULL,
+            course TEXT NOT NULL,
+            passing_year INTEGER,
+            current_status TEXT,
+            company_name TEXT,
+            designation TEXT,
+            work_location TEXT,
+            experience_years INTEGER,
+            university_name TEXT,
+            higher_study_course TEXT,
+            higher_study_country TEXT,
+            higher_study_state TEXT,
+            enrollment_year INTEGER,
+            contribute_to_college TEXT,
+            contribution_areas TEXT,
+            attending_meet TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    # Unified, role-agnostic connection requests and accepted connections
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS connection_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            sender_id INTEGER NOT NULL,
+            receiver_id INTEGER NOT NULL,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (sender_id) REFERENCES users(id),
+            FOREIGN KEY (receiver_id) REFERENCES users(id),
+            UNIQUE(sender_id, receiver_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS connections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id_1 INTEGER NOT NULL,
+            user_id_2 INTEGER NOT NULL,
+            connected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id_1) REFERENCES users(id),
+            FOREIGN KEY (user_id_2) REFERENCES users(id),
+            UNIQUE(user_id_1, user_id_2)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS registration_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            role TEXT NOT NULL,
+            enrollment_no TEXT,
+            employee_id TEXT,
+            department TEXT,
+            degree TEXT,
+            pass_year INTEGER,
+            company_name TEXT,
+            designation TEXT,
+            experience_years INTEGER,
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS password_resets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            otp TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Pending registrations awaiting OTP verification (was created inside /register)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS temp_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            role TEXT NOT NULL,
+            otp TEXT NOT NULL,
+            profile_data TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            otp_expires_at TIMESTAMP
+        )
+    ''')
+
+    admin_exists = conn.execute("SELECT COUNT(*) FROM users WHERE role='admin'").fetchone()[0]
+    if admin_exists == 0:
+        pw = generate_password_hash("admindbit195@")
+        conn.execute("INSERT INTO users (name, email, password, role, phone, is_verified) VALUES (?, ?, ?, ?, ?, ?)",
+                     ("Super Admin", "admindbit195@college.edu", pw, "admin", "0000000000", 1))
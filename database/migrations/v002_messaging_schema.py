@@ -1,24 +1,11 @@
-"""
-Database migration script for Alumni Hub Messaging System
-Creates all necessary tables for public messaging, private messaging, and admin controls
-"""
-
-import sqlite3
-from datetime import datetime
-import os
-
-DB_NAME = os.path.join('data', 'college_pro.db')
-
+"""Messaging schema: lock switch, public/private messages, conversations
 
-def init_messaging_db():
-    """Initialize all messaging-related database tables"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
+Formerly scripts/init_messaging_db.py.
+"""
 
-    print("Creating messaging database tables...")
 
-    # Create messaging_lock table
-    cursor.execute('''
+def upgrade(conn):
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS messaging_lock (
             id INTEGER PRIMARY KEY,
             is_locked BOOLEAN DEFAULT 0,
@@ -28,10 +15,8 @@ def init_messaging_db():
             FOREIGN KEY(locked_by) REFERENCES users(id)
         )
     ''')
-    print("✓ Created messaging_lock table")
 
-    # Create public_messages table
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS public_messages (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             sender_id INTEGER NOT NULL,
@@ -44,10 +29,8 @@ def init_messaging_db():
             FOREIGN KEY(deleted_by) REFERENCES users(id)
         )
     ''')
-    print("✓ Created public_messages table")
 
-    # Create private_messages table
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS private_messages (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             sender_id INTEGER NOT NULL,
@@ -63,10 +46,8 @@ def init_messaging_db():
             FOREIGN KEY(receiver_id) REFERENCES users(id)
         )
     ''')
-    print("✓ Created private_messages table")
 
-    # Create conversations table
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS conversations (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id_1 INTEGER NOT NULL,
@@ -80,10 +61,8 @@ def init_messaging_db():
             UNIQUE(user_id_1, user_id_2)
         )
     ''')
-    print("✓ Created conversations table")
 
-    # Create message_search_index table
-    cursor.execute('''
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS message_search_index (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             message_id INTEGER NOT NULL,
@@ -92,25 +71,6 @@ def init_messaging_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    print("✓ Created message_search_index table")
-
-    # Initialize messaging lock (unlocked by default)
-    cursor.execute('''
-        INSERT OR IGNORE INTO messaging_lock (id, is_locked)
-        VALUES (1, 0)
-    ''')
-    print("✓ Initialized messaging lock state (unlocked by default)")
-
-    conn.commit()
-    conn.close()
-    print("\n✅ Messaging database tables created successfully!")
-    print(f"Database: {DB_NAME}")
-
 
-if __name__ == '__main__':
-    if os.path.exists(DB_NAME):
-        print(f"Database {DB_NAME} found. Initializing tables...\n")
-        init_messaging_db()
-    else:
-        print(f"Error: Database {DB_NAME} not found!")
-        print(f"Please ensure the database exists at: {os.path.abspath(DB_NAME)}")
+    # Messaging starts unlocked
+    conn.execute('INSERT OR IGNORE INTO messaging_lock (id, is_locked) VALUES (1, 0)')
@@ -0,0 +1,69 @@
+"""Career board schema: jobs (v2 recruitment fields) and job applications
+
+Formerly scripts/migrate_jobs.py and scripts/migrate_jobs_v2.py.
+"""
+
+from database.migrations import add_columns
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            location TEXT,
+            salary TEXT,
+            job_type TEXT,
+            apply_link TEXT,
+            description TEXT,
+            required_skills TEXT,
+            posted_by INTEGER,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (posted_by) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+    add_columns(conn, 'jobs', [
+        ('location', 'TEXT', None),
+        ('salary', 'TEXT', None),
+        ('job_type', 'TEXT', None),
+        ('apply_link', 'TEXT', None),
+        ('is_active', 'INTEGER DEFAULT 1', None),
+        ('company_logo', 'TEXT', None),
+        ('deadline', 'TEXT', None),
+        ('category', 'TEXT', None),
+        ('work_mode', 'TEXT', None),
+        ('employment_type', 'TEXT', None),
+        ('eligible_branch', 'TEXT', None),
+        ('eligible_batch', 'TEXT', None),
+        ('qualification', 'TEXT', None),
+        ('min_cgpa', 'TEXT', None),
+        ('experience_required', 'TEXT', None),
+        ('skills_preferred', 'TEXT', None),
+        ('perks', 'TEXT', None),
+        ('openings', 'INTEGER', None),
+        ('selection_process', 'TEXT', None),
+        ('joining_date', 'TEXT', None),
+        ('target_role', 'TEXT', None),
+        ('skill_level', 'TEXT', None),
+        ('apply_method', 'TEXT', None),
+        ('company_website', 'TEXT', None),
+        ('salary_perks', 'TEXT', None),
+        ('ctc_range', 'TEXT', None),
+        ('company_name', 'TEXT', None),
+        ('skills_required', 'TEXT', None),
+        ('job_status', "TEXT DEFAULT 'Open'", None),
+    ])
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id INTEGER,
+            student_id INTEGER,
+            status TEXT DEFAULT 'applied',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (job_id) REFERENCES jobs(id) ON DELETE CASCADE,
+            FOREIGN KEY (student_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
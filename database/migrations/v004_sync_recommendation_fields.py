@@ -0,0 +1,22 @@
+"""Backfill users recommendation fields from the role profile tables
+
+Formerly the data-sync half of scripts/migrate_db.py. Only fills values
+that are still empty so it never overwrites what users edited since.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''
+        UPDATE users SET
+            branch = COALESCE(branch, (SELECT department FROM student_profile sp WHERE sp.user_id = users.id)),
+            skills = COALESCE(skills, (SELECT skills FROM student_profile sp WHERE sp.user_id = users.id))
+        WHERE role = 'student'
+    ''')
+    conn.execute('''
+        UPDATE users SET
+            branch = COALESCE(branch, (SELECT department FROM alumni_profile ap WHERE ap.user_id = users.id)),
+            passing_year = COALESCE(passing_year, (SELECT pass_year FROM alumni_profile ap WHERE ap.user_id = users.id)),
+            company = COALESCE(company, (SELECT company_name FROM alumni_profile ap WHERE ap.user_id = users.id)),
+            city = COALESCE(city, (SELECT work_location FROM alumni_profile ap WHERE ap.user_id = users.id))
+        WHERE role = 'alumni'
+    ''')
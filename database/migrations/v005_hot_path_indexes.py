@@ -0,0 +1,18 @@
+"""Hot-path indexes from the declarative registry (database/indexes.py)
+
+Covers messaging (threads, unread counts, conversation lists, public feed),
+active job listings and pending connection requests, on top of the indexes
+scripts/optimize_db.py used to create by hand.
+"""
+
+from database.indexes import apply_indexes
+
+# Tables that existed at this version; later tables get their indexes from
+# the migration that creates them
+TABLES = ['users', 'registration_log', 'connections', 'connection_requests', 'private_messages',
+          'public_messages', 'conversations', 'jobs', 'job_applications', 'password_resets']
+
+
+def upgrade(conn):
+    created = apply_indexes(conn, tables=TABLES)
+    print(f"  ensured {len(created)} indexes")
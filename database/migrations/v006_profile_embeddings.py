@@ -0,0 +1,20 @@
+"""Profile embedding store for AI recommendations
+
+One row per user: the sentence-transformer vector of the profile text the
+recommender compares (float32 blob), the hash of that text and the model
+that produced it. Filled by models/embeddings.py on profile changes.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS profile_embeddings (
+            user_id INTEGER PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    ''')
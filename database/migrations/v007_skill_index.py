@@ -0,0 +1,127 @@
+"""Normalised skills dictionary with user and job posting tables
+
+skills holds one row per canonical skill; user_skills/job_skills map users
+and jobs to the skills they list so recommendations can join on skill_id.
+Existing profiles and jobs are indexed here; edits keep the postings current
+afterwards through models/skills.py.
+
+The canonicalisation below is a frozen copy of models/skills.py as of this
+migration, so later changes to the app's synonym table don't change what
+this migration writes. Re-index with skills.rebuild() after such changes.
+"""
+
+import re
+
+from database.indexes import apply_indexes
+
+# Spelling variants -> canonical name (keys and values already lowercased)
+SYNONYMS = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'cpp': 'c++',
+    'c plus plus': 'c++',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'react js': 'react',
+    'angularjs': 'angular',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'expressjs': 'express',
+    'express.js': 'express',
+    'nextjs': 'next.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'mysql db': 'mysql',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'cv': 'computer vision',
+    'dsa': 'data structures and algorithms',
+    'data structures & algorithms': 'data structures and algorithms',
+    'oop': 'object oriented programming',
+    'oops': 'object oriented programming',
+    'html5': 'html',
+    'css3': 'css',
+    'ui/ux': 'ui/ux design',
+    'ux/ui': 'ui/ux design',
+    'aws cloud': 'aws',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+}
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _parse(*texts):
+    """Distinct canonical skills across comma-separated lists"""
+    names = {}
+    for text in texts:
+        for part in (text or '').split(','):
+            name = _SPACE_RE.sub(' ', part.strip().lower())
+            name = SYNONYMS.get(name, name)
+            if name:
+                names[name] = None
+    return list(names)
+
+
+def _post(conn, table, owner, owner_id, names):
+    if not names:
+        return
+    conn.executemany('INSERT OR IGNORE INTO skills (name) VALUES (?)', [(n,) for n in names])
+    for name in names:
+        skill_id = conn.execute('SELECT id FROM skills WHERE name = ?', (name,)).fetchone()[0]
+        conn.execute(f'INSERT OR IGNORE INTO {table} ({owner}, skill_id) VALUES (?, ?)', (owner_id, skill_id))
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS skills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_skills (
+            user_id INTEGER NOT NULL,
+            skill_id INTEGER NOT NULL,
+            PRIMARY KEY (user_id, skill_id),
+            FOREIGN KEY(user_id) REFERENCES users(id),
+            FOREIGN KEY(skill_id) REFERENCES skills(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_skills (
+            job_id INTEGER NOT NULL,
+            skill_id INTEGER NOT NULL,
+            PRIMARY KEY (job_id, skill_id),
+            FOREIGN KEY(job_id) REFERENCES jobs(id),
+            FOREIGN KEY(skill_id) REFERENCES skills(id)
+        )
+    ''')
+    apply_indexes(conn, tables=['user_skills', 'job_skills'])
+
+    users = conn.execute("SELECT id, skills FROM users WHERE COALESCE(skills, '') != ''").fetchall()
+    for row in users:
+        _post(conn, 'user_skills', 'user_id', row[0], _parse(row[1]))
+    jobs = conn.execute('''
+        SELECT id, required_skills, skills_required FROM jobs
+        WHERE COALESCE(required_skills, '') != '' OR COALESCE(skills_required, '') != ''
+    ''').fetchall()
+    for row in jobs:
+        _post(conn, 'job_skills', 'job_id', row[0], _parse(row[1], row[2]))
+    print(f"  indexed skills for {len(users)} users, {len(jobs)} jobs")
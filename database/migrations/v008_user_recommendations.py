@@ -0,0 +1,38 @@
+"""Materialised user recommendations with a change log
+
+user_recommendations holds each student's/alumnus' stored top 5 (the
+candidate and score per rank), recommendation_status when it was computed,
+and recommendation_changes the profile/connection changes that the
+background refresher (models/recommendation_store.py) has not applied yet.
+"""
+
+from database.indexes import apply_indexes
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_recommendations (
+            user_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            candidate_id INTEGER NOT NULL,
+            score INTEGER NOT NULL,
+            PRIMARY KEY (user_id, rank),
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recommendation_status (
+            user_id INTEGER PRIMARY KEY,
+            computed_at REAL NOT NULL,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS recommendation_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    apply_indexes(conn, tables=['user_recommendations'])
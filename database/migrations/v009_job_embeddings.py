@@ -0,0 +1,20 @@
+"""Job embedding store for job matching
+
+One row per job: the sentence-transformer vector of "title description"
+(float32 blob), the hash of that text and the model that produced it.
+Filled by models/job_matching.py when jobs are posted or edited.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS job_embeddings (
+            job_id INTEGER PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            model TEXT NOT NULL,
+            dim INTEGER NOT NULL,
+            vector BLOB NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(job_id) REFERENCES jobs(id)
+        )
+    ''')
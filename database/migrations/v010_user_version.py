@@ -0,0 +1,15 @@
+"""Version stamp on users for the login user cache
+
+users.version is bumped by every write that changes what load_user
+returns (profile edits, role changes, suspensions), so cached identities
+in other processes can be revalidated with a one-column lookup
+(models/identity_cache.py).
+"""
+
+from database.migrations import add_columns
+
+
+def upgrade(conn):
+    add_columns(conn, 'users', [
+        ('version', 'INTEGER NOT NULL DEFAULT 0', None),
+    ])
@@ -0,0 +1,22 @@
+"""Ephemeral entries (pending registrations, OTPs) in the main database
+
+ephemeral_entries backs the default tier of database/ephemeral.py, so every
+server process and serverless instance sees the same registrations and
+OTPs. expires_at is a Unix timestamp; expired rows are dropped on write.
+"""
+
+from database.indexes import apply_indexes
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ephemeral_entries (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (namespace, key)
+        )
+    ''')
+    apply_indexes(conn, tables=['ephemeral_entries'])
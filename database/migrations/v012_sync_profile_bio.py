@@ -0,0 +1,24 @@
+"""Backfill users.bio from the role profile tables
+
+Profile edits wrote bio only to student_profile / alumni_profile /
+faculty_profile, while profile embeddings are built from users.bio. The
+edit routes now write both; this copies over what was edited before.
+Only fills users.bio where it is still empty.
+"""
+
+PROFILE_TABLES = {
+    'student': 'student_profile',
+    'alumni': 'alumni_profile',
+    'faculty': 'faculty_profile',
+}
+
+
+def upgrade(conn):
+    for role, table in PROFILE_TABLES.items():
+        conn.execute(f'''
+            UPDATE users SET
+                bio = (SELECT p.bio FROM {table} p WHERE p.user_id = users.id),
+                version = version + 1
+            WHERE role = ? AND COALESCE(bio, '') = ''
+              AND EXISTS (SELECT 1 FROM {table} p WHERE p.user_id = users.id AND COALESCE(p.bio, '') != '')
+        ''', (role,))
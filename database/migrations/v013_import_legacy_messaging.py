@@ -0,0 +1,63 @@
+"""Import messages from the old root-level college_pro.db
+
+database/messaging_db.py used to open 'college_pro.db' relative to the
+working directory, while everything else used DB_NAME (data/college_pro.db
+by default). Messaging now shares DB_NAME, so messages written to the old
+file would silently disappear. This copies them across, keeping ids.
+
+Only runs on SQLite, only when the old file exists and is not the configured
+database, and only into messaging tables that are still empty, so it never
+merges two diverged histories. The old file is left in place; delete it once
+the import is confirmed.
+"""
+
+import os
+import sqlite3
+
+LEGACY_DB = 'college_pro.db'
+
+# Parents before children (conversations point at private_messages)
+TABLES = ['public_messages', 'private_messages', 'conversations', 'message_search_index']
+
+
+def _main_file(conn):
+    for row in conn.execute('PRAGMA database_list').fetchall():
+        if row[1] == 'main':
+            return row[2]
+    return None
+
+
+def upgrade(conn):
+    if conn.backend != 'sqlite' or not os.path.exists(LEGACY_DB):
+        return
+    main = _main_file(conn)
+    if main and os.path.exists(main) and os.path.samefile(main, LEGACY_DB):
+        return
+
+    # Only read from; a plain connection (unlike mode=ro) removes its WAL side files on close
+    legacy = sqlite3.connect(LEGACY_DB)
+    try:
+        present = {row[0] for row in legacy.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in TABLES:
+            if table not in present:
+                continue
+            if conn.execute(f'SELECT 1 FROM {table} LIMIT 1').fetchone():
+                print(f"  skipped {table}: already has rows")
+                continue
+            ours = [row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+            theirs = {row[1] for row in legacy.execute(f'PRAGMA table_info({table})')}
+            columns = [c for c in ours if c in theirs]
+            column_list = ', '.join(columns)
+            rows = legacy.execute(f'SELECT {column_list} FROM {table}').fetchall()
+            placeholders = ', '.join('?' * len(columns))
+            for row in rows:
+                conn.execute(f'INSERT INTO {table} ({column_list}) VALUES ({placeholders})', row)
+            print(f"  imported {len(rows)} {table} rows from {LEGACY_DB}")
+
+        if 'messaging_lock' in present:
+            lock = legacy.execute('SELECT is_locked, locked_by, locked_at, reason FROM messaging_lock WHERE id = 1').fetchone()
+            if lock and lock[0]:
+                conn.execute('UPDATE messaging_lock SET is_locked = ?, locked_by = ?, locked_at = ?, reason = ? '
+                             'WHERE id = 1', lock)
+    finally:
+        legacy.close()
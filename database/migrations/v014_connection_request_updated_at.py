@@ -0,0 +1,16 @@
+"""updated_at on connection_requests for databases created before it existed
+
+v001 declares connection_requests.updated_at, but CREATE TABLE IF NOT
+EXISTS leaves older tables (including the shipped data/college_pro.db)
+without it. The reject routes stamp it and the janitor purges rejected
+requests by it. Existing rows take created_at.
+"""
+
+from database.migrations import add_columns
+
+
+def upgrade(conn):
+    add_columns(conn, 'connection_requests', [
+        ('updated_at', 'TIMESTAMP',
+         'UPDATE connection_requests SET updated_at = created_at WHERE updated_at IS NULL'),
+    ])
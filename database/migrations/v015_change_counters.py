@@ -0,0 +1,21 @@
+"""Change counters for state that processes cache in memory
+
+change_counters holds named monotonically increasing counters. The first,
+connection_deletes, is bumped in the transaction that deletes connections
+rows, so the in-memory connection graph (models/connection_graph.py) can
+tell that another process removed edges without counting the table.
+"""
+
+
+def upgrade(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS change_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO change_counters (name, value)
+        SELECT 'connection_deletes', 0
+        WHERE NOT EXISTS (SELECT 1 FROM change_counters WHERE name = 'connection_deletes')
+    ''')
@@ -0,0 +1,121 @@
+"""
+Per-request SQL instrumentation.
+
+Hooks into db_utils' query listeners and records, for every statement run
+while handling an HTTP request, its normalised shape, duration and row
+count. At the end of the request it:
+
+- adds X-SQL-Queries / X-SQL-Time-ms (and X-SQL-Warnings) debug headers
+  when SQL_DEBUG_HEADERS is on,
+- writes one structured (JSON) log line to the 'alumni.sql' logger,
+- flags requests that run more than SQL_QUERY_BUDGET statements or repeat
+  one statement shape SQL_REPEAT_THRESHOLD+ times (the N+1 pattern).
+
+Config:
+    SQL_INSTRUMENTATION   enable the hook at all (default: on in DEBUG)
+    SQL_DEBUG_HEADERS     expose counts in response headers (default: DEBUG)
+    SQL_QUERY_BUDGET      max statements per request before flagging (25)
+    SQL_REPEAT_THRESHOLD  same-shape repeats that count as N+1 (5)
+"""
+
+import json
+import logging
+import re
+from collections import Counter
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+
+from db_utils import add_query_listener
+
+logger = logging.getLogger('alumni.sql')
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+# Transaction control (conn.savepoint() blocks) is not a query; don't count it
+_TX_CONTROL_RE = re.compile(r'^\s*(SAVEPOINT|RELEASE|ROLLBACK\s+TO)\b', re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """
+    Statement shape used for grouping: literals become ?, IN (?, ?, ...)
+    lists collapse to IN (...), whitespace is squashed.
+    """
+    shape = _STRING_LITERAL_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    return _WHITESPACE_RE.sub(' ', shape).strip()
+
+
+def _record(event):
+    if not has_request_context() or _TX_CONTROL_RE.match(event.sql):
+        return
+    events = g.get('_sql_events')
+    if events is None:
+        events = g._sql_events = []
+    events.append(event)
+
+
+def summarize(events, budget, repeat_threshold):
+    """Aggregate a request's QueryEvents into the numbers we report"""
+    shapes = Counter(normalize_sql(e.sql) for e in events)
+    total_ms = sum(e.duration for e in events) * 1000
+    repeated = [(shape, n) for shape, n in shapes.most_common() if n >= repeat_threshold]
+    warnings = []
+    if len(events) > budget:
+        warnings.append(f"budget:{len(events)}>{budget}")
+    for shape, n in repeated:
+        warnings.append(f"n+1:{n}x")
+    return {
+        'queries': len(events),
+        'time_ms': round(total_ms, 2),
+        'rows': sum(max(e.rows, 0) for e in events),
+        'distinct_shapes': len(shapes),
+        'repeated': [{'sql': shape, 'count': n} for shape, n in repeated],
+        'slowest': sorted(
+            ({'sql': normalize_sql(e.sql), 'ms': round(e.duration * 1000, 2), 'rows': max(e.rows, 0)}
+             for e in events),
+            key=lambda item: item['ms'], reverse=True)[:3],
+        'warnings': warnings,
+    }
+
+
+def init_app(app):
+    """Register the query listener and the per-request reporting hook"""
+    cfg = app.config
+    if not cfg.get('SQL_INSTRUMENTATION', app.debug):
+        return
+
+    budget = cfg.get('SQL_QUERY_BUDGET', 25)
+    repeat_threshold = cfg.get('SQL_REPEAT_THRESHOLD', 5)
+    headers = cfg.get('SQL_DEBUG_HEADERS', app.debug)
+
+    add_query_listener(_record)
+
+    @app.after_request
+    def report_sql_usage(response):
+        events = g.pop('_sql_events', None)
+        if not events:
+            return response
+
+        summary = summarize(events, budget, repeat_threshold)
+        if headers:
+            response.headers['X-SQL-Queries'] = str(summary['queries'])
+            response.headers['X-SQL-Time-ms'] = str(summary['time_ms'])
+            if summary['warnings']:
+                response.headers['X-SQL-Warnings'] = ', '.join(summary['warnings'])
+
+        record = {
+            'event': 'sql_usage',
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **summary,
+        }
+        level = logging.WARNING if summary['warnings'] else logging.DEBUG
+        logger.log(level, json.dumps(record, default=str))
+        return response
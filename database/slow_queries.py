@@ -0,0 +1,202 @@
+"""
+Slow-query log.
+
+Every statement that takes longer than SLOW_QUERY_MS is written as one JSON
+line to a rotating log file (SLOW_QUERY_LOG) with:
+
+- the statement and its fingerprint (query_stats.normalize_sql),
+- its parameters, redacted (strings/bytes become <str:N>/<bytes:N>),
+- the SQLite EXPLAIN QUERY PLAN output,
+- the route (Flask endpoint) and the first app frame that issued it.
+
+/admin/slow-queries reads the log back and aggregates it by fingerprint.
+
+Timing covers execute(); for SQLite that includes the work up to the first
+row (sorting, aggregation, scanning to the first match), which is where the
+LIKE scans and correlated subqueries spend their time.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from flask import has_request_context, request
+
+from db_utils import add_query_listener
+from database.query_stats import normalize_sql
+
+logger = logging.getLogger('alumni.slow_sql')
+
+_EXPLAINABLE = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+
+# Frames from these files are plumbing, not the caller we want to report
+_SKIP_FILES = (
+    os.path.normcase(os.path.abspath(sys.modules['db_utils'].__file__)),
+    os.path.normcase(os.path.abspath(__file__)),
+)
+_REPO_ROOT = os.path.dirname(_SKIP_FILES[0])
+
+_settings = {'threshold': None, 'path': None}
+
+
+def redact(params):
+    """Keep numbers/None (useful for reproducing plans), hide text and blobs"""
+    if params is None:
+        return None
+
+    def _one(value):
+        if isinstance(value, str):
+            return f"<str:{len(value)}>"
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return f"<bytes:{len(value)}>"
+        return value
+
+    if isinstance(params, dict):
+        return {key: _one(value) for key, value in params.items()}
+    return [_one(value) for value in params]
+
+
+def explain(event):
+    """EXPLAIN QUERY PLAN for a SQLite statement, as a list of plan lines (or None)"""
+    if event.backend != 'sqlite' or not event.target:
+        return None
+    if not event.sql.lstrip()[:7].upper().startswith(_EXPLAINABLE):
+        return None
+    try:
+        # Separate read-only connection: never disturbs the cursor being observed
+        conn = sqlite3.connect(f"file:{event.target}?mode=ro", uri=True, timeout=1.0)
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {event.sql}", event.params or ()).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        return [f"(explain failed: {e})"]
+    return [row[3] for row in rows]
+
+
+def _caller():
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.normcase(os.path.abspath(frame.f_code.co_filename))
+        if filename not in _SKIP_FILES and filename.startswith(os.path.normcase(_REPO_ROOT)):
+            rel = os.path.relpath(filename, _REPO_ROOT).replace(os.sep, '/')
+            return f"{rel}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return None
+
+
+def _on_query(event):
+    threshold = _settings['threshold']
+    if threshold is None or event.duration * 1000 < threshold:
+        return
+    record = {
+        'ts': datetime.now().isoformat(timespec='seconds'),
+        'ms': round(event.duration * 1000, 2),
+        'fingerprint': normalize_sql(event.sql),
+        'sql': ' '.join(event.sql.split()),
+        'params': redact(event.params),
+        'rows': event.rows if event.rows >= 0 else None,
+        'backend': event.backend,
+        'endpoint': request.endpoint if has_request_context() else None,
+        'path': request.path if has_request_context() else None,
+        'caller': _caller(),
+        'plan': explain(event),
+    }
+    logger.warning(json.dumps(record, default=str))
+
+
+# ==================== READING THE LOG ====================
+
+def load_entries(path=None):
+    """All logged entries, oldest file (highest .N suffix) first"""
+    path = path or _settings['path']
+    if not path:
+        return []
+    files = []
+    directory, base = os.path.split(path)
+    if os.path.isdir(directory or '.'):
+        backups = [name for name in os.listdir(directory or '.')
+                   if name.startswith(base + '.') and name[len(base) + 1:].isdigit()]
+        backups.sort(key=lambda name: int(name[len(base) + 1:]), reverse=True)
+        files = [os.path.join(directory, name) for name in backups]
+    if os.path.exists(path):
+        files.append(path)
+
+    entries = []
+    for filename in files:
+        with open(filename, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    return entries
+
+
+def _is_full_scan(plan):
+    return any(line.startswith('SCAN') and 'USING' not in line for line in plan or ())
+
+
+def aggregate(entries):
+    """Group entries by fingerprint, worst total time first"""
+    groups = {}
+    for entry in entries:
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'endpoints': set(),
+                'callers': set(),
+            }
+        group['count'] += 1
+        group['total_ms'] += entry['ms']
+        group['max_ms'] = max(group['max_ms'], entry['ms'])
+        group['last_seen'] = entry['ts']
+        group['plan'] = entry.get('plan')
+        group['sample_params'] = entry.get('params')
+        if entry.get('endpoint'):
+            group['endpoints'].add(entry['endpoint'])
+        if entry.get('caller'):
+            group['callers'].add(entry['caller'])
+
+    result = []
+    for group in groups.values():
+        group['avg_ms'] = round(group['total_ms'] / group['count'], 2)
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['endpoints'] = sorted(group['endpoints'])
+        group['callers'] = sorted(group['callers'])
+        group['full_scan'] = _is_full_scan(group['plan'])
+        result.append(group)
+    result.sort(key=lambda g: g['total_ms'], reverse=True)
+    return result
+
+
+def init_app(app):
+    """Attach the rotating log file and start watching statements"""
+    cfg = app.config
+    threshold = cfg.get('SLOW_QUERY_MS', 100)
+    path = cfg.get('SLOW_QUERY_LOG', 'logs/slow_queries.log')
+    _settings['path'] = path
+    if not threshold or threshold <= 0:
+        return
+    _settings['threshold'] = threshold
+
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        handler = RotatingFileHandler(path,
+                                      maxBytes=cfg.get('SLOW_QUERY_LOG_MAX_BYTES', 5 * 1024 * 1024),
+                                      backupCount=cfg.get('SLOW_QUERY_LOG_BACKUPS', 5),
+                                      encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.WARNING)
+        logger.propagate = False
+
+    add_query_listener(_on_query)
@@ -0,0 +1,234 @@
+"""
+Single-writer queue for SQLite.
+
+SQLite allows one writer at a time. With async_mode='threading' every
+request thread that writes competes for that lock and may sit in the
+20s busy timeout. Instead, hot write paths hand a small job to one
+dedicated writer thread:
+
+    message_id = write_queue.run(_insert_private_message, sender_id, receiver_id, content)
+
+The writer drains whatever jobs are waiting (up to WRITE_QUEUE_MAX_BATCH),
+runs them inside one BEGIN IMMEDIATE transaction - each job under its own
+SAVEPOINT so a failing job only rolls back itself - and commits once
+(group commit). Callers block on a Future for their job's return value,
+typically cursor.lastrowid; a job's exception is re-raised in the caller.
+
+Jobs run on the writer thread, outside any request context: pass them
+plain values (not current_user/request), do the work with
+`with transaction() as conn:` and never call conn.commit() themselves.
+
+The job runs inline on the calling thread (in its own transaction) when
+the queue is disabled (WRITE_QUEUE=False or init_app() not called, e.g.
+in scripts), on Postgres, or when the calling thread already has a
+transaction open - queueing then would wait on our own write lock.
+"""
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from db_utils import get_engine, transaction
+
+MAX_BATCH = 64
+RESULT_TIMEOUT = 30.0
+
+_STOP = object()
+_queues = {}
+_queues_lock = threading.Lock()
+_settings = {'enabled': False, 'max_batch': MAX_BATCH, 'timeout': RESULT_TIMEOUT}
+
+
+class _Job:
+    __slots__ = ('fn', 'args', 'kwargs', 'future')
+
+    def __init__(self, fn, args, kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+
+
+class WriteQueue:
+    """One writer thread group-committing jobs against one pool"""
+
+    def __init__(self, pool, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._batches = 0
+        self._jobs = 0
+        self._largest_batch = 0
+        self._commit_time = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Finish queued jobs, then stop the writer thread"""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    @property
+    def is_writer_thread(self):
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs); returns a Future for its return value"""
+        self.start()
+        job = _Job(fn, args, kwargs)
+        self._queue.put(job)
+        return job.future
+
+    def stats(self):
+        return {
+            'pending': self._queue.qsize(),
+            'batches': self._batches,
+            'jobs': self._jobs,
+            'avg_batch': round(self._jobs / self._batches, 2) if self._batches else 0,
+            'largest_batch': self._largest_batch,
+            'commit_ms_total': round(self._commit_time * 1000, 2),
+        }
+
+    # ---- writer thread ----
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            batch = [job]
+            while len(batch) < self.max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is _STOP:
+                    stopping = True
+                    break
+                batch.append(job)
+            self._commit_batch(batch)
+        self.pool.release_thread()
+
+    def _commit_batch(self, batch):
+        started = time.perf_counter()
+        outcomes = []
+        conn = self.pool.acquire()
+        # Nested transaction() blocks inside jobs join the batch transaction
+        conn._tx_depth += 1
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for job in batch:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT write_job')
+                try:
+                    value = job.fn(*job.args, **job.kwargs)
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write_job')
+                    conn.execute('RELEASE write_job')
+                    outcomes.append((job, e, False))
+                else:
+                    conn.execute('RELEASE write_job')
+                    outcomes.append((job, value, True))
+            conn.commit()
+        except Exception as e:
+            print(f"❌ Write batch of {len(batch)} failed: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            # Jobs after the failure never started; fail them too rather than leave them pending
+            for job in batch:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            return
+        finally:
+            conn._tx_depth -= 1
+            conn.close()
+
+        # Results are only handed out once the batch is durable
+        for job, value, ok in outcomes:
+            if ok:
+                job.future.set_result(value)
+            else:
+                job.future.set_exception(value)
+        self._batches += 1
+        self._jobs += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        self._commit_time += time.perf_counter() - started
+
+
+def get_write_queue(pool=None):
+    """The writer for the shared engine (or the given pool)"""
+    pool = pool or get_engine()
+    with _queues_lock:
+        wq = _queues.get(pool)
+        if wq is None:
+            wq = _queues[pool] = WriteQueue(pool, _settings['max_batch'])
+    return wq
+
+
+def _run_inline(fn, args, kwargs):
+    with transaction():
+        return fn(*args, **kwargs)
+
+
+def run(fn, *args, **kwargs):
+    """
+    Run a write job through the writer thread and return its result.
+    Falls back to running it inline where queueing can't help (see module docstring).
+    """
+    pool = get_engine()
+    if not _settings['enabled'] or pool.backend.name != 'sqlite':
+        return _run_inline(fn, args, kwargs)
+    wq = get_write_queue(pool)
+    if wq.is_writer_thread or pool.thread_in_transaction():
+        return _run_inline(fn, args, kwargs)
+
+    future = wq.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=_settings['timeout'])
+    except FutureTimeoutError:
+        if not future.cancel():
+            # Already running in a batch: report what that commit does, not a failure it may not have
+            return future.result()
+        raise sqlite3.OperationalError(
+            f"write queue did not start the job within {_settings['timeout']}s")
+
+
+def _execute(sql, params):
+    with transaction() as conn:
+        return conn.execute(sql, params).lastrowid
+
+
+def execute(sql, params=()):
+    """Single statement through the writer; returns lastrowid"""
+    return run(_execute, sql, params)
+
+
+def stop_all():
+    for wq in list(_queues.values()):
+        wq.stop()
+
+
+def init_app(app):
+    """Enable the writer from app config (WRITE_QUEUE, WRITE_QUEUE_MAX_BATCH, WRITE_QUEUE_TIMEOUT)"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('WRITE_QUEUE', True)
+    _settings['max_batch'] = cfg.get('WRITE_QUEUE_MAX_BATCH', MAX_BATCH)
+    _settings['timeout'] = cfg.get('WRITE_QUEUE_TIMEOUT', RESULT_TIMEOUT)
+
+
+atexit.register(stop_all)
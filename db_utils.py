@@ -1,14 +1,493 @@
+"""
+Pooled SQLite connection manager and shared data-access layer.
+
+Every handler used to open a fresh sqlite3 connection and re-run the WAL
+PRAGMAs on it. Connections are now opened once, initialised once and handed
+out from a bounded pool. Within a thread the same connection is re-used, so
+`load_user` and the route body share one handle for the whole request.
+
+Call sites keep the old pattern:
+
+    conn = get_db_connection()
+    ...
+    conn.close()   # returns the connection to the pool
+
+app.py, routes/* and database/messaging_db.py all go through the one engine
+configured by init_app(), so messaging JOINs hit the same file (and page
+cache) as users/connections. Multi-statement work should use transaction(),
+which nests: only the outermost block commits or rolls back.
+
+Setting DATABASE_URL to a postgres:// URL swaps the SQLite file for a pooled
+PostgreSQL backend; see database/backends.py for the dialect shim.
+"""
+
 import sqlite3
-from flask import current_app
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, has_app_context
+
+from database.backends import backend_for
+
+DEFAULT_DB_NAME = 'data/college_pro.db'
+POOL_SIZE = 16
+POOL_TIMEOUT = 20.0
+HEALTH_CHECK_INTERVAL = 30.0
+STATEMENT_CACHE_SIZE = 256
+
+_pools = {}
+_pools_lock = threading.Lock()
+_engine = {}
+_query_listeners = []
+
+
+class PoolExhaustedError(sqlite3.OperationalError):
+    """Raised when no pooled connection frees up within the pool timeout"""
+
+
+class QueryEvent:
+    """One executed statement, as seen by query listeners"""
+
+    __slots__ = ('sql', 'params', 'duration', 'rows', 'backend', 'target')
+
+    def __init__(self, sql, params, duration, rows, backend, target=None):
+        self.sql = sql
+        self.params = params
+        self.duration = duration
+        self.rows = rows
+        self.backend = backend
+        self.target = target
+
+
+def add_query_listener(listener):
+    """
+    Register listener(event) to be called after every statement with a
+    QueryEvent. event.rows is filled in further once results are fetched.
+    With no listeners registered, statements run untimed.
+    """
+    if listener not in _query_listeners:
+        _query_listeners.append(listener)
+
+
+def remove_query_listener(listener):
+    if listener in _query_listeners:
+        _query_listeners.remove(listener)
+
+
+def _notify(event):
+    for listener in _query_listeners:
+        try:
+            listener(event)
+        except Exception as e:
+            # Instrumentation must never break the query it observes
+            print(f"Query listener error: {e}")
+
+
+class Cursor:
+    """
+    Cursor proxy that runs every statement through the backend dialect.
+    On SQLite this is a pass-through; on Postgres it rewrites placeholders
+    and returns sqlite3.Row-compatible rows.
+    """
+
+    def __init__(self, conn, raw_cursor):
+        self._conn = conn
+        self._raw = raw_cursor
+        self._backend = conn._pool.backend
+        self._target = conn._pool.db_name
+        self._lastrowid = None
+        self._returns_id = False
+        self._event = None
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def execute(self, sql, params=()):
+        translated, self._returns_id = self._backend.translate(sql, bool(params))
+        if translated is None:
+            return self
+        if not _query_listeners:
+            self._backend.execute(self._raw, translated, params)
+        else:
+            started = time.perf_counter()
+            self._backend.execute(self._raw, translated, params)
+            self._event = QueryEvent(sql, params, time.perf_counter() - started,
+                                     self._raw.rowcount, self._backend.name, self._target)
+            _notify(self._event)
+        if self._returns_id:
+            row = self._raw.fetchone()
+            self._lastrowid = row[0] if row else None
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        translated, _ = self._backend.translate(sql, True)
+        if translated is None:
+            return self
+        if not _query_listeners:
+            self._backend.executemany(self._raw, translated, seq_of_params)
+        else:
+            started = time.perf_counter()
+            self._backend.executemany(self._raw, translated, seq_of_params)
+            self._event = QueryEvent(sql, None, time.perf_counter() - started,
+                                     self._raw.rowcount, self._backend.name, self._target)
+            _notify(self._event)
+        return self
+
+    @property
+    def lastrowid(self):
+        if self._returns_id:
+            return self._lastrowid
+        return self._raw.lastrowid
+
+    def _count(self, n):
+        if self._event is not None:
+            self._event.rows = max(self._event.rows, 0) + n
+
+    def fetchone(self):
+        if self._returns_id:
+            return None
+        row = self._backend.wrap_row(self._raw, self._raw.fetchone())
+        self._count(row is not None)
+        return row
+
+    def fetchall(self):
+        if self._returns_id:
+            return []
+        wrap = self._backend.wrap_row
+        rows = [wrap(self._raw, row) for row in self._raw.fetchall()]
+        self._count(len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        if self._returns_id:
+            return []
+        wrap = self._backend.wrap_row
+        rows = self._raw.fetchmany(size) if size else self._raw.fetchmany()
+        self._count(len(rows))
+        return [wrap(self._raw, row) for row in rows]
+
+
+class PooledConnection:
+    """
+    Thin proxy around a pooled driver connection.
+    Everything is delegated to the real connection except close(),
+    which releases the lease instead of closing the socket/file handle,
+    and execute()/cursor(), which go through the backend dialect.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._depth = 0
+        self._tx_depth = 0
+        self._owner = None
+        self.last_used = time.monotonic()
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._raw.commit()
+        else:
+            self._raw.rollback()
+        return False
+
+    @property
+    def backend(self):
+        return self._pool.backend.name
+
+    @property
+    def target(self):
+        """The database this connection belongs to (file path or URL)"""
+        return self._pool.db_name
+
+    def cursor(self):
+        return Cursor(self, self._raw.cursor())
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+    @contextmanager
+    def savepoint(self, name='db_block'):
+        """
+        Undo only this block when it raises, keeping the rest of the
+        transaction. Needed around statements whose errors the caller catches
+        and moves on from: Postgres otherwise aborts the whole transaction.
+        """
+        self.execute(f'SAVEPOINT {name}')
+        try:
+            yield self
+        except Exception:
+            self.execute(f'ROLLBACK TO SAVEPOINT {name}')
+            self.execute(f'RELEASE SAVEPOINT {name}')
+            raise
+        self.execute(f'RELEASE SAVEPOINT {name}')
+
+    def close(self):
+        self._pool.release(self)
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections for one database (SQLite file or Postgres URL).
+
+    - Connections are created lazily up to `max_size`.
+    - A thread that already holds a lease gets the same connection back
+      (nested get_db_connection() calls are reference counted).
+    - Idle connections remember their last thread so a thread tends to get
+      "its" connection (and warm statement cache) back.
+    - PRAGMAs run once per physical connection, never per request.
+    """
+
+    def __init__(self, db_name, max_size=POOL_SIZE, timeout=POOL_TIMEOUT,
+                 health_check_interval=HEALTH_CHECK_INTERVAL,
+                 statement_cache_size=STATEMENT_CACHE_SIZE):
+        self.db_name = db_name
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.statement_cache_size = statement_cache_size
+        self.backend = backend_for(db_name)
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._local = threading.local()
+
+    # ---- physical connections ----
+
+    def _connect(self):
+        raw = self.backend.connect(self.db_name, self.statement_cache_size)
+        return PooledConnection(self, raw)
+
+    def _is_healthy(self, conn):
+        if time.monotonic() - conn.last_used < self.health_check_interval:
+            return True
+        try:
+            self.backend.ping(conn._raw)
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn._raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._created -= 1
+            self._cond.notify()
+
+    # ---- leasing ----
+
+    def acquire(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn._depth += 1
+            return conn
+
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn = None
+            with self._cond:
+                while conn is None:
+                    if self._idle:
+                        # Prefer the connection this thread used last time
+                        idx = next((i for i, c in enumerate(self._idle) if c._owner == me), -1)
+                        conn = self._idle.pop(idx)
+                    elif self._created < self.max_size:
+                        self._created += 1
+                        break
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise PoolExhaustedError(
+                                f"No database connection available after {self.timeout}s "
+                                f"(pool size {self.max_size})")
+                        self._cond.wait(remaining)
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._created -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_healthy(conn):
+                self._discard(conn)
+                continue
+
+            conn._owner = me
+            conn._depth = 1
+            self._local.conn = conn
+            return conn
+
+    def release(self, conn, force=False):
+        if getattr(self._local, 'conn', None) is not conn:
+            return
+        conn._depth -= 1
+        if conn._depth > 0 and not force:
+            return
+
+        self._local.conn = None
+        conn._depth = 0
+        conn._tx_depth = 0
+        conn.last_used = time.monotonic()
+        try:
+            # Same semantics as closing a raw connection: uncommitted work is dropped
+            if self.backend.in_transaction(conn._raw):
+                conn._raw.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def release_thread(self):
+        """Return whatever this thread still holds (used by the teardown hook)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            self.release(conn, force=True)
+
+    def thread_in_transaction(self):
+        """True when this thread holds a connection with an open transaction"""
+        conn = getattr(self._local, 'conn', None)
+        return conn is not None and (conn._tx_depth > 0 or self.backend.in_transaction(conn._raw))
+
+    def stats(self):
+        with self._cond:
+            return {'backend': self.backend.name, 'size': self._created,
+                    'idle': len(self._idle), 'max_size': self.max_size}
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for conn in idle:
+            try:
+                conn._raw.close()
+            except Exception:
+                pass
+
+
+def get_pool(db_name, max_size=POOL_SIZE, timeout=POOL_TIMEOUT,
+             statement_cache_size=STATEMENT_CACHE_SIZE):
+    """Get (or lazily create) the process-wide pool for a database file"""
+    pool = _pools.get(db_name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_name)
+            if pool is None:
+                pool = _pools[db_name] = ConnectionPool(
+                    db_name, max_size, timeout, statement_cache_size=statement_cache_size)
+    return pool
+
+
+def database_target(cfg):
+    """DATABASE_URL (Postgres) wins over the SQLite DB_NAME file when set"""
+    url = cfg.get('DATABASE_URL')
+    if url and url.startswith(('postgres://', 'postgresql://')):
+        return url
+    return cfg.get('DB_NAME', DEFAULT_DB_NAME)
+
+
+def configure(db_name, pool_size=POOL_SIZE, timeout=POOL_TIMEOUT,
+              statement_cache_size=STATEMENT_CACHE_SIZE):
+    """Set the single engine every data-access helper uses (file path or database URL)"""
+    _engine['pool'] = get_pool(db_name, pool_size, timeout, statement_cache_size)
+    return _engine['pool']
+
+
+def get_engine():
+    """
+    The configured pool. Falls back to current_app config (or the default
+    file) when init_app() has not run, e.g. in one-off scripts.
+    """
+    pool = _engine.get('pool')
+    if pool is not None:
+        return pool
+    if has_app_context():
+        cfg = current_app.config
+        return get_pool(database_target(cfg),
+                        cfg.get('DB_POOL_SIZE', POOL_SIZE),
+                        cfg.get('DB_POOL_TIMEOUT', POOL_TIMEOUT),
+                        cfg.get('DB_STATEMENT_CACHE_SIZE', STATEMENT_CACHE_SIZE))
+    return get_pool(DEFAULT_DB_NAME)
+
 
 def get_db_connection():
     """
-    Get a database connection using current_app config.
-    Using current_app prevents circular imports with app.py.
+    Get a database connection from the configured engine.
+    Using current_app/configure() prevents circular imports with app.py.
+    The connection comes from the pool; conn.close() hands it back.
     """
-    db_name = current_app.config.get('DB_NAME', 'data/alumni.db')
-    conn = sqlite3.connect(db_name, timeout=20.0)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA synchronous=NORMAL")
-    return conn
+    return get_engine().acquire()
+
+
+@contextmanager
+def transaction():
+    """
+    Shared transaction scope on the thread's connection.
+    Nested blocks join the outer transaction; only the outermost one
+    commits (or rolls back on error).
+    """
+    conn = get_engine().acquire()
+    conn._tx_depth += 1
+    outermost = conn._tx_depth == 1
+    try:
+        yield conn
+        if outermost:
+            conn.commit()
+    except Exception:
+        if outermost:
+            conn.rollback()
+        raise
+    finally:
+        conn._tx_depth -= 1
+        conn.close()
+
+
+def query_one(sql, params=()):
+    """Run a query on the shared connection and return the first row (or None)"""
+    conn = get_db_connection()
+    try:
+        return conn.execute(sql, params).fetchone()
+    finally:
+        conn.close()
+
+
+def query_all(sql, params=()):
+    """Run a query on the shared connection and return all rows"""
+    conn = get_db_connection()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def release_thread_connections(exc=None):
+    """Flask teardown hook: return any connection leaked by the request"""
+    for pool in list(_pools.values()):
+        pool.release_thread()
+
+
+def init_app(app):
+    """Configure the shared engine from app config and register the teardown hook"""
+    cfg = app.config
+    configure(database_target(cfg),
+              cfg.get('DB_POOL_SIZE', POOL_SIZE),
+              cfg.get('DB_POOL_TIMEOUT', POOL_TIMEOUT),
+              cfg.get('DB_STATEMENT_CACHE_SIZE', STATEMENT_CACHE_SIZE))
+    app.teardown_appcontext(release_thread_connections)
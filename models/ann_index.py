@@ -0,0 +1,314 @@
+"""
+Approximate-nearest-neighbour index over stored profile embeddings.
+
+get_recommended_users used to look only at the first 50 users of the
+target role. With this index, semantic candidates are the users whose
+profile vectors are closest to the current user's, searched across the
+whole role:
+
+- one partition per role (students are matched against alumni and vice
+  versa, so a search only ever touches one role);
+- each partition is an IVF index in NumPy: vectors live in a float32
+  matrix, k-means centroids split it into ~sqrt(n) lists and a query only
+  scans the ANN_NPROBE closest lists. Partitions smaller than IVF_MIN are
+  searched exactly;
+- upsert()/remove() are incremental (profile edits, deletions); lists are
+  re-trained in the background once a partition doubled in size or has
+  accumulated too many deleted rows.
+
+The index loads from profile_embeddings on a background thread the first
+time is_ready() is asked; until then (and without NumPy) callers keep the
+plain candidate query.
+"""
+
+import threading
+
+from db_utils import get_db_connection
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+IVF_MIN = 4096          # below this many vectors a partition is searched exactly
+ANN_NPROBE = 8          # inverted lists scanned per query
+KMEANS_SAMPLE = 20000   # rows used to train centroids
+KMEANS_ITERATIONS = 8
+RETRAIN_DEAD_RATIO = 0.3
+
+
+class _Partition:
+    """Vectors of one role, with optional IVF lists"""
+
+    def __init__(self, dim):
+        self.dim = dim
+        self.vectors = np.zeros((0, dim), dtype=np.float32)
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.assign = np.zeros(0, dtype=np.int32)
+        self.rows = {}
+        self.count = 0
+        self.dead = 0
+        self.centroids = None
+        self.trained_size = 0
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _grow(self, needed):
+        capacity = len(self.ids)
+        if needed <= capacity:
+            return
+        capacity = max(needed, capacity * 2, 64)
+        for name, dtype, shape in (('vectors', np.float32, (capacity, self.dim)),
+                                   ('ids', np.int64, (capacity,)),
+                                   ('alive', bool, (capacity,)),
+                                   ('assign', np.int32, (capacity,))):
+            grown = np.zeros(shape, dtype=dtype)
+            old = getattr(self, name)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+    def _nearest_list(self, vector):
+        return int(np.argmax(self.centroids @ vector)) if self.centroids is not None else 0
+
+    def upsert(self, user_id, vector):
+        row = self.rows.get(user_id)
+        if row is None:
+            self._grow(self.count + 1)
+            row = self.count
+            self.count += 1
+            self.rows[user_id] = row
+            self.ids[row] = user_id
+            self.alive[row] = True
+        self.vectors[row] = vector
+        self.assign[row] = self._nearest_list(vector)
+
+    def remove(self, user_id):
+        row = self.rows.pop(user_id, None)
+        if row is not None:
+            self.alive[row] = False
+            self.dead += 1
+
+    def needs_training(self):
+        live = len(self.rows)
+        if live < IVF_MIN:
+            return self.centroids is not None
+        return (self.centroids is None or live > 2 * self.trained_size
+                or self.dead > RETRAIN_DEAD_RATIO * self.count)
+
+    def snapshot(self):
+        """Live vectors for training (copy, safe to use outside the lock)"""
+        live = np.flatnonzero(self.alive[:self.count])
+        return self.vectors[live].copy()
+
+    def install(self, centroids):
+        """Compact away deleted rows and assign every row to the new lists"""
+        live = np.flatnonzero(self.alive[:self.count])
+        self.vectors = self.vectors[live]
+        self.ids = self.ids[live]
+        self.alive = np.ones(len(live), dtype=bool)
+        self.count = len(live)
+        self.dead = 0
+        self.rows = {int(uid): i for i, uid in enumerate(self.ids)}
+        self.centroids = centroids
+        self.assign = np.zeros(self.count, dtype=np.int32)
+        if centroids is not None:
+            for start in range(0, self.count, 8192):
+                block = self.vectors[start:start + 8192]
+                self.assign[start:start + 8192] = np.argmax(block @ centroids.T, axis=1)
+        self.trained_size = self.count
+
+    def search(self, query, k, exclude):
+        count = self.count
+        if count == 0:
+            return []
+        if self.centroids is None:
+            rows = np.flatnonzero(self.alive[:count])
+        else:
+            nprobe = min(ANN_NPROBE, len(self.centroids))
+            probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+            rows = np.flatnonzero(np.isin(self.assign[:count], probe) & self.alive[:count])
+        if rows.size == 0:
+            return []
+
+        sims = self.vectors[rows] @ query
+        want = min(k + len(exclude), rows.size)
+        top = np.argpartition(-sims, want - 1)[:want]
+        top = top[np.argsort(-sims[top], kind='stable')]
+        results = []
+        for i in top:
+            user_id = int(self.ids[rows[i]])
+            if user_id not in exclude:
+                results.append((user_id, float(sims[i])))
+                if len(results) == k:
+                    break
+        return results
+
+
+def train_centroids(vectors, seed=0):
+    """Spherical k-means on (a sample of) unit vectors; ~sqrt(n) centroids"""
+    n = len(vectors)
+    nlist = int(min(1024, max(16, np.sqrt(n))))
+    rng = np.random.default_rng(seed)
+    sample = vectors[rng.choice(n, min(n, KMEANS_SAMPLE), replace=False)]
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        for c in range(nlist):
+            members = sample[labels == c]
+            if len(members):
+                centroids[c] = members.sum(axis=0)
+        centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class AnnIndex:
+    """Role-partitioned ANN index over profile_embeddings"""
+
+    def __init__(self):
+        self.enabled = NUMPY_AVAILABLE
+        self._partitions = {}
+        self._roles = {}
+        self._lock = threading.RLock()
+        self._state = 'idle'
+        self._pending = []
+        self._training = set()
+
+    # ---- loading ----
+
+    def is_ready(self):
+        """True once loaded; the first call starts the background load"""
+        if self._state == 'ready':
+            return True
+        if self.enabled and self._state == 'idle':
+            with self._lock:
+                if self._state == 'idle':
+                    self._state = 'loading'
+                    threading.Thread(target=self._load, name='ann-index-loader', daemon=True).start()
+        return False
+
+    def _load(self):
+        from models.recommendation import ai_engine
+        try:
+            self.load(ai_engine.model_name)
+        except Exception as e:
+            print(f"ANN index load error: {e}")
+            with self._lock:
+                self._state = 'idle'
+
+    def load(self, model_name):
+        """(Re)build every partition from profile_embeddings"""
+        conn = get_db_connection()
+        try:
+            rows = conn.execute('''
+                SELECT pe.user_id, u.role, pe.vector FROM profile_embeddings pe
+                JOIN users u ON u.id = pe.user_id
+                WHERE pe.model = ?
+            ''', (model_name,)).fetchall()
+        finally:
+            conn.close()
+
+        partitions, roles = {}, {}
+        for row in rows:
+            vector = np.frombuffer(row['vector'], dtype=np.float32)
+            part = partitions.get(row['role'])
+            if part is None:
+                part = partitions[row['role']] = _Partition(len(vector))
+            part.upsert(row['user_id'], vector)
+            roles[row['user_id']] = row['role']
+        for part in partitions.values():
+            part.install(train_centroids(part.snapshot()) if len(part) >= IVF_MIN else None)
+
+        with self._lock:
+            self._partitions, self._roles = partitions, roles
+            # Changes that arrived while we were reading
+            pending, self._pending = self._pending, []
+            self._state = 'ready'
+            for op in pending:
+                op()
+        print(f"✓ ANN index loaded: { {role: len(p) for role, p in partitions.items()} }")
+
+    # ---- incremental updates ----
+
+    def upsert(self, user_id, role, vector):
+        if not self.enabled:
+            return
+        vector = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            if self._state == 'loading':
+                self._pending.append(lambda: self.upsert(user_id, role, vector))
+                return
+            if self._state != 'ready':
+                return
+            old_role = self._roles.get(user_id)
+            if old_role is not None and old_role != role:
+                self._partitions[old_role].remove(user_id)
+            part = self._partitions.get(role)
+            if part is None:
+                part = self._partitions[role] = _Partition(len(vector))
+            part.upsert(user_id, vector)
+            self._roles[user_id] = role
+        self._maybe_retrain(role)
+
+    def remove(self, user_id):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._state == 'loading':
+                self._pending.append(lambda: self.remove(user_id))
+                return
+            role = self._roles.pop(user_id, None)
+            if role is not None:
+                self._partitions[role].remove(user_id)
+        if role is not None:
+            self._maybe_retrain(role)
+
+    def _maybe_retrain(self, role):
+        with self._lock:
+            part = self._partitions.get(role)
+            if part is None or role in self._training or not part.needs_training():
+                return
+            self._training.add(role)
+        threading.Thread(target=self._retrain, args=(role,), name='ann-index-trainer', daemon=True).start()
+
+    def _retrain(self, role):
+        try:
+            with self._lock:
+                part = self._partitions[role]
+                data = part.snapshot() if len(part) >= IVF_MIN else None
+            # The expensive part runs without the lock
+            centroids = train_centroids(data) if data is not None else None
+            with self._lock:
+                part.install(centroids)
+        except Exception as e:
+            print(f"ANN index retrain error ({role}): {e}")
+        finally:
+            with self._lock:
+                self._training.discard(role)
+
+    # ---- queries ----
+
+    def search(self, role, vector, k=50, exclude=()):
+        """[(user_id, cosine)] of the k nearest profiles of `role`, best first"""
+        if self._state != 'ready':
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        with self._lock:
+            part = self._partitions.get(role)
+            if part is None or part.dim != len(query):
+                return []
+            return part.search(query, k, set(exclude))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self._state,
+                'partitions': {role: {'size': len(p), 'lists': 0 if p.centroids is None else len(p.centroids)}
+                               for role, p in self._partitions.items()},
+            }
+
+
+# Shared index (loads lazily)
+ann_index = AnnIndex()
@@ -0,0 +1,351 @@
+"""
+Offline recommendation run for every student and alumnus.
+
+Instead of paying get_recommended_users() per request, a nightly (or
+post-import) run scores each user against every user of the other role
+and fills user_recommendations / recommendation_status, which
+models/recommendation_store.py serves from. Same rules as
+models/scoring.py (+5 branch, +5 per matching candidate skill, +2 per
+mutual connection, +3 domain, +2 city, round(cosine * 10) semantic,
+collaborative points from the trained factors), same exclusions (connected, pending request), top 5, ties by user id.
+
+Pipeline:
+
+1. export() reads users, connections, pending requests and current
+   profile vectors once and writes them as .npy files: categorical codes,
+   skill and adjacency lists in CSR form (plus a skill -> user posting
+   list), the embedding matrix and the collaborative factors. Rows are ordered by (role, id), so
+   each role is a contiguous slice.
+2. Shards of rows go to a ProcessPoolExecutor. Workers open the files
+   with mmap_mode='r', so the OS page cache holds one copy shared by all
+   of them, and score USER_BLOCK users at a time (one matrix product for
+   the semantic part, bincounts over posting lists for skills and mutual
+   connections).
+3. The parent bulk-inserts each shard's results in one transaction as
+   it completes, while the other shards are still being scored.
+
+Workers only import NumPy and the scoring constants; run() sets the BLAS
+thread count to 1 for them so N workers use N cores, not N x threads.
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from models import skills as skill_index
+from models.scoring import (BRANCH_POINTS, CITY_POINTS, DOMAIN_POINTS, MUTUAL_POINTS,
+                            SEMANTIC_SCALE, SKILL_POINTS)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+TOP_K = 5
+SHARD_SIZE = 2000       # users per pool task
+USER_BLOCK = 64         # users per matrix product inside a worker
+_TARGET = {'student': 'alumni', 'alumni': 'student'}
+_CATEGORIES = (('branch', 'branch', BRANCH_POINTS), ('domain', 'current_domain', DOMAIN_POINTS),
+               ('city', 'city', CITY_POINTS))
+_BLAS_THREADS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+
+
+# ==================== EXPORT (parent) ====================
+
+def _csr(lists):
+    """(ptr, values) for a list of int lists"""
+    ptr = np.zeros(len(lists) + 1, dtype=np.int64)
+    ptr[1:] = np.cumsum([len(values) for values in lists])
+    values = np.fromiter((v for values in lists for v in values), dtype=np.int64, count=int(ptr[-1]))
+    return ptr, values
+
+
+def _invert(ptr, values, size):
+    """CSR of value -> rows listing it (with multiplicity) from a row -> values CSR"""
+    rows = np.repeat(np.arange(len(ptr) - 1, dtype=np.int64), np.diff(ptr))
+    order = np.argsort(values, kind='stable')
+    post_ptr = np.zeros(size + 1, dtype=np.int64)
+    post_ptr[1:] = np.cumsum(np.bincount(values, minlength=size))
+    return post_ptr, rows[order]
+
+
+def export(workdir):
+    """Snapshot everything the workers need into workdir. Returns the run's metadata."""
+    from db_utils import get_db_connection
+    from models import embeddings
+    from models.collaborative import collaborative_model
+
+    conn = get_db_connection()
+    try:
+        last_change = conn.execute('SELECT MAX(id) AS last_id FROM recommendation_changes').fetchone()['last_id']
+        users = conn.execute('''
+            SELECT id, role, branch, current_domain, city, skills, bio, interests
+            FROM users WHERE role IN ('student', 'alumni')
+            ORDER BY role, id
+        ''').fetchall()
+        edges = conn.execute('SELECT user_id_1, user_id_2 FROM connections').fetchall()
+        pending = conn.execute(
+            "SELECT sender_id, receiver_id FROM connection_requests WHERE status = 'pending'"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    n = len(users)
+    ids = np.array([user['id'] for user in users], dtype=np.int64)
+    row_of = {int(user_id): row for row, user_id in enumerate(ids)}
+    arrays = {'ids': ids}
+
+    ranges = {}
+    for row, user in enumerate(users):
+        start, _ = ranges.get(user['role'], (row, row))
+        ranges[user['role']] = (start, row + 1)
+
+    for name, column, _ in _CATEGORIES:
+        vocab = {}
+        arrays[name] = np.array([vocab.setdefault(user[column].lower(), len(vocab)) if user[column] else -1
+                                 for user in users], dtype=np.int32)
+
+    # Skills: every listed entry (duplicates count twice, as in score_one) and
+    # the posting list skill -> rows
+    skill_vocab = {}
+    skill_ptr, skill_codes = _csr([[skill_vocab.setdefault(s, len(skill_vocab)) for s in skill_index.split(user['skills'])]
+                                   for user in users])
+    post_ptr, post_rows = _invert(skill_ptr, skill_codes, len(skill_vocab))
+    arrays.update(skill_ptr=skill_ptr, skill_codes=skill_codes, post_ptr=post_ptr, post_rows=post_rows)
+
+    # Connections as an undirected graph over every user id that appears (a
+    # faculty connection still counts as a mutual one), in node space
+    pairs = {(min(e['user_id_1'], e['user_id_2']), max(e['user_id_1'], e['user_id_2']))
+             for e in edges if e['user_id_1'] != e['user_id_2']}
+    node_ids = np.unique(np.concatenate([ids, np.array([u for pair in pairs for u in pair], dtype=np.int64)]))
+    node_of = {int(user_id): node for node, user_id in enumerate(node_ids)}
+    neighbours = [[] for _ in range(len(node_ids))]
+    for a, b in pairs:
+        neighbours[node_of[a]].append(node_of[b])
+        neighbours[node_of[b]].append(node_of[a])
+    arrays['adj_ptr'], arrays['adj_nodes'] = _csr(neighbours)
+    arrays['user_node'] = np.searchsorted(node_ids, ids).astype(np.int64)
+    node_row = np.full(len(node_ids), -1, dtype=np.int64)
+    node_row[arrays['user_node']] = np.arange(n, dtype=np.int64)
+    arrays['node_row'] = node_row
+
+    # Pending requests either way are excluded, like connections
+    excluded = [[] for _ in range(n)]
+    for req in pending:
+        a, b = row_of.get(req['sender_id']), row_of.get(req['receiver_id'])
+        if a is not None and b is not None:
+            excluded[a].append(b)
+            excluded[b].append(a)
+    arrays['pend_ptr'], arrays['pend_rows'] = _csr(excluded)
+
+    # Current profile vectors only (stale ones score no AI points, as online)
+    stored = embeddings.load_vectors(ids.tolist()) if n else {}
+    vectors = [embeddings.current_vector(stored, user['id'], embeddings.profile_text(user['bio'], user['interests']))
+               for user in users]
+    dim = next((len(v) for v in vectors if v is not None), 0)
+    emb = np.zeros((n, dim), dtype=np.float32)
+    has_emb = np.zeros(n, dtype=bool)
+    for row, vector in enumerate(vectors):
+        if vector is not None and len(vector) == dim:
+            emb[row] = vector
+            has_emb[row] = True
+    arrays.update(emb=emb, has_emb=has_emb)
+
+    # Collaborative factors per row (zeros for users the model has not seen)
+    cf_rank = cf_points = 0
+    aligned = collaborative_model.aligned(ids)
+    if aligned is not None:
+        arrays['cf_user'], arrays['cf_item'], cf_points = aligned
+        cf_rank = arrays['cf_user'].shape[1]
+
+    for name, array in arrays.items():
+        np.save(os.path.join(workdir, f"{name}.npy"), array)
+    meta = {'users': n, 'dim': dim, 'ranges': ranges, 'last_change': last_change,
+            'cf_rank': cf_rank, 'cf_points': cf_points}
+    with open(os.path.join(workdir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+    return meta
+
+
+# ==================== SCORING (workers) ====================
+
+_data = {}
+
+
+def _init_worker(workdir):
+    for name in os.listdir(workdir):
+        if name.endswith('.npy'):
+            _data[name[:-4]] = np.load(os.path.join(workdir, name), mmap_mode='r')
+    with open(os.path.join(workdir, 'meta.json')) as f:
+        _data['meta'] = json.load(f)
+
+
+def _gather(ptr, values, keys):
+    """values of every key's CSR slice, concatenated"""
+    starts = ptr[keys]
+    lengths = ptr[keys + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+    return values[offsets]
+
+
+def _in_range(rows, lo, hi):
+    return rows[(rows >= lo) & (rows < hi)] - lo
+
+
+def _score_block(rows, lo, hi):
+    """(len(rows) x candidates) scores of users `rows` against candidate rows [lo, hi)"""
+    d = _data
+    m = hi - lo
+    scores = np.zeros((len(rows), m), dtype=np.int64)
+
+    for name, _, points in _CATEGORIES:
+        codes = d[name]
+        mine = codes[rows][:, None]
+        scores += ((codes[lo:hi][None, :] == mine) & (mine >= 0)) * points
+
+    dim = d['meta']['dim']
+    has_user = d['has_emb'][rows]
+    if dim and has_user.any():
+        # np.rint rounds half to even, like round()
+        sims = (d['emb'][rows] @ d['emb'][lo:hi].T).astype(np.float64)
+        semantic = np.rint(sims * SEMANTIC_SCALE).astype(np.int64)
+        semantic[~has_user] = 0
+        semantic[:, ~d['has_emb'][lo:hi]] = 0
+        scores += semantic
+
+    if d['meta']['cf_rank']:
+        cf = d['cf_user'][rows] @ d['cf_item'][lo:hi].T
+        scores += np.rint(np.clip(cf, 0, 1) * d['meta']['cf_points']).astype(np.int64)
+
+    for b, row in enumerate(rows):
+        mine = np.unique(d['skill_codes'][d['skill_ptr'][row]:d['skill_ptr'][row + 1]])
+        if mine.size:
+            hits = _in_range(_gather(d['post_ptr'], d['post_rows'], mine), lo, hi)
+            scores[b] += np.bincount(hits, minlength=m) * SKILL_POINTS
+
+        node = d['user_node'][row]
+        friends = d['adj_nodes'][d['adj_ptr'][node]:d['adj_ptr'][node + 1]]
+        if friends.size:
+            fof = _in_range(d['node_row'][_gather(d['adj_ptr'], d['adj_nodes'], friends)], lo, hi)
+            scores[b] += np.bincount(fof, minlength=m) * MUTUAL_POINTS
+            # Already connected: excluded
+            scores[b, _in_range(d['node_row'][friends], lo, hi)] = 0
+        scores[b, _in_range(d['pend_rows'][d['pend_ptr'][row]:d['pend_ptr'][row + 1]], lo, hi)] = 0
+    return scores
+
+
+def _top_k(scores, k):
+    """Indices of the k best positive scores, best first, ties by index"""
+    positive = np.flatnonzero(scores > 0)
+    if positive.size > k:
+        kth = np.partition(scores[positive], positive.size - k)[positive.size - k]
+        above = positive[scores[positive] > kth]
+        ties = positive[scores[positive] == kth][:k - above.size]
+        positive = np.concatenate([above, ties])
+    return positive[np.lexsort((positive, -scores[positive]))]
+
+
+def score_shard(start, stop, k=TOP_K):
+    """(user ids, candidate ids [users x k, -1 padded], scores) for rows [start, stop)"""
+    d = _data
+    ranges = d['meta']['ranges']
+    cands = np.full((stop - start, k), -1, dtype=np.int64)
+    points = np.zeros((stop - start, k), dtype=np.int64)
+    for role, (role_lo, role_hi) in ranges.items():
+        target = ranges.get(_TARGET[role])
+        if not target:
+            continue
+        seg_lo, seg_hi = max(start, role_lo), min(stop, role_hi)
+        for block_lo in range(seg_lo, seg_hi, USER_BLOCK):
+            rows = np.arange(block_lo, min(block_lo + USER_BLOCK, seg_hi))
+            scores = _score_block(rows, *target)
+            for b, row in enumerate(rows):
+                chosen = _top_k(scores[b], k)
+                cands[row - start, :len(chosen)] = d['ids'][target[0] + chosen]
+                points[row - start, :len(chosen)] = scores[b, chosen]
+    return np.array(d['ids'][start:stop]), cands, points
+
+
+# ==================== RUN (parent) ====================
+
+def _write(user_ids, cands, points, computed_at):
+    """Replace the stored lists of one shard's users in one transaction"""
+    from db_utils import transaction
+    rows, status = [], []
+    for user_id, user_cands, user_points in zip(user_ids.tolist(), cands.tolist(), points.tolist()):
+        rows.extend((user_id, rank, cand, score)
+                    for rank, (cand, score) in enumerate(zip(user_cands, user_points)) if cand >= 0)
+        status.append((user_id, computed_at))
+    with transaction() as conn:
+        conn.executemany('DELETE FROM user_recommendations WHERE user_id = ?', [(uid,) for uid, _ in status])
+        conn.executemany(
+            'INSERT INTO user_recommendations (user_id, rank, candidate_id, score) VALUES (?, ?, ?, ?)', rows
+        )
+        conn.executemany('INSERT OR REPLACE INTO recommendation_status (user_id, computed_at) VALUES (?, ?)', status)
+
+
+def _clear_changes(last_id):
+    from db_utils import transaction
+    with transaction() as conn:
+        conn.execute('DELETE FROM recommendation_changes WHERE id <= ?', (last_id,))
+
+
+def run(workers=None, shard_size=SHARD_SIZE, k=TOP_K, write=True):
+    """
+    Score every student and alumnus and (unless write=False) store the
+    results. Returns a report: users, workers, shards, stage seconds and
+    users_per_sec (scoring + writing wall time).
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError('the batch pipeline needs NumPy')
+    workers = workers or os.cpu_count() or 1
+    report = {'workers': workers, 'written': 0}
+    started = time.perf_counter()
+
+    with tempfile.TemporaryDirectory(prefix='batch-recommendations-') as workdir:
+        meta = export(workdir)
+        n = meta['users']
+        report['users'] = n
+        report['export_s'] = round(time.perf_counter() - started, 3)
+
+        shards = [(lo, min(lo + shard_size, n)) for lo in range(0, n, shard_size)]
+        report['shards'] = len(shards)
+        write_s = 0.0
+        scoring_started = time.perf_counter()
+        if shards:
+            # Children read the BLAS thread count at import: one thread per worker
+            saved = {name: os.environ.get(name) for name in _BLAS_THREADS}
+            os.environ.update({name: '1' for name in _BLAS_THREADS})
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                         initializer=_init_worker, initargs=(workdir,)) as pool:
+                    futures = [pool.submit(score_shard, lo, hi, k) for lo, hi in shards]
+                    for future in as_completed(futures):
+                        user_ids, cands, points = future.result()
+                        if write:
+                            write_started = time.perf_counter()
+                            _write(user_ids, cands, points, time.time())
+                            write_s += time.perf_counter() - write_started
+                            report['written'] += len(user_ids)
+            finally:
+                for name, value in saved.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+        if write and meta['last_change'] is not None:
+            _clear_changes(meta['last_change'])
+
+        elapsed = time.perf_counter() - scoring_started
+        report['score_s'] = round(elapsed, 3)
+        report['write_s'] = round(write_s, 3)
+        report['total_s'] = round(time.perf_counter() - started, 3)
+        report['users_per_sec'] = round(n / elapsed, 1) if elapsed > 0 else None
+    return report
@@ -0,0 +1,297 @@
+"""
+Collaborative filtering from connection and request history.
+
+Rule scores only look at profiles. This engine learns from who actually
+connects with whom: a user x user interaction matrix, factorised offline
+with a truncated SVD, gives every user two small vectors
+
+    user_factors[u]   u as the one reaching out
+    item_factors[c]   c as the one being reached
+
+and user_factors[u] . item_factors[c] estimates how strongly u would
+interact with c (about 1 for "would connect"). At request time a
+candidate costs one dot product, added to the rule score as
+round(clip(dot, 0, 1) * COLLABORATIVE_POINTS).
+
+Interactions (row -> column weights, summed):
+    accepted connection      1.0 both ways
+    conversation             0.5 both ways
+    pending request          0.5 sender -> receiver
+    rejected request         0.5 sender -> receiver, -0.5 receiver -> sender
+
+Training (scripts/train_collaborative.py, nightly) keeps the matrix in CSR
+arrays and runs a randomized SVD (range finder + power iterations) with
+NumPy only, then writes ids and float32 factors to one .npz file, stamped
+with the database it was trained on. Serving processes load that file
+lazily, pick up a retrained one by mtime and ignore a file from another
+database (its ids would be different users). Without NumPy or a matching
+trained file, scores get no collaborative points.
+"""
+
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from db_utils import get_engine
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+FACTORS_PATH = 'data/collaborative_factors.npz'
+RANK = 32
+OVERSAMPLE = 10
+POWER_ITERATIONS = 3
+POINTS = 5
+RELOAD_CHECK = 60.0     # seconds between checks for a retrained file
+
+CONNECTION_WEIGHT = 1.0
+CONVERSATION_WEIGHT = 0.5
+REQUEST_WEIGHT = 0.5
+REJECTED_WEIGHT = -0.5
+
+_settings = {'enabled': False, 'path': FACTORS_PATH, 'points': POINTS}
+
+
+# ==================== TRAINING ====================
+
+class InteractionMatrix:
+    """Square sparse matrix over user ids, kept as CSR arrays (and its transpose)"""
+
+    def __init__(self, rows, cols, weights):
+        ids = np.unique(np.concatenate([rows, cols])) if len(rows) else np.zeros(0, dtype=np.int64)
+        self.ids = ids
+        r = np.searchsorted(ids, rows)
+        c = np.searchsorted(ids, cols)
+        self.csr = self._compress(r, c, np.asarray(weights, dtype=np.float64), len(ids))
+        self.csr_t = self._compress(c, r, np.asarray(weights, dtype=np.float64), len(ids))
+        self.nnz = len(self.csr[1])
+
+    @staticmethod
+    def _compress(rows, cols, weights, n):
+        # Duplicate (row, col) pairs are summed
+        keys = rows * max(n, 1) + cols
+        keys, inverse = np.unique(keys, return_inverse=True)
+        values = np.bincount(inverse, weights=weights)
+        keep = values != 0
+        keys, values = keys[keep], values[keep]
+        rows, cols = keys // max(n, 1), keys % max(n, 1)
+        ptr = np.zeros(n + 1, dtype=np.int64)
+        ptr[1:] = np.cumsum(np.bincount(rows, minlength=n))
+        return ptr, cols, values
+
+    @staticmethod
+    def _matmul(csr, dense):
+        ptr, cols, values = csr
+        out = np.zeros((len(ptr) - 1, dense.shape[1]))
+        nonempty = np.flatnonzero(np.diff(ptr))
+        if nonempty.size:
+            products = values[:, None] * dense[cols]
+            out[nonempty] = np.add.reduceat(products, ptr[nonempty], axis=0)
+        return out
+
+    def dot(self, dense):
+        """A @ dense"""
+        return self._matmul(self.csr, dense)
+
+    def tdot(self, dense):
+        """A.T @ dense"""
+        return self._matmul(self.csr_t, dense)
+
+
+def load_interactions(conn, exclude_pairs=()):
+    """InteractionMatrix of the history in the database (minus exclude_pairs, for evaluation)"""
+    rows, cols, weights = [], [], []
+    skip = {(min(a, b), max(a, b)) for a, b in exclude_pairs}
+
+    def add(a, b, weight):
+        rows.append(a)
+        cols.append(b)
+        weights.append(weight)
+
+    for row in conn.execute('SELECT user_id_1, user_id_2 FROM connections').fetchall():
+        a, b = row['user_id_1'], row['user_id_2']
+        if a != b and (min(a, b), max(a, b)) not in skip:
+            add(a, b, CONNECTION_WEIGHT)
+            add(b, a, CONNECTION_WEIGHT)
+    for row in conn.execute('SELECT user_id_1, user_id_2 FROM conversations').fetchall():
+        a, b = row['user_id_1'], row['user_id_2']
+        if a != b and (min(a, b), max(a, b)) not in skip:
+            add(a, b, CONVERSATION_WEIGHT)
+            add(b, a, CONVERSATION_WEIGHT)
+    for row in conn.execute(
+        "SELECT sender_id, receiver_id, status FROM connection_requests WHERE status IN ('pending', 'rejected')"
+    ).fetchall():
+        a, b = row['sender_id'], row['receiver_id']
+        if a == b or (min(a, b), max(a, b)) in skip:
+            continue
+        add(a, b, REQUEST_WEIGHT)
+        if row['status'] == 'rejected':
+            add(b, a, REJECTED_WEIGHT)
+    return InteractionMatrix(np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), weights)
+
+
+def factorise(matrix, rank=RANK, oversample=OVERSAMPLE, power_iterations=POWER_ITERATIONS, seed=0):
+    """(user_factors, item_factors, singular values) of a randomized truncated SVD"""
+    n = len(matrix.ids)
+    rank = min(rank, n)
+    width = min(rank + oversample, n)
+    rng = np.random.default_rng(seed)
+    # Range finder: an orthonormal basis for A's dominant column space
+    basis, _ = np.linalg.qr(matrix.dot(rng.normal(size=(n, width))))
+    for _ in range(power_iterations):
+        basis, _ = np.linalg.qr(matrix.tdot(basis))
+        basis, _ = np.linalg.qr(matrix.dot(basis))
+    # A ~= basis @ (basis.T @ A); decompose the small (width x n) matrix exactly
+    small = matrix.tdot(basis).T
+    u_small, singular, vt = np.linalg.svd(small, full_matrices=False)
+    u = basis @ u_small[:, :rank]
+    root = np.sqrt(singular[:rank])
+    return (u * root).astype(np.float32), (vt[:rank].T * root).astype(np.float32), singular[:rank]
+
+
+def database_identity(target):
+    """What a factors file records as its source: the absolute file path, or host/db of a URL (no credentials)"""
+    if target.startswith(('postgres://', 'postgresql://')):
+        parts = urlsplit(target)
+        return f"{parts.hostname}:{parts.port or 5432}{parts.path}"
+    return os.path.abspath(target)
+
+
+def save(path, ids, user_factors, item_factors, singular, source):
+    """Write the factors file atomically (serving processes may be reading the old one)"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp = os.path.join(directory, f".{os.path.basename(path)}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        np.savez(f, ids=ids, user_factors=user_factors, item_factors=item_factors,
+                 singular=singular, trained_at=np.array(time.time()), source=np.array(source))
+    os.replace(tmp, path)
+
+
+def train(conn, path=None, rank=RANK, exclude_pairs=(), seed=0):
+    """Load the history, factorise it and write the factors file. Returns a summary."""
+    started = time.perf_counter()
+    matrix = load_interactions(conn, exclude_pairs)
+    summary = {'users': len(matrix.ids), 'interactions': matrix.nnz, 'rank': 0}
+    if matrix.nnz:
+        user_factors, item_factors, singular = factorise(matrix, rank, seed=seed)
+        save(path or _settings['path'], matrix.ids, user_factors, item_factors, singular,
+             database_identity(conn.target))
+        summary['rank'] = user_factors.shape[1]
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+# ==================== SERVING ====================
+
+class CollaborativeModel:
+    """Factor arrays from the trained file, reloaded when it changes"""
+
+    def __init__(self):
+        self._factors = None    # (ids, user_factors, item_factors, trained_at)
+        self._mtime = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self):
+        now = time.time()
+        if now - self._checked < RELOAD_CHECK:
+            return self._factors
+        with self._lock:
+            if now - self._checked < RELOAD_CHECK:
+                return self._factors
+            self._checked = now
+            path = _settings['path']
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                self._factors, self._mtime = None, None
+                return None
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self._factors = None
+                try:
+                    with np.load(path) as data:
+                        source = str(data['source']) if 'source' in data.files else None
+                        expected = database_identity(get_engine().db_name)
+                        if source != expected:
+                            print(f"⚠ Collaborative factors in {path} were trained on {source or 'an unknown database'}, "
+                                  f"not {expected}; ignoring them (retrain with scripts/train_collaborative.py)")
+                        else:
+                            self._factors = (data['ids'], data['user_factors'], data['item_factors'],
+                                             float(data['trained_at']))
+                            print(f"✓ Collaborative factors loaded: {len(self._factors[0])} users, "
+                                  f"rank {self._factors[1].shape[1]}")
+                except Exception as e:
+                    print(f"Collaborative factors load error: {e}")
+            return self._factors
+
+    def is_ready(self):
+        return _settings['enabled'] and NUMPY_AVAILABLE and self._current() is not None
+
+    def _rows(self, ids, user_ids):
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        rows = np.searchsorted(ids, user_ids)
+        rows[rows >= len(ids)] = 0
+        found = ids[rows] == user_ids if len(ids) else np.zeros(len(user_ids), dtype=bool)
+        return rows, found
+
+    def scores(self, user_id, candidate_ids):
+        """Raw dot products (0 for users the model has not seen), candidate order"""
+        factors = self._current() if _settings['enabled'] and NUMPY_AVAILABLE else None
+        if factors is None or not len(candidate_ids):
+            return np.zeros(len(candidate_ids), dtype=np.float32)
+        ids, user_factors, item_factors, _ = factors
+        (row,), (known,) = self._rows(ids, [user_id])
+        if not known:
+            return np.zeros(len(candidate_ids), dtype=np.float32)
+        rows, found = self._rows(ids, candidate_ids)
+        return np.where(found, item_factors[rows] @ user_factors[row], 0).astype(np.float32)
+
+    def points(self, user_id, candidate_ids):
+        """{candidate id: collaborative points} for candidates that earn any"""
+        if not self.is_ready():
+            return {}
+        scores = self.scores(user_id, candidate_ids)
+        points = np.rint(np.clip(scores, 0, 1) * _settings['points']).astype(np.int64)
+        return {int(cid): int(p) for cid, p in zip(candidate_ids, points) if p}
+
+    def aligned(self, user_ids):
+        """
+        (user_factors, item_factors, points) with one row per id in user_ids
+        (zeros for users the model has not seen), or None without a model
+        """
+        if not self.is_ready():
+            return None
+        ids, user_factors, item_factors, _ = self._current()
+        rows, found = self._rows(ids, user_ids)
+        users = np.zeros((len(rows), user_factors.shape[1]), dtype=np.float32)
+        items = np.zeros_like(users)
+        users[found] = user_factors[rows[found]]
+        items[found] = item_factors[rows[found]]
+        return users, items, _settings['points']
+
+    def stats(self):
+        factors = self._factors
+        return {
+            'enabled': _settings['enabled'],
+            'users': len(factors[0]) if factors else 0,
+            'rank': factors[1].shape[1] if factors else 0,
+            'trained_at': factors[3] if factors else None,
+        }
+
+
+def init_app(app):
+    """Configure from app config (COLLABORATIVE_*)"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('COLLABORATIVE_FILTERING', True)
+    _settings['path'] = cfg.get('COLLABORATIVE_FACTORS_PATH', FACTORS_PATH)
+    _settings['points'] = cfg.get('COLLABORATIVE_POINTS', POINTS)
+
+
+# Shared model (file loaded on first use)
+collaborative_model = CollaborativeModel()
@@ -0,0 +1,265 @@
+"""
+In-memory connection graph.
+
+Mutual-connection scoring used to query `connections` for every candidate
+on every recommendation request and rebuild Python sets from the rows.
+This graph loads the table once into an adjacency map (user id -> sorted
+array of neighbour ids) and answers, without touching the database:
+
+- neighbours(u) / mutual_count(a, b) / mutual_counts(u, ids)
+- people_you_may_know(u): friends-of-friends ranked by mutual connections
+- degree_of_separation(a, b): bidirectional BFS, None past max_depth
+
+Writers in this process keep it current: add_connection() after a
+request is accepted, remove_user() after a user is deleted. Adjacency
+arrays are copy-on-write, so a reader holding one never sees it change
+underneath it.
+
+Other processes (gunicorn workers, serverless instances) change the table
+too, so the graph is not trusted blindly. At most every CHECK_INTERVAL
+seconds is_ready() reads a two-part token: MAX(id) of connections (ids are
+never reused, so every insert raises it) and the connection_deletes
+counter that deleting writers bump with note_connections_deleted(). The local
+updates advance the loaded token by exactly their own change, so it only
+falls behind when another process wrote; then is_ready() answers False
+and reloads in the background. Callers keep their SQL path while
+is_ready() is False, and never use the graph for exclusions (who the
+user is already connected to).
+
+Like the ANN index, it loads on a background thread the first time
+is_ready() is asked.
+"""
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+
+from db_utils import get_db_connection
+
+_EMPTY = array('q')
+CHECK_INTERVAL = 5.0
+
+_TOKEN_SQL = '''
+    SELECT (SELECT MAX(id) FROM connections),
+           (SELECT value FROM change_counters WHERE name = 'connection_deletes')
+'''
+
+
+def note_connections_deleted(conn):
+    """Call in the transaction that deleted connections rows (when it deleted any)"""
+    conn.execute("UPDATE change_counters SET value = value + 1 WHERE name = 'connection_deletes'")
+
+
+def _contains(sorted_ids, value):
+    i = bisect_left(sorted_ids, value)
+    return i < len(sorted_ids) and sorted_ids[i] == value
+
+
+class ConnectionGraph:
+    """Process-wide adjacency map of the connections table"""
+
+    def __init__(self):
+        self._adj = {}
+        self._edges = 0
+        self._lock = threading.RLock()
+        self._state = 'idle'
+        self._pending = []
+        self._token = None
+        self._checked_at = 0.0
+        self._reloads = 0
+
+    # ---- loading ----
+
+    def is_ready(self):
+        """True once loaded and still matching the table; otherwise starts a (re)load"""
+        if self._state == 'ready':
+            if time.time() - self._checked_at < CHECK_INTERVAL or self._still_current():
+                return True
+            with self._lock:
+                if self._state == 'ready':
+                    self._state = 'idle'
+                    self._reloads += 1
+        if self._state == 'idle':
+            with self._lock:
+                if self._state == 'idle':
+                    self._state = 'loading'
+                    threading.Thread(target=self._load, name='connection-graph-loader', daemon=True).start()
+        return False
+
+    def _read_token(self, conn):
+        max_id, deletes = conn.execute(_TOKEN_SQL).fetchone()
+        return [max_id or 0, deletes or 0]
+
+    def _still_current(self):
+        """Compare the table's token with the loaded one (another process may have written)"""
+        conn = get_db_connection()
+        try:
+            token = self._read_token(conn)
+        finally:
+            conn.close()
+        self._checked_at = time.time()
+        # A local delete may lower MAX(id); only a higher one means someone else inserted
+        max_id, deletes = token
+        return deletes == self._token[1] and max_id <= self._token[0]
+
+    def _load(self):
+        try:
+            self.load()
+        except Exception as e:
+            print(f"Connection graph load error: {e}")
+            with self._lock:
+                self._state = 'idle'
+
+    def load(self):
+        """(Re)build the adjacency map from the connections table"""
+        conn = get_db_connection()
+        try:
+            # Token first: a write landing in between only causes one extra reload
+            token = self._read_token(conn)
+            rows = conn.execute('SELECT user_id_1, user_id_2 FROM connections').fetchall()
+        finally:
+            conn.close()
+
+        lists = {}
+        for row in rows:
+            a, b = row['user_id_1'], row['user_id_2']
+            if a == b:
+                continue
+            lists.setdefault(a, []).append(b)
+            lists.setdefault(b, []).append(a)
+        adj = {user_id: array('q', sorted(set(ids))) for user_id, ids in lists.items()}
+
+        with self._lock:
+            self._adj = adj
+            self._edges = sum(len(ids) for ids in adj.values()) // 2
+            self._token = token
+            self._checked_at = time.time()
+            # Changes that arrived while we were reading
+            pending, self._pending = self._pending, []
+            self._state = 'ready'
+            for op in pending:
+                op()
+        print(f"✓ Connection graph loaded: {len(adj)} users, {self._edges} connections")
+
+    # ---- incremental updates ----
+
+    def _insert(self, user_id, other):
+        ids = self._adj.get(user_id, _EMPTY)
+        i = bisect_left(ids, other)
+        if i < len(ids) and ids[i] == other:
+            return False
+        updated = array('q', ids[:i])
+        updated.append(other)
+        updated.extend(ids[i:])
+        self._adj[user_id] = updated
+        return True
+
+    def _delete(self, user_id, other):
+        ids = self._adj.get(user_id)
+        if ids is None or not _contains(ids, other):
+            return
+        i = bisect_left(ids, other)
+        updated = ids[:i] + ids[i + 1:]
+        if updated:
+            self._adj[user_id] = updated
+        else:
+            del self._adj[user_id]
+
+    def add_connection(self, user_a, user_b):
+        """Record a new connection (after it was committed)"""
+        user_a, user_b = int(user_a), int(user_b)
+        if user_a == user_b:
+            return
+        with self._lock:
+            if self._state == 'loading':
+                self._pending.append(lambda: self.add_connection(user_a, user_b))
+                return
+            if self._state != 'ready':
+                return
+            if self._insert(user_a, user_b):
+                self._insert(user_b, user_a)
+                self._edges += 1
+                # Our own row took the next id
+                self._token[0] += 1
+
+    def remove_user(self, user_id):
+        """Drop a deleted user and all of their connections (after note_connections_deleted was committed)"""
+        user_id = int(user_id)
+        with self._lock:
+            if self._state == 'loading':
+                self._pending.append(lambda: self.remove_user(user_id))
+                return
+            if self._state != 'ready':
+                return
+            neighbours = self._adj.pop(user_id, _EMPTY)
+            for other in neighbours:
+                self._delete(other, user_id)
+            self._edges -= len(neighbours)
+            if neighbours:
+                # The delete bumped connection_deletes (note_connections_deleted)
+                self._token[1] += 1
+
+    # ---- queries ----
+
+    def neighbours(self, user_id):
+        """Sorted array of the user's connections (do not modify)"""
+        return self._adj.get(user_id, _EMPTY)
+
+    def mutual_count(self, user_a, user_b):
+        small, large = self.neighbours(user_a), self.neighbours(user_b)
+        if len(small) > len(large):
+            small, large = large, small
+        return sum(1 for other in small if _contains(large, other))
+
+    def mutual_counts(self, user_id, candidate_ids):
+        """{candidate id: connections shared with user_id}"""
+        mine = set(self.neighbours(user_id))
+        return {cid: sum(1 for other in self.neighbours(cid) if other in mine) for cid in candidate_ids}
+
+    def people_you_may_know(self, user_id, limit=50, exclude=()):
+        """[(user_id, mutual connections)] of friends-of-friends, most mutuals first"""
+        direct = self.neighbours(user_id)
+        skip = set(direct)
+        skip.update(exclude)
+        skip.add(user_id)
+        counts = Counter()
+        for friend in direct:
+            counts.update(other for other in self.neighbours(friend) if other not in skip)
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def degree_of_separation(self, user_a, user_b, max_depth=6):
+        """Hops between two users (1 = connected), or None if further than max_depth"""
+        if user_a == user_b:
+            return 0
+        # Bidirectional BFS, one level at a time from the smaller frontier
+        dist = ({user_a: 0}, {user_b: 0})
+        frontiers = ([user_a], [user_b])
+        depths = [0, 0]
+        while frontiers[0] and frontiers[1] and depths[0] + depths[1] < max_depth:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, theirs = dist[side], dist[1 - side]
+            depths[side] += 1
+            best = None
+            nxt = []
+            for node in frontiers[side]:
+                for other in self.neighbours(node):
+                    if other in theirs:
+                        hops = depths[side] + theirs[other]
+                        best = hops if best is None else min(best, hops)
+                    elif other not in mine:
+                        mine[other] = depths[side]
+                        nxt.append(other)
+            if best is not None:
+                return best if best <= max_depth else None
+            frontiers = (nxt, frontiers[1]) if side == 0 else (frontiers[0], nxt)
+        return None
+
+    def stats(self):
+        return {'state': self._state, 'users': len(self._adj), 'connections': self._edges,
+                'reloads': self._reloads}
+
+
+# Shared graph (loads lazily)
+connection_graph = ConnectionGraph()
@@ -0,0 +1,195 @@
+"""
+Persisted profile embeddings for AI recommendations.
+
+The recommender compares users' "bio interests" text semantically. Instead
+of encoding that text for the user and every candidate on each dashboard
+load, each user's vector is stored once in profile_embeddings (float32
+blob, L2-normalised) together with a hash of the text it was built from:
+
+- refresh_async(user_id) re-encodes a profile on a background worker after
+  create/edit (no-op when the text hash is unchanged);
+- backfill() encodes every missing/stale profile once the model is ready;
+- load_vectors(ids) reads the vectors in bulk at scoring time, and
+  current_vector() only hands out vectors whose hash still matches the
+  text, so an edit never scores against an outdated embedding.
+
+Freshly written vectors are also pushed into the ANN index
+(models/ann_index.py).
+"""
+
+import hashlib
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from db_utils import get_db_connection, transaction
+from database import write_queue
+from models.ann_index import ann_index
+
+BATCH_SIZE = 64
+# SQLite's default bound-parameter limit is 999
+_IN_CHUNK = 900
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='embedding-worker')
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+
+def _engine():
+    # Imported late: models.recommendation imports this module
+    from models.recommendation import ai_engine
+    return ai_engine
+
+
+def profile_text(bio, interests):
+    """The text the recommender compares (same as the old per-request encode)"""
+    return f"{bio or ''} {interests or ''}".strip()
+
+
+def content_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def pack(vector):
+    return array('f', vector).tobytes()
+
+
+def unpack(blob):
+    vector = array('f')
+    vector.frombytes(blob)
+    return vector
+
+
+def cosine(a, b):
+    """Cosine similarity of two stored (already normalised) vectors"""
+    return sum(x * y for x, y in zip(a, b))
+
+
+# ==================== READ ====================
+
+def load_vectors(user_ids, model_name=None):
+    """{user_id: (content_hash, vector)} for the given users, one query per 900 ids"""
+    model_name = model_name or _engine().model_name
+    ids = list(dict.fromkeys(user_ids))
+    vectors = {}
+    conn = get_db_connection()
+    try:
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start:start + _IN_CHUNK]
+            placeholders = ','.join(['?'] * len(chunk))
+            rows = conn.execute(
+                f'SELECT user_id, content_hash, vector FROM profile_embeddings '
+                f'WHERE model = ? AND user_id IN ({placeholders})',
+                [model_name] + chunk
+            ).fetchall()
+            for row in rows:
+                vectors[row['user_id']] = (row['content_hash'], unpack(row['vector']))
+    finally:
+        conn.close()
+    return vectors
+
+
+def current_vector(vectors, user_id, text):
+    """The stored vector for user_id if it was built from `text`, else None"""
+    entry = vectors.get(user_id)
+    if entry is None or not text or entry[0] != content_hash(text):
+        return None
+    return entry[1]
+
+
+# ==================== WRITE ====================
+
+def _store(rows):
+    """Write job: upsert (user_id, hash, model, dim, blob) rows"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with transaction() as conn:
+        conn.executemany(
+            '''INSERT OR REPLACE INTO profile_embeddings (user_id, content_hash, model, dim, vector, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            [row + (now,) for row in rows]
+        )
+
+
+def refresh(user_ids):
+    """Encode the given users whose stored vector is missing or stale. Returns how many were written."""
+    engine = _engine()
+    if not user_ids or not engine.is_ready():
+        return 0
+
+    written = 0
+    ids = list(dict.fromkeys(user_ids))
+    for start in range(0, len(ids), BATCH_SIZE):
+        chunk = ids[start:start + BATCH_SIZE]
+        placeholders = ','.join(['?'] * len(chunk))
+        conn = get_db_connection()
+        try:
+            users = conn.execute(
+                f'SELECT id, role, bio, interests FROM users WHERE id IN ({placeholders})', chunk
+            ).fetchall()
+        finally:
+            conn.close()
+        stored = load_vectors(chunk, engine.model_name)
+
+        todo = []
+        for user in users:
+            text = profile_text(user['bio'], user['interests'])
+            if text and current_vector(stored, user['id'], text) is None:
+                todo.append((user['id'], user['role'], text))
+        if not todo:
+            continue
+
+        encoded = engine.model.encode([text for _, _, text in todo], batch_size=BATCH_SIZE,
+                                      normalize_embeddings=True, show_progress_bar=False)
+        rows = [(user_id, content_hash(text), engine.model_name, len(vector), pack(vector))
+                for (user_id, _, text), vector in zip(todo, encoded)]
+        write_queue.run(_store, rows)
+        for (user_id, role, _), vector in zip(todo, encoded):
+            ann_index.upsert(user_id, role, vector)
+        written += len(rows)
+    return written
+
+
+def _refresh_job(user_ids):
+    try:
+        refresh(user_ids)
+    except Exception as e:
+        print(f"Embedding refresh error: {e}")
+    finally:
+        with _in_flight_lock:
+            _in_flight.difference_update(user_ids)
+
+
+def refresh_async(*user_ids):
+    """Queue a background re-encode for profiles that were created/edited or found stale"""
+    if not _engine().enabled:
+        return
+    with _in_flight_lock:
+        todo = [uid for uid in user_ids if uid not in _in_flight]
+        _in_flight.update(todo)
+    if todo:
+        _executor.submit(_refresh_job, todo)
+
+
+def backfill():
+    """Encode every user without an up-to-date vector (runs when the model becomes ready)"""
+    conn = get_db_connection()
+    try:
+        ids = [row['id'] for row in conn.execute(
+            "SELECT id FROM users WHERE COALESCE(bio, '') != '' OR COALESCE(interests, '') != ''"
+        ).fetchall()]
+    finally:
+        conn.close()
+    written = refresh(ids)
+    if written:
+        print(f"✓ Profile embeddings backfilled: {written}")
+    return written
+
+
+def backfill_async():
+    def _job():
+        try:
+            backfill()
+        except Exception as e:
+            print(f"Embedding backfill error: {e}")
+    _executor.submit(_job)
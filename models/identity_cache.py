@@ -0,0 +1,131 @@
+"""
+Identity cache behind Flask-Login's load_user.
+
+load_user runs on every authenticated request and Socket.IO event. Cached
+users are served from an in-process LRU; an entry is trusted for
+USER_CACHE_TTL seconds, then revalidated with a one-column lookup
+
+    SELECT version FROM users WHERE id = ?
+
+and only reloaded when users.version moved (or the row is gone).
+
+Writes that change what load_user returns bump the stamp in the same
+statement (`version = version + 1`) and call user_cache.invalidate() after
+commit: this process sees the change at once, other workers within the
+TTL. Deletes only need invalidate(); revalidation finds no row.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from db_utils import get_db_connection
+
+MAX_ENTRIES = 5000
+TTL = 15.0
+
+_settings = {'enabled': False, 'max_entries': MAX_ENTRIES, 'ttl': TTL}
+
+
+class UserCache:
+    """LRU of user id -> [checked_at, version, user]"""
+
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generation = 0    # bumped by invalidate(); loads that raced one are not stored
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'revalidated': 0, 'reloads': 0, 'misses': 0,
+                        'evictions': 0, 'invalidations': 0}
+
+    def configure(self, max_entries, ttl):
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self._entries.clear()
+
+    def get(self, user_id, load):
+        """
+        The user for user_id; load(user_id) -> (version, user) or None is
+        called on a miss or when the stored version is stale.
+        """
+        user_id = int(user_id)
+        if not _settings['enabled']:
+            loaded = load(user_id)
+            return loaded[1] if loaded else None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._entries.move_to_end(user_id)
+                self._counts['hits'] += 1
+                return entry[2]
+            generation = self._generation
+
+        if entry is not None and _current_version(user_id) == entry[1]:
+            with self._lock:
+                if self._entries.get(user_id) is entry:
+                    entry[0] = now
+                    self._entries.move_to_end(user_id)
+                    self._counts['revalidated'] += 1
+                    return entry[2]
+
+        loaded = load(user_id)
+        with self._lock:
+            self._counts['reloads' if entry is not None else 'misses'] += 1
+            if loaded is None:
+                self._entries.pop(user_id, None)
+                return None
+            if generation == self._generation:
+                self._entries[user_id] = [now, loaded[0], loaded[1]]
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counts['evictions'] += 1
+        return loaded[1]
+
+    def invalidate(self, *user_ids):
+        """Drop these users (call after the commit that changed them)"""
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                if self._entries.pop(int(user_id), None) is not None:
+                    self._counts['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._entries)
+        lookups = counts['hits'] + counts['revalidated'] + counts['reloads'] + counts['misses']
+        counts.update(enabled=_settings['enabled'], size=size, max_entries=self.max_entries, ttl=self.ttl,
+                      hit_rate=round((counts['hits'] + counts['revalidated']) / lookups, 4) if lookups else None)
+        return counts
+
+
+def _current_version(user_id):
+    conn = get_db_connection()
+    try:
+        row = conn.execute('SELECT version FROM users WHERE id = ?', (user_id,)).fetchone()
+    finally:
+        conn.close()
+    return row['version'] if row else None
+
+
+def init_app(app):
+    """Configure from app config (USER_CACHE_*)"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('USER_CACHE', True)
+    _settings['max_entries'] = cfg.get('USER_CACHE_MAX_ENTRIES', MAX_ENTRIES)
+    _settings['ttl'] = cfg.get('USER_CACHE_TTL', TTL)
+    user_cache.configure(_settings['max_entries'], _settings['ttl'])
+
+
+# Shared by load_user and every write path that changes a user
+user_cache = UserCache()
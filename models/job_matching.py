@@ -0,0 +1,440 @@
+"""
+Job matching over precomputed job vectors.
+
+get_recommended_jobs() used to load every job ever posted and, with AI on,
+encode the user's text and each job's text inside the loop. Now:
+
+- each job's "title description" is encoded once into job_embeddings
+  (refresh_async() after post/edit, backfill() when the model is ready),
+  next to its skill postings in job_skills (models/skills.py);
+- JobMatcher keeps a snapshot of the open jobs only (active, status Open,
+  deadline not passed - read through idx_jobs_active_created): a job x
+  skill incidence matrix and a job x dim embedding matrix;
+- a user is scored against every open job in one pass: shared skills is
+  one matrix-vector product, the semantic part another, using the user's
+  stored profile vector (models/embeddings.py) so nothing is encoded per
+  request;
+- students_for_job() scores every student against all open jobs in
+  chunked matrix products and returns those whose top 5 the job enters.
+  Posting a job does not run it: jobs_changed() drops every cached job
+  match, so students see the new job ranked on their next visit.
+
+Score per job: shared skills + round(cosine * 10) / 2, as before, but
+the inputs changed:
+
+- shared skills count canonical skills (models/skills.py: case, spacing
+  and synonyms) from required_skills and skills_required; the old loop
+  matched lowercased text against required_skills only;
+- the cosine uses the user's stored profile vector, which encodes
+  "bio interests" (the same text user recommendations compare); the old
+  loop encoded "bio skills" per request. Skills already score through the
+  first term;
+- only open jobs are ranked (the old loop ranked closed and expired ones).
+
+The snapshot is rebuilt on the next call after a job changes
+(result_cache.jobs_changed() invalidates it) and when the date rolls over,
+so jobs drop out on their deadline.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from db_utils import get_db_connection, transaction
+from database import write_queue
+from models import embeddings
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+TOP_K = 5
+SEMANTIC_SCALE = 10
+BATCH_SIZE = 64
+# Students scored per matrix product in students_for_job()
+STUDENT_CHUNK = 1024
+# SQLite's default bound-parameter limit is 999
+_IN_CHUNK = 900
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-embedding-worker')
+_in_flight = set()
+_in_flight_lock = threading.Lock()
+
+_OPEN_JOBS_SQL = '''
+    SELECT j.id, j.title, j.description
+    FROM jobs j
+    JOIN users u ON j.posted_by = u.id
+    WHERE j.is_active = 1
+      AND COALESCE(j.job_status, 'Open') = 'Open'
+      AND (j.deadline IS NULL OR j.deadline = '' OR j.deadline >= ?)
+    ORDER BY j.created_at DESC
+'''
+
+
+def _engine():
+    # Imported late: models.recommendation imports this module
+    from models.recommendation import ai_engine
+    return ai_engine
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), _IN_CHUNK):
+        yield ids[start:start + _IN_CHUNK]
+
+
+def job_text(title, description):
+    """The text a job is compared on (same as the old per-request encode)"""
+    return f"{title or ''} {description or ''}".strip()
+
+
+def semantic_points(similarity):
+    """Semantic part of a job's score for one cosine similarity"""
+    return round(similarity * SEMANTIC_SCALE) / 2
+
+
+# ==================== EMBEDDINGS ====================
+
+def load_vectors(job_ids, model_name=None):
+    """{job_id: (content_hash, vector)} for the given jobs"""
+    model_name = model_name or _engine().model_name
+    vectors = {}
+    conn = get_db_connection()
+    try:
+        for chunk in _chunks(dict.fromkeys(job_ids)):
+            placeholders = ','.join(['?'] * len(chunk))
+            for row in conn.execute(
+                f'SELECT job_id, content_hash, vector FROM job_embeddings '
+                f'WHERE model = ? AND job_id IN ({placeholders})',
+                [model_name] + chunk
+            ).fetchall():
+                vectors[row['job_id']] = (row['content_hash'], embeddings.unpack(row['vector']))
+    finally:
+        conn.close()
+    return vectors
+
+
+def _store(rows):
+    """Write job: upsert (job_id, hash, model, dim, blob) rows"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with transaction() as conn:
+        conn.executemany(
+            '''INSERT OR REPLACE INTO job_embeddings (job_id, content_hash, model, dim, vector, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)''',
+            [row + (now,) for row in rows]
+        )
+
+
+def delete_job(conn, job_id):
+    conn.execute('DELETE FROM job_embeddings WHERE job_id = ?', (job_id,))
+
+
+def refresh(job_ids):
+    """Encode the given jobs whose stored vector is missing or stale. Returns how many were written."""
+    engine = _engine()
+    if not job_ids or not engine.is_ready():
+        return 0
+
+    written = 0
+    ids = list(dict.fromkeys(job_ids))
+    for start in range(0, len(ids), BATCH_SIZE):
+        chunk = ids[start:start + BATCH_SIZE]
+        placeholders = ','.join(['?'] * len(chunk))
+        conn = get_db_connection()
+        try:
+            jobs = conn.execute(
+                f'SELECT id, title, description FROM jobs WHERE id IN ({placeholders})', chunk
+            ).fetchall()
+        finally:
+            conn.close()
+        stored = load_vectors(chunk, engine.model_name)
+
+        todo = []
+        for job in jobs:
+            text = job_text(job['title'], job['description'])
+            entry = stored.get(job['id'])
+            if text and (entry is None or entry[0] != embeddings.content_hash(text)):
+                todo.append((job['id'], text))
+        if not todo:
+            continue
+
+        encoded = engine.model.encode([text for _, text in todo], batch_size=BATCH_SIZE,
+                                      normalize_embeddings=True, show_progress_bar=False)
+        rows = [(job_id, embeddings.content_hash(text), engine.model_name, len(vector), embeddings.pack(vector))
+                for (job_id, text), vector in zip(todo, encoded)]
+        write_queue.run(_store, rows)
+        written += len(rows)
+
+    if written:
+        # New vectors move scores: drop the snapshot and cached job matches
+        from models import result_cache
+        result_cache.jobs_changed()
+    return written
+
+
+def _refresh_job(job_ids):
+    try:
+        refresh(job_ids)
+    except Exception as e:
+        print(f"Job embedding refresh error: {e}")
+    finally:
+        with _in_flight_lock:
+            _in_flight.difference_update(job_ids)
+
+
+def refresh_async(*job_ids):
+    """Queue a background encode for jobs that were posted/edited"""
+    if not _engine().enabled:
+        return
+    with _in_flight_lock:
+        todo = [job_id for job_id in job_ids if job_id not in _in_flight]
+        _in_flight.update(todo)
+    if todo:
+        _executor.submit(_refresh_job, todo)
+
+
+def backfill():
+    """Encode every open job without an up-to-date vector (runs when the model becomes ready)"""
+    conn = get_db_connection()
+    try:
+        ids = [row['id'] for row in conn.execute(_OPEN_JOBS_SQL, (date.today().isoformat(),)).fetchall()]
+    finally:
+        conn.close()
+    written = refresh(ids)
+    if written:
+        print(f"✓ Job embeddings backfilled: {written}")
+    return written
+
+
+def backfill_async():
+    def _job():
+        try:
+            backfill()
+        except Exception as e:
+            print(f"Job embedding backfill error: {e}")
+    _executor.submit(_job)
+
+
+# ==================== MATCHER ====================
+
+class _Snapshot:
+    """Open jobs as arrays, in created_at DESC order (the tie-break order)"""
+
+    __slots__ = ('day', 'job_ids', 'row_of', 'columns', 'job_skills', 'vectors',
+                 'incidence', 'matrix', 'has_vector')
+
+    def __init__(self, day, jobs, postings, vectors):
+        self.day = day
+        self.job_ids = [job['id'] for job in jobs]
+        self.row_of = {job_id: row for row, job_id in enumerate(self.job_ids)}
+        # Skill id -> column of the incidence matrix (only skills some open job requires)
+        self.columns = {}
+        self.job_skills = [set() for _ in self.job_ids]
+        for job_id, skill_id in postings:
+            self.job_skills[self.row_of[job_id]].add(skill_id)
+            self.columns.setdefault(skill_id, len(self.columns))
+        self.vectors = [vectors.get(job_id) for job_id in self.job_ids]
+        self.incidence = self.matrix = self.has_vector = None
+
+        if NUMPY_AVAILABLE:
+            self.incidence = np.zeros((len(self.job_ids), len(self.columns)), dtype=np.float32)
+            for row, skill_ids in enumerate(self.job_skills):
+                for skill_id in skill_ids:
+                    self.incidence[row, self.columns[skill_id]] = 1.0
+            self.has_vector = np.array([v is not None for v in self.vectors], dtype=bool)
+            dim = next((len(v) for v in self.vectors if v is not None), 0)
+            self.matrix = np.zeros((len(self.job_ids), dim), dtype=np.float32)
+            for row, vector in enumerate(self.vectors):
+                if vector is not None and len(vector) == dim:
+                    self.matrix[row] = vector
+                elif vector is not None:
+                    self.has_vector[row] = False
+
+    def __len__(self):
+        return len(self.job_ids)
+
+
+class JobMatcher:
+    """Process-wide snapshot of open jobs, scored in bulk"""
+
+    def __init__(self):
+        self._snapshot = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'builds': 0, 'last_build_ms': 0.0, 'users_scored': 0, 'bulk_runs': 0,
+                       'last_bulk_ms': 0.0}
+
+    def invalidate(self):
+        """Jobs changed: rebuild the snapshot on the next call"""
+        with self._lock:
+            self._generation += 1
+            self._snapshot = None
+
+    def snapshot(self):
+        today = date.today().isoformat()
+        snap = self._snapshot
+        if snap is not None and snap.day == today:
+            return snap
+        with self._lock:
+            generation = self._generation
+        snap = self._build(today)
+        with self._lock:
+            # A job changed while we were reading: use this one, build afresh next time
+            if generation == self._generation:
+                self._snapshot = snap
+        return snap
+
+    def _build(self, today):
+        started = time.perf_counter()
+        conn = get_db_connection()
+        try:
+            jobs = conn.execute(_OPEN_JOBS_SQL, (today,)).fetchall()
+            ids = [job['id'] for job in jobs]
+            postings = []
+            for chunk in _chunks(ids):
+                placeholders = ','.join(['?'] * len(chunk))
+                postings.extend((row['job_id'], row['skill_id']) for row in conn.execute(
+                    f'SELECT job_id, skill_id FROM job_skills WHERE job_id IN ({placeholders})', chunk
+                ).fetchall())
+        finally:
+            conn.close()
+
+        # Only vectors built from the job's current text
+        stored = load_vectors(ids) if ids else {}
+        vectors = {}
+        for job in jobs:
+            entry = stored.get(job['id'])
+            text = job_text(job['title'], job['description'])
+            if entry is not None and text and entry[0] == embeddings.content_hash(text):
+                vectors[job['id']] = entry[1]
+
+        snap = _Snapshot(today, jobs, postings, vectors)
+        self._stats['builds'] += 1
+        self._stats['last_build_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return snap
+
+    # ---- scoring ----
+
+    def _score_python(self, snap, skill_ids, vector):
+        skill_ids = set(skill_ids)
+        scores = []
+        for job_skills, job_vec in zip(snap.job_skills, snap.vectors):
+            score = len(job_skills & skill_ids)
+            if vector is not None and job_vec is not None:
+                score += semantic_points(embeddings.cosine(vector, job_vec))
+            scores.append(score)
+        return scores
+
+    def _score_numpy(self, snap, skill_lists, vectors):
+        """(users x jobs) scores for parallel lists of skill ids and vectors (or None)"""
+        users = np.zeros((len(skill_lists), len(snap.columns)), dtype=np.float32)
+        for row, skill_ids in enumerate(skill_lists):
+            cols = [snap.columns[s] for s in skill_ids if s in snap.columns]
+            users[row, cols] = 1.0
+        scores = users @ snap.incidence.T
+
+        dim = snap.matrix.shape[1]
+        has_user_vec = np.array([v is not None and len(v) == dim for v in vectors], dtype=bool)
+        if dim and has_user_vec.any() and snap.has_vector.any():
+            user_matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+            for row, vector in enumerate(vectors):
+                if has_user_vec[row]:
+                    user_matrix[row] = vector
+            semantic = np.rint((user_matrix @ snap.matrix.T) * SEMANTIC_SCALE) / 2
+            semantic[~has_user_vec] = 0
+            semantic[:, ~snap.has_vector] = 0
+            scores += semantic
+        return scores
+
+    def top(self, skill_ids, vector=None, k=TOP_K):
+        """[(job_id, score)] of the k best open jobs scoring > 0 for one user"""
+        snap = self.snapshot()
+        if not len(snap):
+            return []
+        self._stats['users_scored'] += 1
+        if NUMPY_AVAILABLE:
+            scores = self._score_numpy(snap, [skill_ids], [vector])[0]
+            rows = np.flatnonzero(scores > 0)
+            # Best first; equal scores keep snapshot (newest first) order
+            rows = rows[np.lexsort((rows, -scores[rows]))][:k]
+            return [(snap.job_ids[row], _points(scores[row])) for row in rows]
+        scores = self._score_python(snap, skill_ids, vector)
+        ranked = sorted((row for row, score in enumerate(scores) if score > 0), key=lambda row: -scores[row])
+        return [(snap.job_ids[row], _points(scores[row])) for row in ranked[:k]]
+
+    def students_for_job(self, job_id, k=TOP_K):
+        """[(student_id, score)] of students whose top k now includes job_id, best match first"""
+        snap = self.snapshot()
+        job_row = snap.row_of.get(job_id)
+        if job_row is None:
+            return []
+        started = time.perf_counter()
+        student_ids, skill_lists, vectors = _load_students()
+
+        matched = []
+        if NUMPY_AVAILABLE:
+            for start in range(0, len(student_ids), STUDENT_CHUNK):
+                end = start + STUDENT_CHUNK
+                scores = self._score_numpy(snap, skill_lists[start:end], vectors[start:end])
+                mine = scores[:, job_row][:, None]
+                # Rank of this job per student: better jobs, plus equal ones listed before it
+                rank = (scores > mine).sum(axis=1) + (scores[:, :job_row] == mine).sum(axis=1)
+                for row in np.flatnonzero((mine[:, 0] > 0) & (rank < k)):
+                    matched.append((student_ids[start + row], _points(mine[row, 0])))
+        else:
+            for student_id, skill_ids, vector in zip(student_ids, skill_lists, vectors):
+                scores = self._score_python(snap, skill_ids, vector)
+                mine = scores[job_row]
+                rank = sum(1 for s in scores if s > mine) + sum(1 for s in scores[:job_row] if s == mine)
+                if mine > 0 and rank < k:
+                    matched.append((student_id, _points(mine)))
+
+        matched.sort(key=lambda item: -item[1])
+        self._stats['bulk_runs'] += 1
+        self._stats['last_bulk_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        return matched
+
+    def stats(self):
+        snap = self._snapshot
+        counts = dict(self._stats)
+        counts.update(
+            numpy=NUMPY_AVAILABLE,
+            open_jobs=len(snap) if snap is not None else None,
+            jobs_with_vectors=sum(v is not None for v in snap.vectors) if snap is not None else None,
+        )
+        return counts
+
+
+def _points(score):
+    """Whole scores as int (as before without AI), half points as float"""
+    score = float(score)
+    return int(score) if score.is_integer() else score
+
+
+def _load_students():
+    """Parallel lists (student ids, skill ids, current profile vector or None) for every student"""
+    conn = get_db_connection()
+    try:
+        students = conn.execute("SELECT id, bio, interests FROM users WHERE role = 'student'").fetchall()
+        skills = {}
+        for row in conn.execute('''
+            SELECT us.user_id, us.skill_id FROM user_skills us
+            JOIN users u ON u.id = us.user_id
+            WHERE u.role = 'student'
+        ''').fetchall():
+            skills.setdefault(row['user_id'], []).append(row['skill_id'])
+    finally:
+        conn.close()
+
+    student_ids = [row['id'] for row in students]
+    stored = embeddings.load_vectors(student_ids) if student_ids else {}
+    vectors = [embeddings.current_vector(stored, row['id'], embeddings.profile_text(row['bio'], row['interests']))
+               for row in students]
+    return student_ids, [skills.get(student_id, []) for student_id in student_ids], vectors
+
+
+# Shared matcher (snapshot built on first use)
+job_matcher = JobMatcher()
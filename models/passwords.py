@@ -0,0 +1,197 @@
+"""
+Password hashing off the request threads.
+
+werkzeug's PBKDF2 costs a few hundred milliseconds of CPU per call. Run on
+the request thread, a login storm at semester start keeps every core busy
+and starves the other server threads, Socket.IO included. Hashing and
+verification go to a small process pool instead:
+
+    password_hash = passwords.hash_password(password)
+    if passwords.verify_password(stored_hash, password): ...
+
+At most PASSWORD_HASH_WORKERS calls run at once and PASSWORD_HASH_QUEUE
+more may wait; a caller that gets no slot within PASSWORD_HASH_TIMEOUT
+gets PasswordServiceBusy, which routes turn into a "try again" flash.
+Every call's queue wait and total time are kept; stats() reports counts
+and p50/p95 per operation (/admin/password-hashing).
+
+PASSWORD_HASH_METHOD is the cost, as a werkzeug method string
+('pbkdf2:sha256:600000', 'scrypt:32768:8:1', ...). needs_rehash() tells
+login that a stored hash was made with another method, so it can store a
+fresh one for the password it has just verified.
+
+Calls run inline when the pool is off (PASSWORD_HASH_POOL=False, or
+init_app() not called, e.g. in scripts), and from the first call on when
+the host cannot start worker processes.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METHOD = 'pbkdf2:sha256:600000'
+WORKERS = 2
+QUEUE = 32
+TIMEOUT = 10.0
+SAMPLES = 1000      # latencies kept per operation for percentiles
+
+_settings = {'enabled': False, 'method': METHOD, 'workers': WORKERS, 'queue': QUEUE, 'timeout': TIMEOUT}
+
+
+class PasswordServiceBusy(RuntimeError):
+    """No hashing slot became free within PASSWORD_HASH_TIMEOUT"""
+
+
+def _timed(fn, *args):
+    # Runs in a worker: wall-clock start lets the caller split queue wait from work
+    return time.time(), fn(*args)
+
+
+class HashingPool:
+    """Bounded process pool plus latency samples"""
+
+    def __init__(self):
+        self._executor = None
+        self._pid = None
+        self._slots = threading.BoundedSemaphore(WORKERS + QUEUE)
+        self._lock = threading.Lock()
+        self._samples = {'hash': deque(maxlen=SAMPLES), 'verify': deque(maxlen=SAMPLES)}
+        self._counts = {'hash': 0, 'verify': 0, 'busy': 0, 'rehashed': 0, 'inline': 0}
+
+    def configure(self, workers, queue):
+        with self._lock:
+            self._shutdown()
+            self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def _shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _pool(self):
+        # Created on first use, and again in a process forked after that
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=_settings['workers'],
+                                                     mp_context=multiprocessing.get_context())
+                self._pid = os.getpid()
+            return self._executor
+
+    def call(self, op, fn, *args):
+        submitted = time.time()
+        if not _settings['enabled']:
+            return self._inline(op, fn, args, submitted)
+
+        if not self._slots.acquire(timeout=_settings['timeout']):
+            with self._lock:
+                self._counts['busy'] += 1
+            raise PasswordServiceBusy("Too many password requests right now. Please try again in a moment.")
+        try:
+            try:
+                future = self._pool().submit(_timed, fn, *args)
+            except (OSError, NotImplementedError) as e:
+                # No process support here (e.g. no /dev/shm on serverless hosts): hash inline from now on
+                print(f"⚠ Password hashing pool unavailable ({e}); hashing inline")
+                with self._lock:
+                    self._executor = None
+                    _settings['enabled'] = False
+                return self._inline(op, fn, args, submitted)
+            started, result = future.result(timeout=_settings['timeout'])
+            self._record(op, max(started - submitted, 0.0), time.time() - submitted)
+            return result
+        except BrokenProcessPool as e:
+            # A worker died (OOM killer, signal): start a fresh pool next call, finish this one here
+            print(f"Password hashing pool broken ({e}); running inline")
+            with self._lock:
+                self._executor = None
+            return self._inline(op, fn, args, submitted)
+        except FutureTimeoutError:
+            with self._lock:
+                self._counts['busy'] += 1
+            raise PasswordServiceBusy("Password check timed out. Please try again in a moment.")
+        finally:
+            self._slots.release()
+
+    def _inline(self, op, fn, args, submitted):
+        result = fn(*args)
+        self._record(op, 0.0, time.time() - submitted, inline=True)
+        return result
+
+    def _record(self, op, wait, total, inline=False):
+        with self._lock:
+            self._counts[op] += 1
+            if inline:
+                self._counts['inline'] += 1
+            self._samples[op].append((wait, total))
+
+    def rehashed(self):
+        with self._lock:
+            self._counts['rehashed'] += 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            samples = {op: list(values) for op, values in self._samples.items()}
+        result = dict(counts, enabled=_settings['enabled'], method=_settings['method'],
+                      workers=_settings['workers'], queue=_settings['queue'])
+        for op, values in samples.items():
+            waits = sorted(wait for wait, _ in values)
+            totals = sorted(total for _, total in values)
+            result[f'{op}_latency_ms'] = {
+                'wait_p50': _percentile(waits, 0.50), 'wait_p95': _percentile(waits, 0.95),
+                'p50': _percentile(totals, 0.50), 'p95': _percentile(totals, 0.95),
+                'max': _percentile(totals, 1.0),
+            }
+        return result
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return None
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000, 2)
+
+
+hashing_pool = HashingPool()
+_method_prefix = {}
+
+
+def hash_password(password):
+    """Hash with the configured method (PASSWORD_HASH_METHOD)"""
+    return hashing_pool.call('hash', generate_password_hash, password, _settings['method'])
+
+
+def verify_password(stored_hash, password):
+    """check_password_hash in the pool; False for a missing hash"""
+    if not stored_hash:
+        return False
+    return hashing_pool.call('verify', check_password_hash, stored_hash, password)
+
+
+def needs_rehash(stored_hash):
+    """True when stored_hash was not made with the configured method"""
+    method = _settings['method']
+    if method not in _method_prefix:
+        # werkzeug fills in defaults ('pbkdf2' -> 'pbkdf2:sha256:600000'); learn the full form once
+        _method_prefix[method] = hash_password('').split('$', 1)[0]
+    return stored_hash.split('$', 1)[0] != _method_prefix[method]
+
+
+def stats():
+    return hashing_pool.stats()
+
+
+def init_app(app):
+    """Configure from app config (PASSWORD_HASH_*)"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('PASSWORD_HASH_POOL', True)
+    _settings['method'] = cfg.get('PASSWORD_HASH_METHOD', METHOD)
+    _settings['workers'] = cfg.get('PASSWORD_HASH_WORKERS', WORKERS)
+    _settings['queue'] = cfg.get('PASSWORD_HASH_QUEUE', QUEUE)
+    _settings['timeout'] = cfg.get('PASSWORD_HASH_TIMEOUT', TIMEOUT)
+    hashing_pool.configure(_settings['workers'], _settings['queue'])
@@ -1,41 +1,176 @@
 from db_utils import get_db_connection
+from models import embeddings
+from models import skills as skill_index
+from models.scoring import ScoringProfile, rank_candidates
+from models.ann_index import ann_index
+from models.connection_graph import connection_graph
+from models.collaborative import collaborative_model
+from models import job_matching
+from models.job_matching import job_matcher
+from models.user import USER_COLUMNS
+import importlib.util
 import logging
 import os
+import threading
+import time
 
 # Suppress verbose AI library logs
 os.environ['TRANSFORMERS_VERBOSITY'] = 'error'
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-    import transformers
-    transformers.logging.set_verbosity_error()
-    AI_AVAILABLE = True
-except ImportError:
-    AI_AVAILABLE = False
+# The model package is only probed here; importing it (torch) and loading the
+# model happen on a background thread the first time scoring asks for it.
+AI_AVAILABLE = importlib.util.find_spec('sentence_transformers') is not None
+# AI_RECOMMENDATIONS=False keeps scripts/workers that never score from loading it
+AI_ENABLED = os.getenv('AI_RECOMMENDATIONS', 'True') == 'True'
+AI_MODEL_NAME = os.getenv('AI_MODEL_NAME', 'all-MiniLM-L6-v2')
+# Nearest-neighbour profiles added to the rule-based candidate list
+ANN_CANDIDATES = 50
+# Users sharing the most skills added to the rule-based candidate list
+SKILL_CANDIDATES = 50
+# Friends-of-friends added to the rule-based candidate list
+FOF_CANDIDATES = 50
+
 
 class AIRecommendationEngine:
-    def __init__(self):
+    """
+    SentenceTransformer wrapper that loads in the background.
+    Until the model is ready, is_ready() is False and callers fall back to
+    the rule-based score, so nothing blocks on the multi-second load.
+    """
+
+    def __init__(self, model_name=AI_MODEL_NAME, enabled=AI_ENABLED):
+        self.model_name = model_name
+        self.enabled = enabled and AI_AVAILABLE
         self.model = None
-        if AI_AVAILABLE:
+        self.util = None
+        self.error = None
+        self._started = False
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._ready_callbacks = []
+
+    def add_ready_callback(self, callback):
+        """Run callback() on the loader thread once the model is ready"""
+        self._ready_callbacks.append(callback)
+
+    def start_loading(self):
+        """Kick off the background load (no-op if disabled or already started)"""
+        if not self.enabled or self._started:
+            return
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._load, name='ai-model-loader', daemon=True).start()
+
+    def _load(self):
+        try:
+            import transformers
+            from sentence_transformers import SentenceTransformer, util
+            transformers.logging.set_verbosity_error()
+            # Use a lightweight model for local performance
+            model = SentenceTransformer(self.model_name)
+            self.util = util
+            self.model = model
+        except Exception as e:
+            self.error = str(e)
+            logging.error(f"AI Model Error: {e}")
+            return
+        finally:
+            self._loaded.set()
+        for callback in self._ready_callbacks:
             try:
-                # Use a lightweight model for local performance
-                self.model = SentenceTransformer('all-MiniLM-L6-v2')
+                callback()
             except Exception as e:
-                logging.error(f"AI Model Error: {e}")
+                logging.error(f"AI ready callback error: {e}")
+
+    def is_ready(self):
+        """True once the model can score; the first call starts the load"""
+        if self.model is None:
+            self.start_loading()
+            return False
+        return True
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the load finished (for scripts/benchmarks that need AI scores)"""
+        self.start_loading()
+        self._loaded.wait(timeout)
+        return self.model is not None
+
+    def status(self):
+        if self.model is not None:
+            return 'ready'
+        if not self.enabled:
+            return 'disabled' if AI_AVAILABLE else 'unavailable'
+        if self._loaded.is_set():
+            return 'failed'
+        return 'loading' if self._started else 'idle'
 
     def get_semantic_score(self, text1, text2):
-        if not self.model or not text1 or not text2:
+        if not self.is_ready() or not text1 or not text2:
             return 0
         try:
             emb1 = self.model.encode(text1, convert_to_tensor=True)
             emb2 = self.model.encode(text2, convert_to_tensor=True)
-            return round(util.cos_sim(emb1, emb2).item() * 10)
+            return round(self.util.cos_sim(emb1, emb2).item() * 10)
         except Exception:
             return 0
 
-# Initialize global engine
+def _fetch_candidates(c, role, ids, seen):
+    """users rows for the ids not already in `seen` (which is updated)"""
+    ids = [uid for uid in ids if uid not in seen]
+    if not ids:
+        return []
+    seen.update(ids)
+    placeholders = ','.join(['?'] * len(ids))
+    return c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE role = ? AND id IN ({placeholders})', [role] + ids).fetchall()
+
+
+# Optional per-stage timing for benchmarks (scripts/bench_recommendations.py)
+_stage_listener = None
+
+
+def set_stage_listener(listener):
+    """Call listener(recommender, stage, seconds) after each stage; None turns it off"""
+    global _stage_listener
+    _stage_listener = listener
+
+
+def _no_lap(stage):
+    pass
+
+
+def _stage_clock(recommender):
+    """lap(stage) reports the time since the previous lap (no-op without a listener)"""
+    listener = _stage_listener
+    if listener is None:
+        return _no_lap
+    last = [time.perf_counter()]
+
+    def lap(stage):
+        now = time.perf_counter()
+        listener(recommender, stage, now - last[0])
+        last[0] = now
+    return lap
+
+
+def _profile_vector(user):
+    """The user's current stored profile vector, or None (queueing a re-encode)"""
+    user_text = embeddings.profile_text(getattr(user, 'bio', ''), getattr(user, 'interests', ''))
+    if not user_text:
+        return None
+    user_vec = embeddings.current_vector(embeddings.load_vectors([user.id]), user.id, user_text)
+    if user_vec is None:
+        embeddings.refresh_async(user.id)
+    return user_vec
+
+
+# Initialize global engine (cheap: the model itself loads lazily)
 ai_engine = AIRecommendationEngine()
+# Stored profile and job vectors are (re)built as soon as the model is available
+ai_engine.add_ready_callback(embeddings.backfill_async)
+ai_engine.add_ready_callback(job_matching.backfill_async)
 
 
 def get_recommended_users(user):
@@ -54,6 +189,7 @@ def get_recommended_users(user):
     """
     if not user or user.role not in ['student', 'alumni'] or not user.id:
         return []
+    lap = _stage_clock('users')
 
     conn = get_db_connection()
     c = conn.cursor()
@@ -61,41 +197,60 @@ def get_recommended_users(user):
     # Determine target role (Students get Alumni, Alumni get Students)
     target_role = 'alumni' if user.role == 'student' else 'student'
 
-    # Get already connected or pending user IDs to exclude
-    excluded_ids = [user.id]
-    
-    # Already connected
-    connections = c.execute(
+    # Direct connections always come from the table: the in-memory graph
+    # (models/connection_graph.py) may not have seen another worker's write yet
+    user_conn_ids = set()
+    for conn_row in c.execute(
         'SELECT user_id_1, user_id_2 FROM connections WHERE user_id_1 = ? OR user_id_2 = ?',
         (user.id, user.id)
-    ).fetchall()
-    for conn_row in connections:
-        excluded_ids.append(conn_row['user_id_1'] if conn_row['user_id_1'] != user.id else conn_row['user_id_2'])
-    
-    # Pending requests (sent or received)
+    ).fetchall():
+        user_conn_ids.add(conn_row['user_id_1'] if conn_row['user_id_1'] != user.id else conn_row['user_id_2'])
+
+    # Exclude self, already connected users and pending requests (sent or received)
+    excluded_ids = [user.id] + list(user_conn_ids)
     pending = c.execute(
-        'SELECT sender_id, receiver_id FROM connection_requests WHERE (sender_id = ? OR receiver_id = ?) AND status = "pending"',
+        "SELECT sender_id, receiver_id FROM connection_requests WHERE (sender_id = ? OR receiver_id = ?) AND status = 'pending'",
         (user.id, user.id)
     ).fetchall()
     for p_row in pending:
         excluded_ids.append(p_row['sender_id'] if p_row['sender_id'] != user.id else p_row['receiver_id'])
+    lap('exclusions')
 
-    # PRE-FETCH: Current user's direct connection IDs for mutual score
-    user_conn_ids = set()
-    user_conns_db = c.execute(
-        'SELECT user_id_1, user_id_2 FROM connections WHERE user_id_1 = ? OR user_id_2 = ?',
-        (user.id, user.id)
-    ).fetchall()
-    for uc in user_conns_db:
-        user_conn_ids.add(uc['user_id_1'] if uc['user_id_1'] != user.id else uc['user_id_2'])
+    # The user's own stored profile vector (models/embeddings.py); nothing is
+    # encoded per request
+    user_vec = _profile_vector(user)
+    lap('semantic')
 
     # Fetch potential candidates
-    query = f"SELECT * FROM users WHERE role = ? AND id NOT IN ({','.join(['?']*len(excluded_ids))}) LIMIT 50"
+    query = f"SELECT {USER_COLUMNS} FROM users WHERE role = ? AND id NOT IN ({','.join(['?']*len(excluded_ids))}) LIMIT 50"
     candidates = c.execute(query, [target_role] + excluded_ids).fetchall()
+    seen = {cand['id'] for cand in candidates}
 
-    # PRE-FETCH: Connections for all candidates to calculate mutuals efficiently
+    # Skill candidates: the target-role users sharing the most skills, via the
+    # user_skills postings (models/skills.py) instead of re-splitting every row
+    skill_ids = skill_index.lookup(conn, user.skills)
+    if skill_ids:
+        sharing = skill_index.user_candidates(conn, skill_ids, target_role, excluded_ids, SKILL_CANDIDATES)
+        candidates += _fetch_candidates(c, target_role, [uid for uid, _ in sharing], seen)
+
+    # People you may know: friends-of-friends with the most mutual connections
+    graph = connection_graph.is_ready()
+    if graph:
+        fof = connection_graph.people_you_may_know(user.id, limit=FOF_CANDIDATES, exclude=excluded_ids)
+        candidates += _fetch_candidates(c, target_role, [uid for uid, _ in fof], seen)
+
+    # Semantic candidates: nearest profiles across the whole target role
+    # (models/ann_index.py), not just the first rows of the table
+    if user_vec is not None and ann_index.is_ready():
+        neighbours = ann_index.search(target_role, user_vec, k=ANN_CANDIDATES, exclude=excluded_ids)
+        candidates += _fetch_candidates(c, target_role, [uid for uid, _ in neighbours], seen)
+    lap('candidates')
+
+    # Connections of every candidate, for mutual-connection points
     cand_conn_map = {}
-    if candidates:
+    if candidates and graph:
+        cand_conn_map = {cand['id']: connection_graph.neighbours(cand['id']) for cand in candidates}
+    elif candidates:
         candidate_ids = [cand['id'] for cand in candidates]
         placeholders = ','.join(['?'] * len(candidate_ids))
         all_cand_conns = c.execute(
@@ -108,72 +263,57 @@ def get_recommended_users(user):
             u1, u2 = row['user_id_1'], row['user_id_2']
             if u1 in cand_conn_map: cand_conn_map[u1].add(u2)
             if u2 in cand_conn_map: cand_conn_map[u2].add(u1)
+    lap('mutual')
 
-    recommendations = []
-    user_skills = set([s.strip().lower() for s in (user.skills or "").split(',') if s.strip()])
-    
-    for cand in candidates:
-        score = 0
-        
-        # Rule 1: Same branch
-        if cand['branch'] and user.branch and cand['branch'].lower() == user.branch.lower():
-            score += 5
-            
-        # Rule 2: Skill match (+5 per matching skill)
-        cand_skills = [s.strip().lower() for s in (cand['skills'] or "").split(',') if s.strip()]
-        for skill in cand_skills:
-            if skill in user_skills:
-                score += 5
-
-        # Rule 3: Mutual Connections (+2 per mutual connection)
-        if cand['id'] in cand_conn_map:
-            mutuals = cand_conn_map[cand['id']].intersection(user_conn_ids)
-            score += (len(mutuals) * 2)
-                
-        # Rule 3: Same domain
-        if cand['current_domain'] and user.current_domain and cand['current_domain'].lower() == user.current_domain.lower():
-            score += 3
-            
-        # Rule 4: Same city
-        if cand['city'] and user.city and cand['city'].lower() == user.city.lower():
-            score += 2
-            
-        # Rule 5: AI Semantic Match (+0 to 10 points based on Bio/Interests)
-        if AI_AVAILABLE and ai_engine.model:
-            # Defensive access for object attributes
-            u_bio = getattr(user, 'bio', '') or ''
-            u_interests = getattr(user, 'interests', '') or ''
-            text1 = f"{u_bio} {u_interests}"
-            
-            # Dictionary access for candidates (Safe check for sqlite3.Row)
+    # Current vectors only; candidates whose text changed score no AI points
+    # until their embedding is refreshed
+    stale_ids = []
+    cand_vectors = {}
+    if user_vec is not None and candidates:
+        vectors = embeddings.load_vectors([cand['id'] for cand in candidates])
+        for cand in candidates:
             cand_dict = dict(cand)
-            c_bio = cand_dict.get('bio', '') or ''
-            c_interests = cand_dict.get('interests', '') or ''
-            text2 = f"{c_bio} {c_interests}"
-            
-            if text1.strip() and text2.strip():
-                score += ai_engine.get_semantic_score(text1, text2)
-
-        if score > 0:
-            recommendations.append({
-                'id': cand['id'],
-                'name': cand['name'],
-                'role': cand['role'],
-                'branch': cand['branch'],
-                'skills': cand['skills'],
-                'score': score,
-                'profile_pic': cand['profile_pic'] or f"https://ui-avatars.com/api/?name={cand['name']}&background=random"
-            })
-
-    # Sort by score descending and return top 5
-    recommendations.sort(key=lambda x: x['score'], reverse=True)
+            cand_text = embeddings.profile_text(cand_dict.get('bio'), cand_dict.get('interests'))
+            cand_vec = embeddings.current_vector(vectors, cand['id'], cand_text)
+            if cand_vec is not None:
+                cand_vectors[cand['id']] = cand_vec
+            elif cand_text:
+                stale_ids.append(cand['id'])
+    lap('semantic')
+
+    # Collaborative points: one dot product of trained factors per candidate
+    # (models/collaborative.py); empty until a factors file has been trained
+    collab = collaborative_model.points(user.id, [cand['id'] for cand in candidates]) if candidates else {}
+    lap('collaborative')
+
+    # Rule scoring (+5 branch, +5/skill, +2/mutual, +3 domain, +2 city, +0-10 AI,
+    # +0-5 collaborative) lives in models/scoring.py, vectorised with NumPy for
+    # large candidate sets
+    profile = ScoringProfile.for_user(user, user_conn_ids, user_vec, collab)
+    ranked = rank_candidates(profile, candidates, cand_conn_map, cand_vectors, k=5)
+    lap('scoring')
+
+    recommendations = []
+    for index, score in ranked:
+        cand = candidates[index]
+        recommendations.append({
+            'id': cand['id'],
+            'name': cand['name'],
+            'role': cand['role'],
+            'branch': cand['branch'],
+            'skills': cand['skills'],
+            'score': score,
+            'profile_pic': cand['profile_pic'] or f"https://ui-avatars.com/api/?name={cand['name']}&background=random"
+        })
+
+    if stale_ids:
+        embeddings.refresh_async(*stale_ids)
+
     conn.close()
+    lap('format')
     
     # FUTURE SCOPE:
-    # 1. AI-based recommendation using Sentence Transformers
-    # 2. Collaborative filtering based on connection history
-    # 3. Job recommendation based on skills/domain
-    # 4. Mentor matching algorithms
+    # 1. Mentor matching algorithms
     
     return recommendations[:5]
 
@@ -181,45 +321,43 @@ def get_recommended_jobs(user):
     """
     Job Recommendation Engine
     - Matches user skills against job requirements.
+    - Only open jobs (active, not closed, deadline not passed).
     - Limits to Top 5 matches.
     """
     if not user or user.role != 'student' or not user.id:
         return []
+    lap = _stage_clock('jobs')
+
+    conn = get_db_connection()
+    skill_ids = skill_index.lookup(conn, user.skills)
+    conn.close()
+    lap('skills')
+
+    # Every open job scored at once against precomputed job skills and
+    # vectors (models/job_matching.py); the user's side is their stored
+    # profile vector, so nothing is encoded here
+    ranked = job_matcher.top(skill_ids, _profile_vector(user), k=5)
+    lap('scoring')
+    if not ranked:
+        return []
 
     conn = get_db_connection()
     c = conn.cursor()
-    
-    # Fetch all jobs
-    jobs = c.execute('''
+    job_ids = [job_id for job_id, _ in ranked]
+    placeholders = ','.join(['?'] * len(job_ids))
+    jobs = {job['id']: job for job in c.execute(f'''
         SELECT j.*, u.name as posted_by_name 
         FROM jobs j 
         JOIN users u ON j.posted_by = u.id 
-        ORDER BY j.created_at DESC
-    ''').fetchall()
-    
-    user_skills = set([s.strip().lower() for s in (user.skills or "").split(',') if s.strip()])
+        WHERE j.id IN ({placeholders})
+    ''', job_ids).fetchall()}
+    conn.close()
+
     recommended = []
-    
-    for job in jobs:
-        job_skills = set([s.strip().lower() for s in (job['required_skills'] or "").split(',') if s.strip()])
-        match_count = len(user_skills.intersection(job_skills))
-        
-        # AI Semantic Job Matching
-        if AI_AVAILABLE and ai_engine.model:
-            u_bio = getattr(user, 'bio', '') or ''
-            u_skills = getattr(user, 'skills', '') or ''
-            user_text = f"{u_bio} {u_skills}"
-            job_text = f"{job['title']} {job['description']}"
-            semantic_boost = ai_engine.get_semantic_score(user_text, job_text) / 2
-            match_count += semantic_boost
-
-        if match_count > 0:
-            job_dict = dict(job)
+    for job_id, match_count in ranked:
+        if job_id in jobs:
+            job_dict = dict(jobs[job_id])
             job_dict['match_score'] = match_count
             recommended.append(job_dict)
-            
-    # Sort by match_score descending
-    recommended.sort(key=lambda x: x['match_score'], reverse=True)
-    conn.close()
-    
-    return recommended[:5]
+    lap('fetch')
+    return recommended
@@ -0,0 +1,284 @@
+"""
+Materialised user recommendations.
+
+Dashboards and /recommendations used to run get_recommended_users() on
+every page view. A background refresher now stores each student's and
+alumnus' top 5 in user_recommendations, and get_recommendations() reads
+them back with one indexed query.
+
+What to recompute comes from recommendation_changes, a change log written
+in the same transaction as the change itself (log_change):
+
+- 'profile'     profile edited or user just joined: the user, whoever lists
+                them, and opposite-role users sharing one of their skills
+- 'connection'  connection made: the user, whoever lists them, and their
+                connections (mutual counts moved)
+- 'removed'     user deleted: whoever lists them
+- 'requested'   a page found the row missing or past its freshness SLA
+
+Freshness SLA: rows older than RECOMMENDATIONS_MAX_AGE seconds are never
+served. Like a missing row, that request scores live (through
+models/result_cache.py) and asks for a refresh. Candidates the user has
+since connected with, or has a pending request with, are filtered out
+while reading, so a stored list never suggests them.
+"""
+
+import threading
+import time
+
+from db_utils import get_db_connection, transaction
+from database import write_queue
+from models.connection_graph import connection_graph
+from models.recommendation import get_recommended_users
+from models import result_cache
+from models.user import load_users
+
+MAX_AGE = 3600.0
+REFRESH_INTERVAL = 30.0
+BATCH_SIZE = 200
+# SQLite's default bound-parameter limit is 999
+_IN_CHUNK = 900
+
+_settings = {'enabled': False, 'max_age': MAX_AGE, 'interval': REFRESH_INTERVAL}
+_requested = set()
+_requested_lock = threading.Lock()
+_thread = None
+_thread_lock = threading.Lock()
+_stats = {'runs': 0, 'refreshed': 0, 'last_run_ms': 0.0, 'served': 0, 'live': 0}
+
+# Stored list for one user; candidates since connected to or with a pending
+# request come back as NULL columns and are skipped
+_READ_SQL = '''
+    SELECT rs.computed_at, ur.score, u.id, u.name, u.role, u.branch, u.skills, u.profile_pic
+    FROM recommendation_status rs
+    LEFT JOIN user_recommendations ur ON ur.user_id = rs.user_id
+    LEFT JOIN users u ON u.id = ur.candidate_id
+        AND NOT EXISTS (
+            SELECT 1 FROM connections c
+            WHERE (c.user_id_1 = rs.user_id AND c.user_id_2 = u.id)
+               OR (c.user_id_1 = u.id AND c.user_id_2 = rs.user_id))
+        AND NOT EXISTS (
+            SELECT 1 FROM connection_requests cr
+            WHERE cr.status = 'pending'
+              AND ((cr.sender_id = rs.user_id AND cr.receiver_id = u.id)
+                OR (cr.sender_id = u.id AND cr.receiver_id = rs.user_id)))
+    WHERE rs.user_id = ?
+    ORDER BY ur.rank
+'''
+
+
+# ==================== WRITE SIDE ====================
+
+def log_change(conn, user_id, kind):
+    """Record a change for the refresher; call inside the transaction making the change"""
+    conn.execute('INSERT INTO recommendation_changes (user_id, kind) VALUES (?, ?)', (user_id, kind))
+
+
+def delete_user(conn, user_id):
+    """Drop a deleted user's stored list and have whoever lists them recomputed"""
+    conn.execute('DELETE FROM user_recommendations WHERE user_id = ?', (user_id,))
+    conn.execute('DELETE FROM recommendation_status WHERE user_id = ?', (user_id,))
+    log_change(conn, user_id, 'removed')
+
+
+def request_refresh(user_id):
+    """Ask the next run to (re)compute one user (once per user until it has)"""
+    with _requested_lock:
+        if user_id in _requested:
+            return
+        _requested.add(user_id)
+    try:
+        write_queue.execute("INSERT INTO recommendation_changes (user_id, kind) VALUES (?, 'requested')",
+                            (user_id,))
+    except Exception as e:
+        with _requested_lock:
+            _requested.discard(user_id)
+        print(f"Recommendation refresh request error: {e}")
+
+
+# ==================== READ SIDE ====================
+
+def _to_recommendation(row):
+    return {
+        'id': row['id'],
+        'name': row['name'],
+        'role': row['role'],
+        'branch': row['branch'],
+        'skills': row['skills'],
+        'score': row['score'],
+        'profile_pic': row['profile_pic'] or f"https://ui-avatars.com/api/?name={row['name']}&background=random"
+    }
+
+
+def get_recommendations(user):
+    """
+    The user's stored top 5 when it is within the freshness SLA; otherwise
+    scores live (get_recommended_users) and queues a refresh.
+    """
+    if not user or user.role not in ['student', 'alumni'] or not user.id:
+        return []
+    if not _settings['enabled']:
+        return result_cache.recommended_users(user)
+    start()
+
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(_READ_SQL, (user.id,)).fetchall()
+    finally:
+        conn.close()
+
+    if rows and time.time() - rows[0]['computed_at'] <= _settings['max_age']:
+        _stats['served'] += 1
+        return [_to_recommendation(row) for row in rows if row['id'] is not None]
+
+    # Missing or past the SLA: score live now, store on the next run
+    _stats['live'] += 1
+    request_refresh(user.id)
+    return result_cache.recommended_users(user)
+
+
+# ==================== REFRESHER ====================
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), _IN_CHUNK):
+        yield ids[start:start + _IN_CHUNK]
+
+
+def _listing(conn, candidate_ids):
+    """Users whose stored list includes any of candidate_ids"""
+    found = set()
+    for chunk in _chunks(candidate_ids):
+        placeholders = ','.join(['?'] * len(chunk))
+        found.update(row['user_id'] for row in conn.execute(
+            f'SELECT DISTINCT user_id FROM user_recommendations WHERE candidate_id IN ({placeholders})', chunk
+        ).fetchall())
+    return found
+
+
+def _sharing_skills(conn, user_ids):
+    """Opposite-role users sharing a skill with any of user_ids (their candidate pool moved)"""
+    found = set()
+    for chunk in _chunks(user_ids):
+        placeholders = ','.join(['?'] * len(chunk))
+        found.update(row['user_id'] for row in conn.execute(f'''
+            SELECT DISTINCT other.user_id
+            FROM user_skills mine
+            JOIN users me ON me.id = mine.user_id
+            JOIN user_skills other ON other.skill_id = mine.skill_id
+            JOIN users u ON u.id = other.user_id
+            WHERE mine.user_id IN ({placeholders})
+              AND u.role IN ('student', 'alumni') AND u.role != me.role
+        ''', chunk).fetchall())
+    return found
+
+
+def _connections_of(conn, user_ids):
+    if connection_graph.is_ready():
+        return {other for user_id in user_ids for other in connection_graph.neighbours(user_id)}
+    found = set()
+    for chunk in _chunks(user_ids):
+        placeholders = ','.join(['?'] * len(chunk))
+        for row in conn.execute(
+            f'SELECT user_id_1, user_id_2 FROM connections '
+            f'WHERE user_id_1 IN ({placeholders}) OR user_id_2 IN ({placeholders})', chunk + chunk
+        ).fetchall():
+            found.update((row['user_id_1'], row['user_id_2']))
+    return found
+
+
+def affected_users(conn, changes):
+    """Everyone whose stored list may be out of date after `changes`"""
+    by_kind = {}
+    for change in changes:
+        by_kind.setdefault(change['kind'], set()).add(change['user_id'])
+    profile = by_kind.get('profile', set())
+    connected = by_kind.get('connection', set())
+    removed = by_kind.get('removed', set())
+
+    affected = profile | connected | by_kind.get('requested', set())
+    affected |= _listing(conn, profile | connected | removed)
+    affected |= _sharing_skills(conn, profile)
+    affected |= _connections_of(conn, connected)
+    return affected - removed
+
+
+def _store(results, computed_at):
+    """Write job: replace the stored lists of the given users"""
+    with transaction() as conn:
+        for user_id, recommendations in results:
+            conn.execute('DELETE FROM user_recommendations WHERE user_id = ?', (user_id,))
+            if recommendations:
+                conn.executemany(
+                    'INSERT INTO user_recommendations (user_id, rank, candidate_id, score) VALUES (?, ?, ?, ?)',
+                    [(user_id, rank, rec['id'], rec['score']) for rank, rec in enumerate(recommendations)]
+                )
+            conn.execute('INSERT OR REPLACE INTO recommendation_status (user_id, computed_at) VALUES (?, ?)',
+                         (user_id, computed_at))
+
+
+def _clear_changes(last_id):
+    """Write job: drop the change log entries a run has applied"""
+    with transaction() as conn:
+        conn.execute('DELETE FROM recommendation_changes WHERE id <= ?', (last_id,))
+
+
+def refresh_pending():
+    """Recompute everyone affected by logged changes. Returns how many users were refreshed."""
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        changes = conn.execute('SELECT id, user_id, kind FROM recommendation_changes ORDER BY id').fetchall()
+        if not changes:
+            return 0
+        users = load_users(conn, affected_users(conn, changes), ('student', 'alumni'))
+    finally:
+        conn.close()
+
+    # Entries logged from here on have larger ids and stay for the next run
+    for start_at in range(0, len(users), BATCH_SIZE):
+        batch = users[start_at:start_at + BATCH_SIZE]
+        computed_at = time.time()
+        write_queue.run(_store, [(user.id, get_recommended_users(user)) for user in batch], computed_at)
+    write_queue.run(_clear_changes, changes[-1]['id'])
+
+    with _requested_lock:
+        _requested.difference_update(change['user_id'] for change in changes)
+    _stats['runs'] += 1
+    _stats['refreshed'] += len(users)
+    _stats['last_run_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return len(users)
+
+
+def _run():
+    while True:
+        time.sleep(_settings['interval'])
+        try:
+            refresh_pending()
+        except Exception as e:
+            print(f"Recommendation refresh error: {e}")
+
+
+def start():
+    """Start the background refresher (once per process)"""
+    global _thread
+    if _thread is not None or not _settings['enabled']:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_run, name='recommendation-refresher', daemon=True)
+            _thread.start()
+
+
+def stats():
+    with _requested_lock:
+        requested = len(_requested)
+    return dict(_stats, requested=requested, enabled=_settings['enabled'])
+
+
+def init_app(app):
+    """Enable materialised recommendations from app config (RECOMMENDATIONS_*)"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('RECOMMENDATIONS_MATERIALIZED', True)
+    _settings['max_age'] = cfg.get('RECOMMENDATIONS_MAX_AGE', MAX_AGE)
+    _settings['interval'] = cfg.get('RECOMMENDATIONS_REFRESH_INTERVAL', REFRESH_INTERVAL)
@@ -0,0 +1,293 @@
+"""
+TTL + LRU cache for recommendation and job-match results.
+
+get_recommended_users() and get_recommended_jobs() are cached per user,
+keyed by the user id and a version of the profile fields they score on,
+so a profile edit simply misses. Writes that change relevance for other
+users invalidate by tag instead of waiting for the TTL:
+
+    user:<id>   the user's own entries     (connections, requests, deletes)
+    cand:<id>   entries recommending <id>  (their profile changed, deleted)
+    jobs        every job-match entry      (job add/edit/delete/toggle)
+
+Each process has an in-memory tier. With RESULT_CACHE_SHARED_PATH set,
+entries also go to a SQLite file shared by all workers on the host;
+invalidation deletes there too, and the in-memory tier's TTL is capped at
+RESULT_CACHE_LOCAL_TTL so other workers drop invalidated copies quickly.
+
+stats() reports hits, misses, evictions, expirations and invalidations
+per cache (see /admin/cache-stats).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from models.recommendation import get_recommended_users, get_recommended_jobs
+from models.job_matching import job_matcher
+
+MAX_ENTRIES = 10000
+TTL = 300.0
+LOCAL_TTL = 5.0
+
+_settings = {'enabled': False, 'max_entries': MAX_ENTRIES, 'ttl': TTL,
+             'shared_path': None, 'local_ttl': LOCAL_TTL}
+
+
+class SharedTier:
+    """SQLite file with (key, value, expiry) rows plus a tag -> key index"""
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        conn = self._conn()
+        conn.execute('''CREATE TABLE IF NOT EXISTS result_cache (
+            key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)''')
+        conn.execute('''CREATE TABLE IF NOT EXISTS result_cache_tags (
+            tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))''')
+        conn.commit()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute('SELECT value, expires_at FROM result_cache WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(self, key, value, tags, expires_at):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN')
+            conn.execute('INSERT OR REPLACE INTO result_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                         (key, json.dumps(value, default=str), expires_at))
+            conn.executemany('INSERT OR IGNORE INTO result_cache_tags (tag, key) VALUES (?, ?)',
+                             [(tag, key) for tag in tags])
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def invalidate(self, tags):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN')
+            for tag in tags:
+                conn.execute('DELETE FROM result_cache WHERE key IN (SELECT key FROM result_cache_tags WHERE tag = ?)',
+                             (tag,))
+                conn.execute('DELETE FROM result_cache_tags WHERE tag = ?', (tag,))
+
+    def purge_expired(self):
+        conn = self._conn()
+        with conn:
+            conn.execute('BEGIN')
+            conn.execute('DELETE FROM result_cache WHERE expires_at < ?', (time.time(),))
+            conn.execute('DELETE FROM result_cache_tags WHERE key NOT IN (SELECT key FROM result_cache)')
+
+
+class ResultCache:
+    """In-process LRU with per-entry TTL and tag invalidation"""
+
+    def __init__(self, name, max_entries=MAX_ENTRIES, ttl=TTL):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.local_ttl = ttl
+        self.shared = None
+        self._entries = OrderedDict()   # key -> (expires_at, value, tags)
+        self._tags = {}                 # tag -> keys
+        self._lock = threading.Lock()
+        self._counts = {'hits': 0, 'shared_hits': 0, 'misses': 0, 'evictions': 0,
+                        'expirations': 0, 'invalidations': 0}
+
+    def configure(self, max_entries, ttl, shared=None, local_ttl=LOCAL_TTL):
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+            self.shared = shared
+            self.local_ttl = min(ttl, local_ttl) if shared else ttl
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self._counts['hits'] += 1
+                    return entry[1]
+                self._drop(key)
+                self._counts['expirations'] += 1
+        if self.shared is not None:
+            value = self._shared_call(self.shared.get, f"{self.name}:{key}")
+            if value is not None:
+                # Not copied into this process: without its tags it could not be invalidated
+                with self._lock:
+                    self._counts['shared_hits'] += 1
+                return value
+        with self._lock:
+            self._counts['misses'] += 1
+        return None
+
+    def _put(self, key, value, tags, expires_at):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (expires_at, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._counts['evictions'] += 1
+
+    def set(self, key, value, tags=()):
+        now = time.time()
+        tags = tuple(tags)
+        if self.shared is not None:
+            self._shared_call(self.shared.set, f"{self.name}:{key}", value,
+                              [f"{self.name}:{tag}" for tag in tags], now + self.ttl)
+            self._put(key, value, tags, now + self.local_ttl)
+        else:
+            self._put(key, value, tags, now + self.ttl)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+                    self._counts['invalidations'] += 1
+        if self.shared is not None:
+            self._shared_call(self.shared.invalidate, [f"{self.name}:{tag}" for tag in tags])
+
+    def _shared_call(self, fn, *args):
+        # The shared tier is best effort: a locked/broken file is a miss, not an error
+        try:
+            return fn(*args)
+        except sqlite3.Error as e:
+            print(f"Shared result cache error ({self.name}): {e}")
+            return None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            size = len(self._entries)
+        lookups = counts['hits'] + counts['shared_hits'] + counts['misses']
+        counts.update(size=size, max_entries=self.max_entries, ttl=self.ttl,
+                      hit_rate=round((counts['hits'] + counts['shared_hits']) / lookups, 4) if lookups else None)
+        return counts
+
+
+recommendation_cache = ResultCache('recommendations')
+job_match_cache = ResultCache('job_matches')
+
+
+def profile_version(user, fields):
+    """Short hash of the profile fields a result depends on"""
+    values = [str(getattr(user, field, None) or '') for field in fields]
+    return hashlib.sha1('\x1f'.join(values).encode('utf-8')).hexdigest()[:12]
+
+
+_USER_FIELDS = ('role', 'skills', 'branch', 'current_domain', 'city', 'bio', 'interests')
+_JOB_FIELDS = ('role', 'skills', 'bio', 'interests')
+
+
+def recommended_users(user):
+    """get_recommended_users() through the cache"""
+    if not _settings['enabled'] or not user or not getattr(user, 'id', None):
+        return get_recommended_users(user)
+    key = f"{user.id}:{profile_version(user, _USER_FIELDS)}"
+    value = recommendation_cache.get(key)
+    if value is None:
+        value = get_recommended_users(user)
+        tags = [f"user:{user.id}"] + [f"cand:{rec['id']}" for rec in value]
+        recommendation_cache.set(key, value, tags)
+    return value
+
+
+def recommended_jobs(user):
+    """get_recommended_jobs() through the cache"""
+    if not _settings['enabled'] or not user or not getattr(user, 'id', None):
+        return get_recommended_jobs(user)
+    key = f"{user.id}:{profile_version(user, _JOB_FIELDS)}"
+    value = job_match_cache.get(key)
+    if value is None:
+        value = get_recommended_jobs(user)
+        job_match_cache.set(key, value, [f"user:{user.id}", 'jobs'])
+    return value
+
+
+# ==================== INVALIDATION ====================
+
+def connections_changed(*user_ids):
+    """A connection or request between these users was made/answered"""
+    recommendation_cache.invalidate(*[f"user:{user_id}" for user_id in user_ids])
+
+
+def profile_changed(user_id):
+    """The user's profile changed: entries recommending them are stale (their own miss by version)"""
+    recommendation_cache.invalidate(f"cand:{user_id}")
+
+
+def user_removed(user_id):
+    recommendation_cache.invalidate(f"user:{user_id}", f"cand:{user_id}")
+    job_match_cache.invalidate(f"user:{user_id}", 'jobs')
+
+
+def jobs_changed():
+    """A job was added, edited, deleted or toggled (or its vector was rebuilt)"""
+    job_matcher.invalidate()
+    job_match_cache.invalidate('jobs')
+
+
+def stats():
+    return {
+        'enabled': _settings['enabled'],
+        'shared_path': _settings['shared_path'],
+        'recommendations': recommendation_cache.stats(),
+        'job_matches': job_match_cache.stats(),
+        'job_matcher': job_matcher.stats(),
+    }
+
+
+def init_app(app):
+    """Configure from app config (RESULT_CACHE_*)"""
+    cfg = app.config
+    _settings['enabled'] = cfg.get('RESULT_CACHE', True)
+    _settings['max_entries'] = cfg.get('RESULT_CACHE_MAX_ENTRIES', MAX_ENTRIES)
+    _settings['ttl'] = cfg.get('RESULT_CACHE_TTL', TTL)
+    _settings['shared_path'] = cfg.get('RESULT_CACHE_SHARED_PATH') or None
+    _settings['local_ttl'] = cfg.get('RESULT_CACHE_LOCAL_TTL', LOCAL_TTL)
+    shared = None
+    if _settings['enabled'] and _settings['shared_path']:
+        try:
+            shared = SharedTier(_settings['shared_path'])
+        except sqlite3.Error as e:
+            print(f"⚠ Shared result cache unavailable ({e}); using the in-process tier only")
+    for cache in (recommendation_cache, job_match_cache):
+        cache.configure(_settings['max_entries'], _settings['ttl'], shared, _settings['local_ttl'])
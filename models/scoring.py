@@ -0,0 +1,225 @@
+"""
+Candidate scoring for user recommendations.
+
+Rules (unchanged from the original loop in get_recommended_users):
+    +5 same branch, +5 per matching candidate skill, +2 per mutual
+    connection, +3 same domain, +2 same city, round(cosine * 10) semantic,
+    plus any collaborative-filtering points (models/collaborative.py) the
+    caller passes in ScoringProfile.collab.
+Only candidates scoring > 0 are returned, best first; ties keep candidate
+order (as the stable list.sort did).
+
+Two engines produce identical rankings:
+- score_python(): the per-candidate Python loop, always available;
+- CandidateMatrix: candidates encoded once as arrays (categorical codes for
+  branch/domain/city, sparse skill counts, mutual-connection pairs and an
+  embedding matrix) so one user's scores are a handful of NumPy ops and
+  top-k is a partial sort (np.partition). Build it once and reuse it for many users when
+  scoring in bulk.
+
+rank_candidates() picks NumPy when it is installed and the candidate set is
+large enough for the array setup to pay off.
+"""
+
+from models import skills as skill_index
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+BRANCH_POINTS = 5
+SKILL_POINTS = 5
+MUTUAL_POINTS = 2
+DOMAIN_POINTS = 3
+CITY_POINTS = 2
+SEMANTIC_SCALE = 10
+
+# Below this many candidates the plain loop is as fast as building arrays
+VECTORISE_MIN = 200
+
+
+def split_skills(text):
+    """Comma-separated skills in canonical form (models/skills.py), duplicates kept"""
+    return skill_index.split(text)
+
+
+def _norm(value):
+    return value.lower() if value else None
+
+
+class ScoringProfile:
+    """The scoring-relevant view of the user we recommend for"""
+
+    __slots__ = ('skills', 'branch', 'domain', 'city', 'conn_ids', 'vector', 'collab')
+
+    def __init__(self, skills, branch, domain, city, conn_ids=(), vector=None, collab=None):
+        self.skills = set(split_skills(skills))
+        self.branch = _norm(branch)
+        self.domain = _norm(domain)
+        self.city = _norm(city)
+        self.conn_ids = set(conn_ids)
+        self.vector = vector
+        # {candidate id: collaborative points}
+        self.collab = collab or {}
+
+    @classmethod
+    def for_user(cls, user, conn_ids=(), vector=None, collab=None):
+        return cls(user.skills, user.branch, user.current_domain, user.city, conn_ids, vector, collab)
+
+
+# ==================== PYTHON ENGINE ====================
+
+def score_one(profile, cand, cand_conns, cand_vector):
+    score = 0
+
+    # Rule 1: Same branch
+    if cand['branch'] and profile.branch and cand['branch'].lower() == profile.branch:
+        score += BRANCH_POINTS
+
+    # Rule 2: Skill match (+5 per matching skill)
+    for skill in split_skills(cand['skills']):
+        if skill in profile.skills:
+            score += SKILL_POINTS
+
+    # Rule 3: Mutual Connections (+2 per mutual connection)
+    if cand_conns:
+        score += sum(1 for other in cand_conns if other in profile.conn_ids) * MUTUAL_POINTS
+
+    # Rule 4: Same domain
+    if cand['current_domain'] and profile.domain and cand['current_domain'].lower() == profile.domain:
+        score += DOMAIN_POINTS
+
+    # Rule 5: Same city
+    if cand['city'] and profile.city and cand['city'].lower() == profile.city:
+        score += CITY_POINTS
+
+    # Rule 6: AI Semantic Match (+0 to 10 points based on Bio/Interests)
+    if profile.vector is not None and cand_vector is not None:
+        score += round(sum(x * y for x, y in zip(profile.vector, cand_vector)) * SEMANTIC_SCALE)
+
+    # Rule 7: Collaborative filtering (people like you connected with them)
+    score += profile.collab.get(cand['id'], 0)
+
+    return score
+
+
+def score_python(profile, candidates, cand_conn_map, vectors, k=5):
+    """[(candidate index, score)] best first, via the per-candidate loop"""
+    scored = []
+    for i, cand in enumerate(candidates):
+        score = score_one(profile, cand, cand_conn_map.get(cand['id']), vectors.get(cand['id']))
+        if score > 0:
+            scored.append((i, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return scored[:k]
+
+
+# ==================== NUMPY ENGINE ====================
+
+class CandidateMatrix:
+    """Candidates encoded as arrays; score() evaluates every rule at once"""
+
+    def __init__(self, candidates, cand_conn_map=None, vectors=None):
+        cand_conn_map = cand_conn_map or {}
+        vectors = vectors or {}
+        n = len(candidates)
+        self.size = n
+        self.ids = np.fromiter((c['id'] for c in candidates), dtype=np.int64, count=n)
+
+        self._vocab = {'branch': {}, 'current_domain': {}, 'city': {}}
+        self._codes = {}
+        for column, vocab in self._vocab.items():
+            codes = np.full(n, -1, dtype=np.int32)
+            for i, cand in enumerate(candidates):
+                value = cand[column]
+                if value:
+                    codes[i] = vocab.setdefault(value.lower(), len(vocab))
+            self._codes[column] = codes
+
+        # Sparse skill counts: (candidate row, skill id), one entry per listed skill
+        self._skill_vocab = {}
+        rows, skill_ids = [], []
+        for i, cand in enumerate(candidates):
+            for skill in split_skills(cand['skills']):
+                rows.append(i)
+                skill_ids.append(self._skill_vocab.setdefault(skill, len(self._skill_vocab)))
+        self._skill_rows = np.asarray(rows, dtype=np.int64)
+        self._skill_ids = np.asarray(skill_ids, dtype=np.int64)
+
+        # Connection pairs: (candidate row, neighbour user id)
+        rows, neighbours = [], []
+        for i, cand in enumerate(candidates):
+            for other in cand_conn_map.get(cand['id'], ()):
+                rows.append(i)
+                neighbours.append(other)
+        self._conn_rows = np.asarray(rows, dtype=np.int64)
+        self._conn_ids = np.asarray(neighbours, dtype=np.int64)
+
+        # Embedding matrix; rows without a current vector are masked out
+        dim = next((len(v) for v in vectors.values()), 0)
+        self._emb = np.zeros((n, dim), dtype=np.float32)
+        self._has_emb = np.zeros(n, dtype=bool)
+        if dim:
+            for i, cand in enumerate(candidates):
+                vec = vectors.get(cand['id'])
+                if vec is not None:
+                    self._emb[i] = np.asarray(vec, dtype=np.float32)
+                    self._has_emb[i] = True
+
+    def _match(self, column, value):
+        code = self._vocab[column].get(value) if value else None
+        if code is None:
+            return np.zeros(self.size, dtype=bool)
+        return self._codes[column] == code
+
+    def score(self, profile):
+        """Scores for every candidate (int64 array, candidate order)"""
+        n = self.size
+        scores = np.zeros(n, dtype=np.int64)
+        scores += self._match('branch', profile.branch) * BRANCH_POINTS
+        scores += self._match('current_domain', profile.domain) * DOMAIN_POINTS
+        scores += self._match('city', profile.city) * CITY_POINTS
+
+        wanted = [self._skill_vocab[s] for s in profile.skills if s in self._skill_vocab]
+        if wanted and self._skill_ids.size:
+            hit = np.isin(self._skill_ids, wanted)
+            scores += np.bincount(self._skill_rows[hit], minlength=n) * SKILL_POINTS
+
+        if profile.conn_ids and self._conn_ids.size:
+            hit = np.isin(self._conn_ids, np.fromiter(profile.conn_ids, dtype=np.int64))
+            scores += np.bincount(self._conn_rows[hit], minlength=n) * MUTUAL_POINTS
+
+        if profile.vector is not None and self._emb.shape[1] == len(profile.vector):
+            sims = (self._emb @ np.asarray(profile.vector, dtype=np.float32)).astype(np.float64)
+            # np.rint rounds half to even, like round()
+            scores += np.where(self._has_emb, np.rint(sims * SEMANTIC_SCALE), 0).astype(np.int64)
+
+        if profile.collab:
+            scores += np.fromiter((profile.collab.get(cid, 0) for cid in self.ids.tolist()),
+                                  dtype=np.int64, count=n)
+        return scores
+
+    def top_k(self, profile, k=5):
+        """[(candidate index, score)] best first, same order as score_python()"""
+        scores = self.score(profile)
+        positive = np.flatnonzero(scores > 0)
+        if positive.size == 0:
+            return []
+        if positive.size > k:
+            # Everything strictly above the k-th best score, then ties in candidate order
+            kth = np.partition(scores[positive], positive.size - k)[positive.size - k]
+            above = positive[scores[positive] > kth]
+            ties = positive[scores[positive] == kth][:k - above.size]
+            positive = np.concatenate([above, ties])
+        order = np.lexsort((positive, -scores[positive]))
+        chosen = positive[order]
+        return [(int(i), int(scores[i])) for i in chosen]
+
+
+def rank_candidates(profile, candidates, cand_conn_map, vectors, k=5):
+    """Top-k (candidate index, score) with whichever engine suits the input size"""
+    if NUMPY_AVAILABLE and len(candidates) >= VECTORISE_MIN:
+        return CandidateMatrix(candidates, cand_conn_map, vectors).top_k(profile, k)
+    return score_python(profile, candidates, cand_conn_map, vectors, k)
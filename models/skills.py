@@ -0,0 +1,191 @@
+"""
+Normalised skills and skill posting lists.
+
+Skills are typed as comma-separated free text (users.skills,
+student_profile.skills, jobs.required_skills, jobs.skills_required).
+Every entry is canonicalised once - case, spacing and common synonyms
+("JS", "javascript" and "Java Script" are one skill) - and stored as:
+
+    skills(id, name)               one row per canonical skill
+    user_skills(user_id, skill_id) who lists it
+    job_skills(job_id, skill_id)   which jobs require it
+
+The postings are rewritten in the same transaction as the profile/job
+edit (set_user_skills / set_job_skills), so matchers can pull candidates
+with an indexed join on skill_id instead of re-splitting text for every
+row on every request.
+"""
+
+import re
+from functools import lru_cache
+
+# SQLite's default bound-parameter limit is 999
+_IN_CHUNK = 900
+
+# Spelling variants -> canonical name (keys and values already lowercased)
+SYNONYMS = {
+    'js': 'javascript',
+    'java script': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'py': 'python',
+    'python3': 'python',
+    'golang': 'go',
+    'cpp': 'c++',
+    'c plus plus': 'c++',
+    'c sharp': 'c#',
+    'csharp': 'c#',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'react js': 'react',
+    'angularjs': 'angular',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'node js': 'node.js',
+    'expressjs': 'express',
+    'express.js': 'express',
+    'nextjs': 'next.js',
+    'postgres': 'postgresql',
+    'psql': 'postgresql',
+    'mongo': 'mongodb',
+    'mysql db': 'mysql',
+    'k8s': 'kubernetes',
+    'ml': 'machine learning',
+    'dl': 'deep learning',
+    'ai': 'artificial intelligence',
+    'nlp': 'natural language processing',
+    'cv': 'computer vision',
+    'dsa': 'data structures and algorithms',
+    'data structures & algorithms': 'data structures and algorithms',
+    'oop': 'object oriented programming',
+    'oops': 'object oriented programming',
+    'html5': 'html',
+    'css3': 'css',
+    'ui/ux': 'ui/ux design',
+    'ux/ui': 'ui/ux design',
+    'aws cloud': 'aws',
+    'amazon web services': 'aws',
+    'gcp': 'google cloud',
+    'ms excel': 'excel',
+    'microsoft excel': 'excel',
+}
+
+_SPACE_RE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def canonical(name):
+    """Canonical spelling of one skill ('' for blanks)"""
+    name = _SPACE_RE.sub(' ', (name or '').strip().lower())
+    return SYNONYMS.get(name, name)
+
+
+def split(text):
+    """Canonical skills of a comma-separated list, in order (duplicates kept)"""
+    names = []
+    for part in (text or '').split(','):
+        name = canonical(part)
+        if name:
+            names.append(name)
+    return names
+
+
+def parse(*texts):
+    """Distinct canonical skills across one or more comma-separated lists"""
+    return list(dict.fromkeys(name for text in texts for name in split(text)))
+
+
+# ==================== WRITE ====================
+
+def _skill_ids(conn, names, create=False):
+    """{name: skill id} for the given canonical names (creating missing ones if asked)"""
+    ids = {}
+    for start in range(0, len(names), _IN_CHUNK):
+        chunk = names[start:start + _IN_CHUNK]
+        if create:
+            conn.executemany('INSERT OR IGNORE INTO skills (name) VALUES (?)', [(n,) for n in chunk])
+        placeholders = ','.join(['?'] * len(chunk))
+        for row in conn.execute(f'SELECT id, name FROM skills WHERE name IN ({placeholders})', chunk).fetchall():
+            ids[row['name']] = row['id']
+    return ids
+
+
+def set_user_skills(conn, user_id, *texts):
+    """Replace a user's postings; call inside the transaction that saves the profile"""
+    conn.execute('DELETE FROM user_skills WHERE user_id = ?', (user_id,))
+    ids = _skill_ids(conn, parse(*texts), create=True)
+    if ids:
+        conn.executemany('INSERT OR IGNORE INTO user_skills (user_id, skill_id) VALUES (?, ?)',
+                         [(user_id, skill_id) for skill_id in ids.values()])
+
+
+def set_job_skills(conn, job_id, *texts):
+    """Replace a job's postings; call inside the transaction that saves the job"""
+    conn.execute('DELETE FROM job_skills WHERE job_id = ?', (job_id,))
+    ids = _skill_ids(conn, parse(*texts), create=True)
+    if ids:
+        conn.executemany('INSERT OR IGNORE INTO job_skills (job_id, skill_id) VALUES (?, ?)',
+                         [(job_id, skill_id) for skill_id in ids.values()])
+
+
+def delete_user(conn, user_id):
+    conn.execute('DELETE FROM user_skills WHERE user_id = ?', (user_id,))
+
+
+def delete_job(conn, job_id):
+    conn.execute('DELETE FROM job_skills WHERE job_id = ?', (job_id,))
+
+
+def rebuild(conn):
+    """Rebuild every posting from the text columns. Returns (users, jobs) indexed."""
+    users = conn.execute("SELECT id, skills FROM users WHERE COALESCE(skills, '') != ''").fetchall()
+    for row in users:
+        set_user_skills(conn, row['id'], row['skills'])
+    jobs = conn.execute('''
+        SELECT id, required_skills, skills_required FROM jobs
+        WHERE COALESCE(required_skills, '') != '' OR COALESCE(skills_required, '') != ''
+    ''').fetchall()
+    for row in jobs:
+        set_job_skills(conn, row['id'], row['required_skills'], row['skills_required'])
+    return len(users), len(jobs)
+
+
+# ==================== READ ====================
+
+def lookup(conn, text):
+    """Skill ids of the skills in `text` that anyone has listed (unknown ones can't match)"""
+    return list(_skill_ids(conn, parse(text)).values())
+
+
+def user_candidates(conn, skill_ids, role, exclude=(), limit=50):
+    """[(user_id, shared skills)] of `role` users sharing the most skills, via user_skills"""
+    if not skill_ids:
+        return []
+    exclude = list(exclude)
+    skill_marks = ','.join(['?'] * len(skill_ids))
+    not_in = f"AND us.user_id NOT IN ({','.join(['?'] * len(exclude))})" if exclude else ''
+    rows = conn.execute(f'''
+        SELECT us.user_id, COUNT(*) AS shared
+        FROM user_skills us
+        JOIN users u ON u.id = us.user_id
+        WHERE us.skill_id IN ({skill_marks}) AND u.role = ? {not_in}
+        GROUP BY us.user_id
+        ORDER BY shared DESC, us.user_id
+        LIMIT ?
+    ''', list(skill_ids) + [role] + exclude + [limit]).fetchall()
+    return [(row['user_id'], row['shared']) for row in rows]
+
+
+def job_matches(conn, skill_ids):
+    """{job_id: shared skills} for every job requiring any of the skills, via job_skills"""
+    if not skill_ids:
+        return {}
+    placeholders = ','.join(['?'] * len(skill_ids))
+    rows = conn.execute(f'''
+        SELECT job_id, COUNT(*) AS shared FROM job_skills
+        WHERE skill_id IN ({placeholders})
+        GROUP BY job_id
+    ''', list(skill_ids)).fetchall()
+    return {row['job_id']: row['shared'] for row in rows}
@@ -0,0 +1,108 @@
+"""
+User model and row mapper.
+
+One slotted class serves as Flask-Login's current_user (load_user, login)
+and as the user object recommendation code scores for. Rows are selected
+with USER_COLUMNS, whose order matches the constructor, and mapped in one
+place:
+
+    row = conn.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (user_id,)).fetchone()
+    user = User.from_row(row)
+
+Extra columns after USER_COLUMNS (e.g. password for login) are ignored by
+the mapper. The class implements Flask-Login's user interface itself
+instead of inheriting UserMixin, which has no __slots__ and would give
+every instance a __dict__ again.
+"""
+
+USER_FIELDS = (
+    'id', 'name', 'email', 'role', 'profile_pic', 'phone', 'is_verified', 'is_suspended',
+    'branch', 'passing_year', 'current_domain', 'skills', 'interests', 'city', 'company',
+    'bio', 'version',
+)
+USER_COLUMNS = ', '.join(USER_FIELDS)
+
+AVATAR_URL = "https://ui-avatars.com/api/?name={name}&background=0D6EFD&color=fff"
+
+
+class User:
+    """A users row as the app uses it (identity, status and recommendation fields)"""
+
+    __slots__ = USER_FIELDS
+
+    def __init__(self, id, name, email, role, profile_pic=None, phone=None, is_verified=1, is_suspended=0,
+                 branch=None, passing_year=None, current_domain=None, skills=None,
+                 interests=None, city=None, company=None, bio=None, version=0):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.role = role
+        self.profile_pic = profile_pic
+        self.phone = phone
+        self.is_verified = is_verified
+        self.is_suspended = is_suspended
+        self.branch = branch
+        self.passing_year = passing_year
+        self.current_domain = current_domain
+        self.skills = skills
+        self.interests = interests
+        self.city = city
+        self.company = company
+        self.bio = bio
+        self.version = version
+
+    @classmethod
+    def from_row(cls, row):
+        """User from a row that starts with USER_COLUMNS; None for no row"""
+        if row is None:
+            return None
+        user = cls(*row[:len(USER_FIELDS)])
+        if not user.profile_pic:
+            user.profile_pic = AVATAR_URL.format(name=user.name)
+        if user.is_verified is None:
+            user.is_verified = 1
+        user.is_suspended = user.is_suspended or 0
+        user.version = user.version or 0
+        return user
+
+    # Flask-Login user interface
+
+    @property
+    def is_active(self):
+        return not self.is_suspended
+
+    @property
+    def is_authenticated(self):
+        return self.is_active
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    def get_id(self):
+        return str(self.id)
+
+    def __eq__(self, other):
+        if isinstance(other, User):
+            return self.id == other.id
+        return NotImplemented
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"<User {self.id} {self.role}>"
+
+
+def load_users(conn, user_ids, roles=None, chunk_size=500):
+    """Users for the given ids (optionally only these roles), in no particular order"""
+    user_ids = list(user_ids)
+    role_sql = f" AND role IN ({','.join(['?'] * len(roles))})" if roles else ''
+    users = []
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        placeholders = ','.join(['?'] * len(chunk))
+        users.extend(User.from_row(row) for row in conn.execute(
+            f'SELECT {USER_COLUMNS} FROM users WHERE id IN ({placeholders}){role_sql}',
+            chunk + list(roles or ())
+        ).fetchall())
+    return users
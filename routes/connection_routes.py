@@ -4,7 +4,11 @@ import sqlite3
 from extensions import mail
 from flask_mail import Message
 from datetime import datetime
-from db_utils import get_db_connection
+from db_utils import get_db_connection, transaction
+from database import write_queue
+from models.connection_graph import connection_graph
+from models import recommendation_store, result_cache
+from models.user import USER_COLUMNS
 
 connection_bp = Blueprint('connection_request_api', __name__, url_prefix='/api/connection-request')
 
@@ -37,7 +41,7 @@ def send_connection_request():
         
         # Check if request already exists
         existing_request = c.execute(
-            'SELECT * FROM connection_requests WHERE sender_id = ? AND receiver_id = ? AND status = "pending"',
+            "SELECT * FROM connection_requests WHERE sender_id = ? AND receiver_id = ? AND status = 'pending'",
             (current_user.id, receiver_id)
         ).fetchone()
         
@@ -56,26 +60,25 @@ def send_connection_request():
                     return jsonify({'success': False, 'error': f'Please wait {remaining} minutes before sending again'}), 400
             
             # Allow resending
-            c.execute('UPDATE connection_requests SET created_at = ? WHERE id = ?', 
-                     (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), existing_request['id']))
-            conn.commit()
+            write_queue.execute('UPDATE connection_requests SET created_at = ? WHERE id = ?',
+                                (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), existing_request['id']))
             
         else:
             # Insert new request
             try:
-                c.execute(
-                    'INSERT INTO connection_requests (sender_id, receiver_id, status) VALUES (?, ?, "pending")',
+                write_queue.execute(
+                    "INSERT INTO connection_requests (sender_id, receiver_id, status) VALUES (?, ?, 'pending')",
                     (current_user.id, receiver_id)
                 )
-                conn.commit()
             except sqlite3.IntegrityError:
                 conn.close()
                 return jsonify({'success': False, 'error': 'Request already exists'}), 400
+        result_cache.connections_changed(current_user.id, int(receiver_id))
         
         # Send email (Common for both)
         try:
-            sender = c.execute('SELECT * FROM users WHERE id = ?', (current_user.id,)).fetchone()
-            receiver = c.execute('SELECT * FROM users WHERE id = ?', (receiver_id,)).fetchone()
+            sender = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (current_user.id,)).fetchone()
+            receiver = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (receiver_id,)).fetchone()
             
             
             if sender and receiver:
@@ -120,6 +123,25 @@ def send_connection_request():
         print(f"Error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def _accept_request(request_id, sender_id, receiver_id):
+    """Write job: mark the request accepted and create the connection"""
+    with transaction() as conn:
+        conn.execute(
+            "UPDATE connection_requests SET status = 'accepted' WHERE id = ?",
+            (request_id,)
+        )
+
+        # Create connection (ensure user_id_1 < user_id_2 for consistency)
+        user_id_1 = min(sender_id, receiver_id)
+        user_id_2 = max(sender_id, receiver_id)
+
+        conn.execute(
+            'INSERT OR IGNORE INTO connections (user_id_1, user_id_2) VALUES (?, ?)',
+            (user_id_1, user_id_2)
+        )
+        recommendation_store.log_change(conn, sender_id, 'connection')
+        recommendation_store.log_change(conn, receiver_id, 'connection')
+
 @connection_bp.route('/accept/<int:request_id>', methods=['POST'])
 @login_required
 def accept_connection_request(request_id):
@@ -138,26 +160,14 @@ def accept_connection_request(request_id):
             conn.close()
             return jsonify({'success': False, 'error': 'Request not found'}), 404
         
-        # Update request status
-        c.execute(
-            'UPDATE connection_requests SET status = "accepted" WHERE id = ?',
-            (request_id,)
-        )
-        
-        # Create connection (ensure user_id_1 < user_id_2 for consistency)
-        user_id_1 = min(req['sender_id'], current_user.id)
-        user_id_2 = max(req['sender_id'], current_user.id)
-        
-        c.execute(
-            'INSERT OR IGNORE INTO connections (user_id_1, user_id_2) VALUES (?, ?)',
-            (user_id_1, user_id_2)
-        )
-        
-        conn.commit()
+        # Update request status and create the connection in one write job
+        write_queue.run(_accept_request, request_id, req['sender_id'], current_user.id)
+        connection_graph.add_connection(req['sender_id'], current_user.id)
+        result_cache.connections_changed(req['sender_id'], current_user.id)
         
         # Send email notification
-        sender = c.execute('SELECT * FROM users WHERE id = ?', (req['sender_id'],)).fetchone()
-        receiver = c.execute('SELECT * FROM users WHERE id = ?', (current_user.id,)).fetchone()
+        sender = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (req['sender_id'],)).fetchone()
+        receiver = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (current_user.id,)).fetchone()
         
         if sender and receiver:
             subject = f"Connection Accepted! {receiver['name']} is now in your network"
@@ -216,16 +226,15 @@ def reject_connection_request(request_id):
             return jsonify({'success': False, 'error': 'Request not found'}), 404
         
         # Update request status
-        c.execute(
-            'UPDATE connection_requests SET status = "rejected" WHERE id = ?',
+        write_queue.execute(
+            "UPDATE connection_requests SET status = 'rejected', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
             (request_id,)
         )
-        
-        conn.commit()
+        result_cache.connections_changed(req['sender_id'], current_user.id)
         
         # Send email notification
-        sender = c.execute('SELECT * FROM users WHERE id = ?', (req['sender_id'],)).fetchone()
-        receiver = c.execute('SELECT * FROM users WHERE id = ?', (current_user.id,)).fetchone()
+        sender = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (req['sender_id'],)).fetchone()
+        receiver = c.execute(f'SELECT {USER_COLUMNS} FROM users WHERE id = ?', (current_user.id,)).fetchone()
         
         if sender and receiver:
             subject = f"{receiver['name']} rejected your connection request"
@@ -265,7 +274,7 @@ def get_pending_requests():
             SELECT cr.*, u.name, u.email, u.profile_pic
             FROM connection_requests cr
             JOIN users u ON cr.sender_id = u.id
-            WHERE cr.receiver_id = ? AND cr.status = "pending"
+            WHERE cr.receiver_id = ? AND cr.status = 'pending'
             ORDER BY cr.created_at DESC
         ''', (current_user.id,)).fetchall()
         
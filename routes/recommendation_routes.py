@@ -1,6 +1,6 @@
 from flask import Blueprint, jsonify
 from flask_login import login_required, current_user
-from models.recommendation import get_recommended_users
+from models.recommendation_store import get_recommendations
 
 recommendation_bp = Blueprint('recommendation', __name__)
 
@@ -14,7 +14,7 @@ def recommendations():
         return jsonify([])
         
     try:
-        recs = get_recommended_users(current_user)
+        recs = get_recommendations(current_user)
         return jsonify(recs)
     except Exception as e:
         # Standard expert practice: log and return empty rather than breaking UI
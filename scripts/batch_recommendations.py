@@ -0,0 +1,64 @@
+"""
+Compute recommendations for every student and alumnus in one run.
+
+Scores users in a process pool (models/batch_recommendations.py) and
+bulk-writes user_recommendations / recommendation_status, which the
+dashboards serve from. Run it nightly and after bulk imports:
+
+    python scripts/batch_recommendations.py                 # all cores
+    python scripts/batch_recommendations.py --workers 4
+    python scripts/batch_recommendations.py --dry-run       # score only, write nothing
+    python scripts/batch_recommendations.py --scaling       # users/sec for 1, 2, 4 ... workers
+
+Uses whatever DB_NAME / DATABASE_URL points at.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AUTO_MIGRATE', 'False')
+# Scores come from stored vectors; the model itself is never needed here
+os.environ.setdefault('AI_RECOMMENDATIONS', 'False')
+
+# Workers re-import this script (spawn), so the app is only imported in main()
+from models import batch_recommendations
+
+
+def _print_report(report):
+    print(f"✓ {report['users']} users in {report['shards']} shards on {report['workers']} workers")
+    print(f"  export {report['export_s']}s, scoring {report['score_s']}s "
+          f"(writing {report['write_s']}s of it), total {report['total_s']}s")
+    print(f"  throughput: {report['users_per_sec']} users/sec, {report['written']} lists written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline recommendation run for every student and alumnus')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--shard-size', type=int, default=batch_recommendations.SHARD_SIZE,
+                        help='users per worker task')
+    parser.add_argument('--dry-run', action='store_true', help='score everyone but write nothing')
+    parser.add_argument('--scaling', action='store_true',
+                        help='dry runs with 1, 2, 4 ... workers up to --workers, reporting speedup')
+    args = parser.parse_args()
+
+    from app import app
+    with app.app_context():
+        if not args.scaling:
+            _print_report(batch_recommendations.run(args.workers, args.shard_size, write=not args.dry_run))
+            return
+
+        most = args.workers or os.cpu_count() or 1
+        counts = sorted({min(2 ** i, most) for i in range(most.bit_length() + 1)})
+        baseline = None
+        print(f"{'workers':>8} {'users/sec':>12} {'speedup':>8}")
+        for workers in counts:
+            report = batch_recommendations.run(workers, args.shard_size, write=False)
+            rate = report['users_per_sec'] or 0
+            baseline = baseline or rate
+            print(f"{workers:>8} {rate:>12} {rate / baseline if baseline else 0:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
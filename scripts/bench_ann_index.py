@@ -0,0 +1,82 @@
+"""
+Recall and latency of the ANN index (models/ann_index.py) on synthetic profiles.
+
+Generates clustered unit vectors for one role, builds a partition, and for
+random queries compares the IVF top-k with an exact brute-force top-k.
+Also times incremental upserts/removes:
+
+    python scripts/bench_ann_index.py
+    python scripts/bench_ann_index.py --size 20000 --dim 128 -k 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models import ann_index as ann
+
+if not ann.NUMPY_AVAILABLE:
+    print("NumPy is not installed; the ANN index is disabled.")
+    sys.exit(0)
+
+import numpy as np
+
+
+def clustered_vectors(n, dim, rng, topics=200):
+    centres = rng.normal(size=(topics, dim))
+    data = centres[rng.integers(0, topics, n)] + 0.6 * rng.normal(size=(n, dim))
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data.astype(np.float32)
+
+
+def bench(size, dim, k, queries, seed):
+    rng = np.random.default_rng(seed)
+    data = clustered_vectors(size, dim, rng)
+    index = ann.AnnIndex()
+    index._state = 'ready'
+
+    started = time.perf_counter()
+    part = index._partitions['alumni'] = ann._Partition(dim)
+    for i, vec in enumerate(data, start=1):
+        part.upsert(i, vec)
+        index._roles[i] = 'alumni'
+    part.install(ann.train_centroids(part.snapshot()) if len(part) >= ann.IVF_MIN else None)
+    print(f"{size:,} vectors, dim {dim}: built in {(time.perf_counter() - started):.2f}s, "
+          f"{0 if part.centroids is None else len(part.centroids)} lists, nprobe {ann.ANN_NPROBE}")
+
+    query_ids = rng.choice(size, queries, replace=False)
+    recall, ann_ms, exact_ms = [], 0.0, 0.0
+    for qi in query_ids:
+        q = data[qi]
+        started = time.perf_counter()
+        got = {uid for uid, _ in index.search('alumni', q, k=k)}
+        ann_ms += time.perf_counter() - started
+        started = time.perf_counter()
+        exact = set((np.argsort(-(data @ q))[:k] + 1).tolist())
+        exact_ms += time.perf_counter() - started
+        recall.append(len(got & exact) / k)
+    print(f"  recall@{k}       : {np.mean(recall):.3f}")
+    print(f"  ANN query       : {ann_ms * 1000 / queries:.2f} ms")
+    print(f"  exact query     : {exact_ms * 1000 / queries:.2f} ms")
+
+    started = time.perf_counter()
+    for i in range(1000):
+        index.upsert(size + i + 1, 'alumni', data[i])
+    for i in range(1000):
+        index.remove(i + 1)
+    print(f"  upsert+remove   : {(time.perf_counter() - started) * 1000 / 2000:.3f} ms/op")
+    return float(np.mean(recall))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('-k', type=int, default=50)
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+    bench(args.size, args.dim, args.k, args.queries, args.seed)
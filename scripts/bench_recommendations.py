@@ -0,0 +1,340 @@
+"""
+End-to-end cost and quality of get_recommended_users / get_recommended_jobs.
+
+For each size, builds a scratch SQLite database of synthetic users
+(branches, cities, domains, skills, bios + stored profile vectors),
+connections, pending requests and jobs, loads the connection graph, ANN
+index and job matcher the way a serving process would, then for a sample
+of users:
+
+- times both recommenders end to end and per stage (exclusions, candidate
+  fetch, mutual connections, semantic vectors, scoring - see
+  set_stage_listener in models/recommendation.py) and reports p50/p95;
+- reports peak Python allocation per call (tracemalloc) and process RSS;
+- compares each top 5 with an exact reference that scores every candidate
+  (models/scoring.py over the whole other role; every open job), and
+  optionally with the top 5s saved by an earlier run (--baseline), so a
+  speedup that changes results shows up as lower overlap:
+
+    python scripts/bench_recommendations.py                        # 1k, 10k, 100k users
+    python scripts/bench_recommendations.py --sizes 10000 --queries 500
+    python scripts/bench_recommendations.py --save-baseline /tmp/recs.json
+    python scripts/bench_recommendations.py --baseline /tmp/recs.json --min-overlap 1.0
+
+Exits 1 when a baseline comparison falls below --min-overlap.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Scratch database and no model load: vectors are written directly.
+# No collaborative points either: the exact reference scores rules only
+_scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+_scratch.close()
+os.environ['DB_NAME'] = _scratch.name
+os.environ['AUTO_MIGRATE'] = 'False'
+os.environ['AI_RECOMMENDATIONS'] = 'False'
+os.environ['COLLABORATIVE_FILTERING'] = 'False'
+
+from app import app
+import db_utils
+from database.migrations import migrate
+from models import embeddings, job_matching, recommendation
+from models import skills as skill_index
+from models.ann_index import ann_index
+from models.connection_graph import connection_graph
+from models.job_matching import job_matcher
+from models.scoring import NUMPY_AVAILABLE, ScoringProfile
+from models.user import USER_COLUMNS, User
+
+if not NUMPY_AVAILABLE:
+    print("NumPy is needed for the synthetic vectors and the exact reference.")
+    sys.exit(0)
+
+import numpy as np
+from models.scoring import CandidateMatrix
+
+TOPICS = ['web development', 'data science', 'cloud infrastructure', 'embedded systems', 'finance',
+          'product design', 'machine learning', 'cyber security', 'mobile apps', 'devops']
+SKILLS = [f"skill{i}" for i in range(300)]
+BRANCHES = ['Computer Science', 'Information Technology', 'Mechanical Engineering',
+            'Civil Engineering', 'Electronics & Communication', 'Commerce', None]
+DOMAINS = ['Web', 'Data', 'Cloud', 'Embedded', 'Finance', 'Design', None]
+CITIES = ['Mumbai', 'Pune', 'Bangalore', 'Delhi', 'Hyderabad', 'Chennai', None]
+TOP_K = 5
+
+
+# ==================== DATASET ====================
+
+def _unit_rows(rng, centres, topics):
+    data = centres[topics] + 0.6 * rng.normal(size=(len(topics), centres.shape[1]))
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data.astype(np.float32)
+
+
+def build_dataset(path, n, dim, seed):
+    """Fill a fresh database at `path` with n users and n/20 jobs"""
+    db_utils.configure(path)
+    with app.app_context():
+        migrate(verbose=False)
+    rng = random.Random(seed)
+    nrng = np.random.default_rng(seed)
+    # Popular skills are listed far more often than rare ones
+    weights = [1 / (i + 1) for i in range(len(SKILLS))]
+    centres = nrng.normal(size=(len(TOPICS), dim))
+    first_id = 1000
+    model = recommendation.ai_engine.model_name
+    now = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    users, topics = [], []
+    for i in range(n):
+        topic = rng.randrange(len(TOPICS))
+        topics.append(topic)
+        role = 'student' if rng.random() < 0.6 else 'alumni'
+        bio = f"Interested in {TOPICS[topic]} and {rng.choice(TOPICS)}" if rng.random() < 0.85 else ''
+        users.append((first_id + i, f"User {i}", f"user{i}@bench.local", 'x', role,
+                      rng.choice(BRANCHES), rng.choice(DOMAINS), rng.choice(CITIES),
+                      ', '.join(set(rng.choices(SKILLS, weights, k=rng.randint(0, 8)))), bio, TOPICS[topic]))
+    vectors = _unit_rows(nrng, centres, np.array(topics))
+
+    # ~8 connections per user, mostly within the same topic
+    by_topic = {}
+    for i, topic in enumerate(topics):
+        by_topic.setdefault(topic, []).append(i)
+    pairs = set()
+    for i, topic in enumerate(topics):
+        for _ in range(4):
+            j = rng.choice(by_topic[topic]) if rng.random() < 0.7 else rng.randrange(n)
+            if i != j:
+                pairs.add((min(i, j), max(i, j)))
+    requests = {(rng.randrange(n), rng.randrange(n)) for _ in range(n // 10)}
+    requests = [(a, b) for a, b in requests if a != b and (min(a, b), max(a, b)) not in pairs]
+
+    jobs, job_topics = [], []
+    alumni = [u[0] for u in users if u[4] == 'alumni']
+    for j in range(max(n // 20, 10)):
+        topic = rng.randrange(len(TOPICS))
+        job_topics.append(topic)
+        deadline = '2000-01-01' if rng.random() < 0.1 else '2099-12-31'
+        jobs.append((j + 1, f"{TOPICS[topic].title()} role {j}", f"Work on {TOPICS[topic]}", 'Bench Co',
+                     ', '.join(set(rng.choices(SKILLS, weights, k=rng.randint(1, 6)))), rng.choice(alumni),
+                     1 if rng.random() < 0.9 else 0, deadline, f"2026-01-01 00:{j // 60 % 60:02d}:{j % 60:02d}"))
+    job_vectors = _unit_rows(nrng, centres, np.array(job_topics))
+
+    with db_utils.transaction() as conn:
+        conn.executemany('''INSERT INTO users (id, name, email, password, role, branch, current_domain, city,
+                            skills, bio, interests) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', users)
+        conn.executemany('INSERT INTO connections (user_id_1, user_id_2) VALUES (?, ?)',
+                         [(first_id + a, first_id + b) for a, b in pairs])
+        conn.executemany("INSERT INTO connection_requests (sender_id, receiver_id, status) VALUES (?, ?, 'pending')",
+                         [(first_id + a, first_id + b) for a, b in requests])
+        conn.executemany('''INSERT INTO profile_embeddings (user_id, content_hash, model, dim, vector, updated_at)
+                            VALUES (?, ?, ?, ?, ?, ?)''',
+                         [(u[0], embeddings.content_hash(embeddings.profile_text(u[9], u[10])), model, dim,
+                           embeddings.pack(vectors[i]), now) for i, u in enumerate(users)])
+        conn.executemany('''INSERT INTO jobs (id, title, description, company, required_skills, posted_by,
+                            is_active, deadline, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', jobs)
+        conn.executemany('''INSERT INTO job_embeddings (job_id, content_hash, model, dim, vector, updated_at)
+                            VALUES (?, ?, ?, ?, ?, ?)''',
+                         [(job[0], embeddings.content_hash(job_matching.job_text(job[1], job[2])), model, dim,
+                           embeddings.pack(job_vectors[j]), now) for j, job in enumerate(jobs)])
+        skill_index.rebuild(conn)
+
+    # Warm everything a serving process keeps in memory
+    connection_graph.load()
+    ann_index.load(model)
+    job_matcher.invalidate()
+    job_matcher.snapshot()
+
+
+# ==================== REFERENCE ====================
+
+class Reference:
+    """Exact top 5s: every candidate of the other role, every open job"""
+
+    def __init__(self):
+        conn = db_utils.get_db_connection()
+        try:
+            rows = conn.execute(f"SELECT {USER_COLUMNS} FROM users WHERE role IN ('student', 'alumni') ORDER BY id").fetchall()
+            pending = conn.execute(
+                "SELECT sender_id, receiver_id FROM connection_requests WHERE status = 'pending'").fetchall()
+        finally:
+            conn.close()
+        self.users = {row['id']: row for row in rows}
+        stored = embeddings.load_vectors(list(self.users))
+        self.vectors = {uid: entry[1] for uid, entry in stored.items()}
+        self.pending = {}
+        for row in pending:
+            self.pending.setdefault(row['sender_id'], set()).add(row['receiver_id'])
+            self.pending.setdefault(row['receiver_id'], set()).add(row['sender_id'])
+        self.conn_map = {uid: set(connection_graph.neighbours(uid)) for uid in self.users}
+        # One matrix per role over all of its users; exclusions are applied per query
+        self.matrices = {}
+        for role in ('student', 'alumni'):
+            candidates = [dict(row) for row in rows if row['role'] == role]
+            self.matrices[role] = CandidateMatrix(candidates, self.conn_map, self.vectors)
+
+    def users_for(self, user):
+        matrix = self.matrices['alumni' if user.role == 'student' else 'student']
+        profile = ScoringProfile.for_user(user, self.conn_map[user.id], self.vectors.get(user.id))
+        scores = matrix.score(profile)
+        skip = self.conn_map[user.id] | self.pending.get(user.id, set()) | {user.id}
+        scores[np.isin(matrix.ids, np.fromiter(skip, dtype=np.int64))] = 0
+        positive = np.flatnonzero(scores > 0)
+        # Best first, ties in id order (candidate order online)
+        chosen = positive[np.lexsort((positive, -scores[positive]))][:TOP_K]
+        return matrix.ids[chosen].tolist()
+
+    def jobs_for(self, user):
+        snap = job_matcher.snapshot()
+        conn = db_utils.get_db_connection()
+        try:
+            skill_ids = set(skill_index.lookup(conn, user.skills))
+        finally:
+            conn.close()
+        vector = self.vectors.get(user.id)
+        scored = []
+        for row, job_id in enumerate(snap.job_ids):
+            score = len(snap.job_skills[row] & skill_ids)
+            if vector is not None and snap.vectors[row] is not None:
+                score += job_matching.semantic_points(embeddings.cosine(vector, snap.vectors[row]))
+            if score > 0:
+                scored.append((job_id, score))
+        scored.sort(key=lambda item: -item[1])
+        return [job_id for job_id, _ in scored[:TOP_K]]
+
+
+def overlap(got, expected):
+    if not expected:
+        return 1.0 if not got else 0.0
+    return len(set(got) & set(expected)) / len(expected)
+
+
+# ==================== BENCH ====================
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:8.2f}"
+
+
+def bench(n, dim, queries, seed, baseline, min_overlap):
+    print(f"\n=== {n:,} users, dim {dim} ===")
+    path = f"{_scratch.name}.{n}"
+    started = time.perf_counter()
+    build_dataset(path, n, dim, seed)
+    print(f"  dataset built in {time.perf_counter() - started:.1f}s")
+
+    reference = Reference()
+    rng = random.Random(seed + 1)
+    sample = rng.sample(sorted(reference.users), min(queries, len(reference.users)))
+    users = [User.from_row(reference.users[uid]) for uid in sample]
+    students = [user for user in users if user.role == 'student']
+
+    # Per-call stage totals (the semantic stage runs twice in get_recommended_users)
+    stages = {}
+    current = {}
+    recommendation.set_stage_listener(
+        lambda recommender, stage, seconds: current.__setitem__(
+            (recommender, stage), current.get((recommender, stage), 0.0) + seconds))
+
+    results = {'users': {}, 'jobs': {}}
+    totals = {'users': [], 'jobs': []}
+    for name, fn, sample_users in (('users', recommendation.get_recommended_users, users),
+                                   ('jobs', recommendation.get_recommended_jobs, students)):
+        for user in sample_users:
+            current.clear()
+            t0 = time.perf_counter()
+            recs = fn(user)
+            totals[name].append(time.perf_counter() - t0)
+            for key, seconds in current.items():
+                stages.setdefault(key, []).append(seconds)
+            results[name][str(user.id)] = [rec['id'] for rec in recs]
+    recommendation.set_stage_listener(None)
+
+    # Memory: peak Python allocation of one call, on a few users
+    peaks = {}
+    for name, fn, sample_users in (('users', recommendation.get_recommended_users, users[:20]),
+                                   ('jobs', recommendation.get_recommended_jobs, students[:20])):
+        worst = 0
+        for user in sample_users:
+            tracemalloc.start()
+            fn(user)
+            worst = max(worst, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        peaks[name] = worst
+
+    print(f"  {'':24} {'p50 ms':>8} {'p95 ms':>8}")
+    for name in ('users', 'jobs'):
+        print(f"  {'get_recommended_' + name:24} {_ms(percentile(totals[name], 50))} {_ms(percentile(totals[name], 95))}"
+              f"   ({len(totals[name])} calls, peak {peaks[name] / 1024:.0f} KiB/call)")
+        for (recommender, stage), values in stages.items():
+            if recommender == name:
+                print(f"    {stage:22} {_ms(percentile(values, 50))} {_ms(percentile(values, 95))}")
+    print(f"  process RSS: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB (max so far)")
+
+    # Quality against the exact reference
+    ref_users = [overlap(results['users'][str(u.id)], reference.users_for(u)) for u in users]
+    ref_jobs = [overlap(results['jobs'][str(u.id)], reference.jobs_for(u)) for u in students]
+    print(f"  top-{TOP_K} overlap with exact reference: users {sum(ref_users) / len(ref_users):.3f}, "
+          f"jobs {sum(ref_jobs) / max(len(ref_jobs), 1):.3f}")
+
+    ok = True
+    previous = (baseline or {}).get(str(n))
+    if previous is not None:
+        for name in ('users', 'jobs'):
+            common = [uid for uid in results[name] if uid in previous.get(name, {})]
+            scores = [overlap(results[name][uid], previous[name][uid]) for uid in common]
+            mean = sum(scores) / len(scores) if scores else 1.0
+            status = '✓' if mean >= min_overlap else '✗'
+            ok = ok and mean >= min_overlap
+            print(f"  {status} {name} overlap with baseline: {mean:.3f} over {len(common)} users")
+
+    db_utils.configure(_scratch.name)
+    os.unlink(path)
+    return ok, results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--dim', type=int, default=384, help='embedding size (all-MiniLM-L6-v2: 384)')
+    parser.add_argument('--queries', type=int, default=200, help='users sampled per size')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--baseline', help='JSON of top 5s saved by --save-baseline to compare with')
+    parser.add_argument('--save-baseline', help='write this run\'s top 5s here')
+    parser.add_argument('--min-overlap', type=float, default=1.0, help='fail below this baseline overlap')
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    all_ok, saved = True, {}
+    try:
+        for size in args.sizes:
+            ok, saved[str(size)] = bench(size, args.dim, args.queries, args.seed, baseline, args.min_overlap)
+            all_ok = all_ok and ok
+    finally:
+        os.unlink(_scratch.name)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(saved, f)
+        print(f"\nSaved top {TOP_K}s to {args.save_baseline}")
+    sys.exit(0 if all_ok else 1)
@@ -0,0 +1,103 @@
+"""
+Benchmark the recommendation scoring engines on synthetic candidates.
+
+Generates N candidates (skills, branch, domain, city, connections and unit
+embedding vectors), then ranks them for a handful of random users with the
+Python loop and with the NumPy CandidateMatrix, checks both return the same
+top-k and prints the timings:
+
+    python scripts/bench_scoring.py                 # 10k and 100k candidates
+    python scripts/bench_scoring.py --sizes 50000 --dim 128
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from models.scoring import NUMPY_AVAILABLE, ScoringProfile, score_python
+
+if NUMPY_AVAILABLE:
+    from models.scoring import CandidateMatrix
+
+SKILLS = [f"skill{i}" for i in range(300)]
+BRANCHES = ['Computer Science', 'Information Technology', 'Mechanical Engineering',
+            'Civil Engineering', 'Electronics & Communication', 'Commerce', None]
+DOMAINS = ['Web', 'Data', 'Cloud', 'Embedded', 'Finance', 'Design', None]
+CITIES = ['Mumbai', 'Pune', 'Bangalore', 'Delhi', 'Hyderabad', 'Chennai', None]
+
+
+def _unit_vector(rng, dim):
+    values = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return array('f', (v / norm for v in values))
+
+
+def synthetic_candidates(n, dim, rng):
+    candidates, conn_map, vectors = [], {}, {}
+    for cid in range(1, n + 1):
+        candidates.append({
+            'id': cid,
+            'branch': rng.choice(BRANCHES),
+            'current_domain': rng.choice(DOMAINS),
+            'city': rng.choice(CITIES),
+            'skills': ', '.join(rng.sample(SKILLS, rng.randint(0, 8))),
+        })
+        conn_map[cid] = {rng.randint(1, n) for _ in range(rng.randint(0, 10))}
+        if rng.random() < 0.8:
+            vectors[cid] = _unit_vector(rng, dim)
+    return candidates, conn_map, vectors
+
+
+def random_profile(n, dim, rng):
+    return ScoringProfile(', '.join(rng.sample(SKILLS, 6)), rng.choice(BRANCHES[:-1]),
+                          rng.choice(DOMAINS[:-1]), rng.choice(CITIES[:-1]),
+                          {rng.randint(1, n) for _ in range(50)}, _unit_vector(rng, dim))
+
+
+def bench(n, dim, users, k, seed):
+    rng = random.Random(seed)
+    candidates, conn_map, vectors = synthetic_candidates(n, dim, rng)
+    profiles = [random_profile(n, dim, rng) for _ in range(users)]
+
+    started = time.perf_counter()
+    expected = [score_python(p, candidates, conn_map, vectors, k) for p in profiles]
+    python_ms = (time.perf_counter() - started) * 1000 / users
+    print(f"\n{n:,} candidates, dim {dim}, top {k}")
+    print(f"  python loop      : {python_ms:9.1f} ms/user")
+
+    if not NUMPY_AVAILABLE:
+        print("  numpy            : not installed")
+        return True
+
+    started = time.perf_counter()
+    matrix = CandidateMatrix(candidates, conn_map, vectors)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    got = [matrix.top_k(p, k) for p in profiles]
+    numpy_ms = (time.perf_counter() - started) * 1000 / users
+
+    same = got == expected
+    print(f"  numpy build      : {build_ms:9.1f} ms (once per candidate set)")
+    print(f"  numpy score+topk : {numpy_ms:9.1f} ms/user  ({python_ms / numpy_ms:.0f}x)")
+    print(f"  identical top-k  : {'✓' if same else '✗'}")
+    return same
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dim', type=int, default=384, help='embedding size (all-MiniLM-L6-v2: 384)')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('-k', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    ok = all([bench(n, args.dim, args.users, args.k, args.seed) for n in args.sizes])
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,67 @@
+"""
+Smoke-check the configured database backend through db_utils.
+
+Runs the app's schema setup and a handful of representative statements
+(placeholders, INSERT OR IGNORE, LIKE, lastrowid, row access) against
+whatever DATABASE_URL / DB_NAME points at. With no DATABASE_URL it
+validates the SQLite fallback.
+
+    DATABASE_URL=postgresql://localhost/alumni_ci python scripts/check_db_backend.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import app, init_db
+from db_utils import get_db_connection, get_engine, transaction
+
+
+def check_backend():
+    with app.app_context():
+        init_db()
+        pool = get_engine()
+        print(f"Backend: {pool.backend.name}")
+
+        failures = 0
+        with transaction() as conn:
+            row = conn.execute("SELECT id, name, email FROM users WHERE role = ?", ('admin',)).fetchone()
+            if row and row['id'] == row[0] and dict(row)['email'] == row['email']:
+                print("✓ Placeholders and row access")
+            else:
+                print("✗ Could not read admin user")
+                failures += 1
+
+            c = conn.cursor()
+            c.execute("INSERT OR IGNORE INTO connections (user_id_1, user_id_2) VALUES (?, ?)", (row['id'], row['id']))
+            c.execute("INSERT OR IGNORE INTO connections (user_id_1, user_id_2) VALUES (?, ?)", (row['id'], row['id']))
+            count = conn.execute("SELECT COUNT(*) FROM connections WHERE user_id_1 = ? AND user_id_2 = ?",
+                                 (row['id'], row['id'])).fetchone()[0]
+            print(("✓" if count == 1 else "✗") + " INSERT OR IGNORE")
+            failures += count != 1
+
+            like = conn.execute("SELECT COUNT(*) FROM users WHERE name LIKE ?", ('%ADMIN%',)).fetchone()[0]
+            print(("✓" if like >= 1 else "✗") + " Case-insensitive LIKE")
+            failures += like < 1
+
+            conn.execute("DELETE FROM connections WHERE user_id_1 = ? AND user_id_2 = ?", (row['id'], row['id']))
+            conn.rollback()
+
+        conn = get_db_connection()
+        try:
+            c = conn.cursor()
+            c.execute("INSERT INTO password_resets (email, otp) VALUES (?, ?)", ('ci@example.com', '000000'))
+            new_id = c.lastrowid
+            print(("✓" if new_id else "✗") + f" lastrowid ({new_id})")
+            failures += not new_id
+            conn.rollback()
+        finally:
+            conn.close()
+
+        print(f"Pool: {pool.stats()}")
+        return failures
+
+
+if __name__ == '__main__':
+    sys.exit(1 if check_backend() else 0)
@@ -0,0 +1,173 @@
+"""
+Assert that every hot query is served by an index (no full-table SCAN).
+
+Builds a throwaway SQLite database from the migrations, runs EXPLAIN QUERY
+PLAN on each hot statement and fails (exit code 1) if a plan scans a table
+without an index. Run it after touching database/indexes.py or any of
+these queries:
+
+    python scripts/check_query_plans.py
+
+SQL in importable helpers (messaging, skill index, job matching,
+recommendations) is not copied here: HOT_CALLS runs the real functions
+against a few seeded rows and checks every statement they execute. Only
+SQL written inline in app.py routes is listed as text, in HOT_QUERIES.
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Point the app at a scratch database before it is imported
+_scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+_scratch.close()
+os.environ['DB_NAME'] = _scratch.name
+os.environ['AUTO_MIGRATE'] = 'False'
+os.environ.setdefault('AI_RECOMMENDATIONS', 'False')
+
+from app import app
+from database import messaging_db
+from database.migrations import migrate
+from db_utils import add_query_listener, get_db_connection, remove_query_listener
+from models import skills
+from models.job_matching import job_matcher
+from models.recommendation import get_recommended_users
+from models.user import USER_COLUMNS, User
+
+
+def _with_conn(fn, *args):
+    def call():
+        conn = get_db_connection()
+        try:
+            return fn(conn, *args)
+        finally:
+            conn.close()
+    return call
+
+
+# (label, callable) — every statement the call executes is checked
+HOT_CALLS = [
+    ('conversation thread', lambda: messaging_db.get_conversation_messages(2, 3)),
+    ('unread count', lambda: messaging_db.get_unread_message_count(2)),
+    ('mark conversation read', lambda: messaging_db.mark_conversation_as_read(2, 3, 2)),
+    ('user conversations', lambda: messaging_db.get_user_conversations(2)),
+    ('conversation id', lambda: messaging_db.get_conversation_id(2, 3)),
+    ('public feed', lambda: messaging_db.get_public_messages()),
+    ('skill lookup', _with_conn(skills.lookup, 'python, sql')),
+    ('skill candidates', _with_conn(skills.user_candidates, [1, 2], 'alumni', [2])),
+    ('job skill matches', _with_conn(skills.job_matches, [1, 2])),
+    ('open jobs', lambda: job_matcher.snapshot()),
+    ('user recommendations', lambda: get_recommended_users(
+        User(2, 'Student', 's@gmail.com', 'student', skills='python, sql'))),
+]
+
+# (label, sql, params) — copies of statements written inline in app.py routes
+HOT_QUERIES = [
+    ('active jobs', '''
+        SELECT j.*, u.name as posted_by_name
+        FROM jobs j
+        LEFT JOIN users u ON j.posted_by = u.id
+        WHERE j.is_active = 1
+        ORDER BY j.created_at DESC
+    ''', ()),
+    ('pending requests', '''
+        SELECT cr.id, cr.sender_id, cr.receiver_id, cr.status, cr.created_at,
+               u.name, u.email, u.role, u.profile_pic
+        FROM connection_requests cr
+        JOIN users u ON cr.sender_id = u.id
+        WHERE cr.receiver_id = ? AND cr.status = 'pending'
+        ORDER BY cr.created_at DESC
+    ''', (1,)),
+    ('outgoing request check', '''
+        SELECT * FROM connection_requests
+        WHERE sender_id = ? AND receiver_id = ? AND status = 'pending'
+    ''', (1, 2)),
+    ('connection check', '''
+        SELECT * FROM connections
+        WHERE (user_id_1 = ? AND user_id_2 = ?) OR (user_id_1 = ? AND user_id_2 = ?)
+    ''', (1, 2, 2, 1)),
+    ('student profile', 'SELECT * FROM student_profile WHERE user_id = ?', (1,)),
+    ('alumni profile', 'SELECT * FROM alumni_profile WHERE user_id = ?', (1,)),
+    ('faculty profile', 'SELECT * FROM faculty_profile WHERE user_id = ?', (1,)),
+    ('login lookup', f'SELECT {USER_COLUMNS}, password, is_approved FROM users WHERE email = ?',
+     ('a@gmail.com',)),
+]
+
+# "SCAN t" without an index; "SCAN t USING [COVERING] INDEX" is fine
+_FULL_SCAN_RE = re.compile(r'^SCAN (\w+)(?! USING)')
+
+
+def _seed(conn):
+    """Just enough rows for the helpers to reach every statement they run"""
+    conn.execute("INSERT INTO users (id, name, email, password, role, skills) "
+                 "VALUES (2, 'Student', 's@gmail.com', 'x', 'student', 'python, sql')")
+    conn.execute("INSERT INTO users (id, name, email, password, role, skills) "
+                 "VALUES (3, 'Alumnus', 'a@gmail.com', 'x', 'alumni', 'python')")
+    conn.execute("INSERT INTO jobs (id, title, company, posted_by, is_active, required_skills) "
+                 "VALUES (1, 'Developer', 'Acme', 3, 1, 'python')")
+    skills.rebuild(conn)
+    conn.commit()
+
+
+def _captured(call):
+    """[(sql, params)] of the statements `call` executes"""
+    seen = []
+    listener = lambda event: seen.append((event.sql, event.params))
+    add_query_listener(listener)
+    try:
+        call()
+    finally:
+        remove_query_listener(listener)
+    return seen
+
+
+def _check(conn, label, sql, params):
+    plan = [row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params or ()).fetchall()]
+    scans = [d for d in plan if _FULL_SCAN_RE.match(d)]
+    if scans:
+        print(f"✗ {label}: {'; '.join(scans)}")
+        print(f"    {' '.join(sql.split())}")
+        return False
+    print(f"✓ {label}: {'; '.join(plan)}")
+    return True
+
+
+def check_query_plans():
+    checked = failures = 0
+    with app.app_context():
+        migrate(verbose=False)
+        conn = get_db_connection()
+        try:
+            _seed(conn)
+        finally:
+            conn.close()
+
+        statements = [(label, sql, params) for label, sql, params in HOT_QUERIES]
+        for label, call in HOT_CALLS:
+            executed = _captured(call)
+            if not executed:
+                print(f"✗ {label}: ran no SQL (seed data no longer reaches it)")
+                failures += 1
+            statements.extend((label, sql, params) for sql, params in executed)
+
+        conn = get_db_connection()
+        try:
+            for label, sql, params in statements:
+                checked += 1
+                if not _check(conn, label, sql, params):
+                    failures += 1
+        finally:
+            conn.close()
+    print(f"\n{checked - failures}/{checked} hot statements use an index")
+    return failures
+
+
+if __name__ == '__main__':
+    try:
+        result = check_query_plans()
+    finally:
+        os.unlink(_scratch.name)
+    sys.exit(1 if result else 0)
@@ -0,0 +1,94 @@
+"""
+Compare bursty private-message writes with and without the single-writer queue.
+
+Builds a throwaway SQLite database from the migrations, then runs the same
+burst (THREADS threads x MESSAGES sends) twice: every thread writing inline,
+and every thread going through database/write_queue.py. Prints throughput,
+p50/p99 latency and the writer's group-commit stats:
+
+    python scripts/check_write_queue.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Point the app at a scratch database before it is imported
+_scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+_scratch.close()
+os.environ['DB_NAME'] = _scratch.name
+os.environ['AUTO_MIGRATE'] = 'False'
+
+from app import app
+from database import messaging_db, write_queue
+from database.migrations import migrate
+from db_utils import transaction
+
+THREADS = 40
+MESSAGES = 50
+
+
+def _percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct))]
+
+
+def burst(sender_id, receiver_id):
+    latencies, ids, errors = [], [], []
+
+    def worker():
+        for _ in range(MESSAGES):
+            started = time.perf_counter()
+            try:
+                ids.append(messaging_db.send_private_message(sender_id, receiver_id, 'load test'))
+            except Exception as e:
+                errors.append(e)
+            latencies.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'writes_per_s': int(len(ids) / elapsed),
+        'p50_ms': round(_percentile(latencies, 0.50) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 0.99) * 1000, 2),
+        'unique_ids': len(set(ids)),
+        'errors': len(errors),
+    }
+
+
+def check_write_queue():
+    with app.app_context():
+        migrate(verbose=False)
+        with transaction() as conn:
+            ids = [conn.execute("INSERT INTO users (name, email, password, role) VALUES (?, ?, 'x', 'student')",
+                                (f'Load {i}', f'load{i}@gmail.com')).lastrowid for i in range(2)]
+
+        results = {}
+        for mode in ('inline', 'queue'):
+            write_queue._settings['enabled'] = mode == 'queue'
+            results[mode] = burst(*ids)
+            print(f"{mode:>6}: {results[mode]}")
+        print(f"writer: {write_queue.get_write_queue().stats()}")
+        write_queue.stop_all()
+
+    expected = THREADS * MESSAGES
+    ok = all(r['unique_ids'] == expected and not r['errors'] for r in results.values())
+    print("\n✓ all writes landed" if ok else "\n✗ lost or failed writes")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    try:
+        result = check_write_queue()
+    finally:
+        os.unlink(_scratch.name)
+    sys.exit(result)
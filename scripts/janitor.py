@@ -0,0 +1,55 @@
+"""
+Run one janitor pass (database/janitor.py) and print what it reclaimed.
+
+The server runs the janitor in the background every JANITOR_INTERVAL
+seconds; this runs it now, e.g. from cron with JANITOR=False on the
+servers, or once after a large import:
+
+    python scripts/janitor.py
+    python scripts/janitor.py --enable-incremental-vacuum    # once, offline
+
+--enable-incremental-vacuum switches an existing SQLite file to
+auto_vacuum=INCREMENTAL, which needs a full VACUUM (rewrites the file and
+locks it until done). From then on every pass returns up to
+JANITOR_VACUUM_PAGES free pages to the filesystem.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AUTO_MIGRATE', 'False')
+os.environ.setdefault('AI_RECOMMENDATIONS', 'False')
+
+from app import app
+from database import janitor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Purge expired rows and tidy the database')
+    parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                        help='switch to auto_vacuum=INCREMENTAL (full VACUUM) before the pass')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.enable_incremental_vacuum:
+            if janitor.enable_incremental_vacuum():
+                print("✓ auto_vacuum=INCREMENTAL enabled")
+            else:
+                print("Incremental vacuum only applies to SQLite; skipped.")
+        report = janitor.run_once(force_analyze=True)
+
+    print(f"{'table':<22}{'rows':>8}{'batches':>9}{'seconds':>9}")
+    for table, result in report['tables'].items():
+        if 'error' in result:
+            print(f"{table:<22}  failed: {result['error']}")
+        else:
+            print(f"{table:<22}{result['rows']:>8}{result['batches']:>9}{result['seconds']:>9}")
+    print(f"hygiene: {report['hygiene']}")
+    print(f"✓ Janitor pass finished in {report['seconds']}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
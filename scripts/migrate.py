@@ -0,0 +1,44 @@
+"""
+Schema migration CLI.
+
+    python scripts/migrate.py            # apply all pending migrations
+    python scripts/migrate.py --status   # show current/latest version and what is pending
+    python scripts/migrate.py --target 3 # apply up to (and including) v003
+
+Migrations live in database/migrations/vNNN_*.py and are recorded in the
+schema_version table of whatever DB_NAME / DATABASE_URL points at.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# Let this CLI do the migrating, not the app's boot-time check
+os.environ.setdefault('AUTO_MIGRATE', 'False')
+
+from app import app
+from database.migrations import migrate, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply versioned schema migrations')
+    parser.add_argument('--status', action='store_true', help='show schema version and pending migrations')
+    parser.add_argument('--target', type=int, default=None, help='stop after this version')
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.status:
+            current, latest, todo = status()
+            print(f"Schema version: {current} (latest {latest})")
+            for m in todo:
+                print(f"  pending v{m.version:03d} {m.name}: {m.description}")
+            return
+
+        applied = migrate(target=args.target)
+        if not applied:
+            print("Nothing to apply.")
+
+
+if __name__ == '__main__':
+    main()
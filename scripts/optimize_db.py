@@ -1,53 +1,27 @@
-import sqlite3
-import os
-
-def optimize_database():
-    db_path = os.path.join('data', 'college_pro.db')
-    if not os.path.exists(db_path):
-        print(f"Error: Database not found at {db_path}")
-        return
+"""Apply pending migrations (indexes live in database/indexes.py), then ANALYZE."""
 
-    print(f"Optimizing database at {db_path}...")
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    try:
-        # 1. Users table optimizations
-        print("Creating indexes for 'users' table...")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_role ON users(role)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_name ON users(name)")
+import os
+import sys
 
-        # 2. Registration log optimizations
-        print("Creating indexes for 'registration_log' table...")
-        # Check if table exists first
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='registration_log'")
-        if cursor.fetchone():
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_reglog_role ON registration_log(role)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_reglog_date ON registration_log(registered_at)")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-        # 3. Connections optimizations
-        print("Creating indexes for 'connections' table...")
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='connections'")
-        if cursor.fetchone():
-            # Standardizing connection search
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_connections_u1 ON connections(user_id_1)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_connections_u2 ON connections(user_id_2)")
+from app import app
+from database.migrations import migrate
+from db_utils import get_db_connection
 
-        # 4. Connection requests optimizations
-        print("Creating indexes for 'connection_requests' table...")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_connreq_sender ON connection_requests(sender_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_connreq_receiver ON connection_requests(receiver_id)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_connreq_status ON connection_requests(status)")
 
-        conn.commit()
-        print("✅ Database optimization complete! Indexing successful.")
+def optimize_database():
+    with app.app_context():
+        migrate()
+        conn = get_db_connection()
+        try:
+            if conn.backend == 'sqlite':
+                conn.execute("ANALYZE")
+                conn.commit()
+            print("✅ Database optimization complete! Indexing successful.")
+        finally:
+            conn.close()
 
-    except Exception as e:
-        print(f"❌ Error during optimization: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
 
 if __name__ == "__main__":
     optimize_database()
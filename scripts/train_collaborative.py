@@ -0,0 +1,108 @@
+"""
+Train the collaborative-filtering factors (models/collaborative.py).
+
+Factorises the connection / conversation / request history and writes the
+factors file serving processes read (COLLABORATIVE_FACTORS_PATH). Run it
+nightly, e.g. next to scripts/batch_recommendations.py:
+
+    python scripts/train_collaborative.py
+    python scripts/train_collaborative.py --rank 64 --output /tmp/factors.npz
+    python scripts/train_collaborative.py --evaluate     # hold-out check first
+
+--evaluate hides 10% of the connections, trains on the rest and reports
+how often a hidden connection ranks in the user's top 50 (vs. chance),
+before training on everything.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('AUTO_MIGRATE', 'False')
+os.environ.setdefault('AI_RECOMMENDATIONS', 'False')
+
+from app import app
+from db_utils import get_db_connection
+from models import collaborative
+
+TOP_N = 50
+MAX_EVAL_PAIRS = 1000
+
+
+def evaluate(conn, rank, seed):
+    import numpy as np
+
+    edges = [(row['user_id_1'], row['user_id_2'])
+             for row in conn.execute('SELECT user_id_1, user_id_2 FROM connections').fetchall()
+             if row['user_id_1'] != row['user_id_2']]
+    if len(edges) < 20:
+        print("Not enough connections to evaluate.")
+        return
+    rng = random.Random(seed)
+    held_out = rng.sample(edges, max(1, len(edges) // 10))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'factors.npz')
+        collaborative.train(conn, path, rank, exclude_pairs=held_out, seed=seed)
+        with np.load(path) as data:
+            ids, user_factors, item_factors = data['ids'], data['user_factors'], data['item_factors']
+
+    known = {}
+    for a, b in edges:
+        known.setdefault(a, set()).add(b)
+        known.setdefault(b, set()).add(a)
+    hidden = {(min(a, b), max(a, b)) for a, b in held_out}
+    row_of = {int(uid): row for row, uid in enumerate(ids)}
+
+    hits = total = 0
+    for a, b in rng.sample(held_out, min(MAX_EVAL_PAIRS, len(held_out))):
+        if a not in row_of or b not in row_of:
+            total += 1      # an isolated user after the hold-out: counts as a miss
+            continue
+        scores = item_factors @ user_factors[row_of[a]]
+        # Training connections and the user themselves are not candidates
+        seen = [row_of[o] for o in known[a] if o in row_of and (min(a, o), max(a, o)) not in hidden]
+        scores[seen + [row_of[a]]] = -np.inf
+        top = np.argpartition(-scores, min(TOP_N, len(scores) - 1))[:TOP_N]
+        hits += row_of[b] in set(top.tolist())
+        total += 1
+    chance = TOP_N / max(len(ids) - 1, 1)
+    print(f"Hold-out: {len(held_out)} connections hidden, {total} checked")
+    print(f"  recall@{TOP_N}: {hits / total:.3f} (chance {min(chance, 1):.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train collaborative-filtering factors')
+    parser.add_argument('--rank', type=int, default=collaborative.RANK, help='factors per user')
+    parser.add_argument('--output', default=None, help='factors file (default: COLLABORATIVE_FACTORS_PATH)')
+    parser.add_argument('--evaluate', action='store_true', help='hold-out recall check before training')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not collaborative.NUMPY_AVAILABLE:
+        print("NumPy is not installed; collaborative filtering is disabled.")
+        return 1
+
+    with app.app_context():
+        output = args.output or app.config.get('COLLABORATIVE_FACTORS_PATH', collaborative.FACTORS_PATH)
+        conn = get_db_connection()
+        try:
+            if args.evaluate:
+                evaluate(conn, args.rank, args.seed)
+            summary = collaborative.train(conn, output, args.rank, seed=args.seed)
+        finally:
+            conn.close()
+
+    if not summary['rank']:
+        print("No interactions yet; nothing written.")
+        return 0
+    print(f"✓ Trained rank {summary['rank']} on {summary['interactions']} interactions "
+          f"between {summary['users']} users in {summary['seconds']}s -> {output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())